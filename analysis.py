@@ -0,0 +1,209 @@
+import argparse
+import io
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from hazards import HORIZONTAL, UNREACHABLE, VERTICAL, default_hazards, flood_distances, load_hazards
+from level import TILE_SIZE, WALL
+from level_pack import CACHE_DIR, compile_level, load_compiled_level, read_compiled
+from maze import generate_chunk
+from persistence import write_atomic
+from simulation import STEP, TICK_MS, WAVE_DELAYS
+
+CELL_MS = TILE_SIZE / STEP * TICK_MS  # Время прохода одной клетки в мс
+GENERATED_SIZE = 30  # Сторона сгенерированного уровня в клетках (без нижней и правой стены)
+GENERATED_WALLS = 0.03  # Доля клеток пола, которые генератор превращает в стены
+
+
+# Поля расстояний от старта и от выходов; кэшируются на диске по хэшу исходника уровня
+def distance_fields(level, cache_dir=CACHE_DIR):
+    cache_path = os.path.join(cache_dir, level.source_hash.hex() + '.dist.npz') if cache_dir else None
+    if cache_path:
+        try:
+            with np.load(cache_path) as cached:
+                return cached['spawn'], cached['exit']
+        except (FileNotFoundError, ValueError, KeyError, OSError):  # Кэша нет или он поврежден
+            pass
+
+    cells = np.frombuffer(level.cells, dtype=np.uint8).reshape(level.height, level.width)
+    passable = cells != WALL
+    spawn = flood_distances(passable, [level.spawn] if level.spawn else [])
+    exit_field = flood_distances(passable, level.exits)
+    if cache_path:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, spawn=spawn, exit=exit_field)
+        os.makedirs(cache_dir, exist_ok=True)
+        write_atomic(cache_path, buffer.getvalue())
+    return spawn, exit_field
+
+
+# Кратчайший путь от старта до ближайшего выхода: клетки, на которых сумма расстояний минимальна
+def shortest_path(spawn, exit_field):
+    if spawn.size == 0 or exit_field.min() == UNREACHABLE:
+        return None
+    total = spawn.astype(np.int64) + exit_field
+    y, x = np.unravel_index(np.argmin(np.where(spawn == 0, total, np.iinfo(np.int64).max)), spawn.shape)
+    if total[y, x] >= UNREACHABLE:  # Выход не достижим со старта
+        return None
+    path = [(x, y)]
+    height, width = spawn.shape
+    while exit_field[y, x] > 0:  # Шаг к соседу, который ближе к выходу
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < width and 0 <= ny < height and exit_field[ny, nx] == exit_field[y, x] - 1:
+                x, y = nx, ny
+                break
+        path.append((x, y))
+    return path
+
+
+# Области пола, недостижимые со старта: список (число клеток, первая клетка)
+def unreachable_regions(spawn, passable):
+    left = passable & (spawn == UNREACHABLE)
+    regions = []
+    while left.any():
+        y, x = np.unravel_index(np.argmax(left), left.shape)
+        region = flood_distances(left, [(x, y)]) != UNREACHABLE
+        regions.append((int(region.sum()), (int(x), int(y))))
+        left &= ~region
+    return regions
+
+
+# Время (мс от начала уровня), когда полосы опасностей впервые накрывают клетки пути
+def hazard_arrival(specs, xs, ys):
+    arrival = np.full(len(xs), np.inf)
+    for spec in specs:
+        if spec.kind == HORIZONTAL:
+            edge = ys * TILE_SIZE
+        elif spec.kind == VERTICAL:
+            edge = xs * TILE_SIZE
+        else:  # Затопления и ворота не моделируются
+            continue
+        ticks = np.maximum(np.floor((edge - spec.size) / spec.speed) + 1, 1)  # Такт, когда полоса дошла до клетки
+        arrival = np.minimum(arrival, spec.delay + (ticks - 1) * TICK_MS)
+    return arrival
+
+
+# Итог проверки уровня
+class LevelReport:
+    def __init__(self, name, width, height, path_cells, margins, regions):
+        self.name = name  # Имя уровня
+        self.width = width  # Ширина в клетках
+        self.height = height  # Высота в клетках
+        self.path_cells = path_cells  # Длина кратчайшего пути в клетках или None
+        self.margins = margins  # Сложность -> запас времени до волны в мс
+        self.regions = regions  # Недостижимые области
+
+    @property
+    def path_ms(self):
+        return self.path_cells * CELL_MS if self.path_cells is not None else None
+
+    # Уровень можно пройти на всех сложностях
+    @property
+    def solvable(self):
+        return self.path_cells is not None and all(margin > 0 for margin in self.margins.values())
+
+
+# Проверка уровня: путь, запас времени на каждой сложности и недостижимые области
+def analyze(name, level, hazards_for, cache_dir=CACHE_DIR):
+    spawn, exit_field = distance_fields(level, cache_dir)
+    cells = np.frombuffer(level.cells, dtype=np.uint8).reshape(level.height, level.width)
+    regions = unreachable_regions(spawn, cells != WALL)
+    path = shortest_path(spawn, exit_field)
+    margins = {}
+    if path is not None:
+        xs, ys = np.array(path).T
+        arrive = np.arange(len(path)) * CELL_MS  # Время прихода игрока в клетки пути
+        leave = np.append(arrive[1:], arrive[-1])  # Время ухода; на выходе уровень заканчивается
+        for difficulty in sorted(WAVE_DELAYS):
+            margins[difficulty] = float((hazard_arrival(hazards_for(difficulty), xs, ys) - leave).min())
+    return LevelReport(name, level.width, level.height, len(path) - 1 if path else None, margins, regions)
+
+
+# Уровень из каталога levels/ с опасностями из его файла
+def analyze_file(filename, levels_dir='levels', cache_dir=CACHE_DIR):
+    level = load_compiled_level(filename, levels_dir, cache_dir)
+    return analyze(filename, level, lambda difficulty: load_hazards(filename, difficulty, levels_dir), cache_dir)
+
+
+# Текст сгенерированного уровня: лабиринт из комнат, часть проходов заложена стенами
+def generated_level(seed, size=GENERATED_SIZE, walls=GENERATED_WALLS):
+    cells = generate_chunk(seed, 0, 0, size)
+    rng = random.Random(seed)
+    rows = []
+    for y in range(size):
+        row = ['#' if cells[y * size + x] == WALL or rng.random() < walls else '.' for x in range(size)]
+        rows.append(''.join(row) + '#')
+    rows[1] = '#@' + rows[1][2:]  # Старт в первой комнате
+    rows.append('#' * (size - 2) + 'E##')  # Выход в нижней стене под последней комнатой
+    return '\n'.join(rows)
+
+
+# Проверка одного сгенерированного уровня (выполняется в процессе пула)
+def analyze_generated(seed, size=GENERATED_SIZE, walls=GENERATED_WALLS):
+    level = read_compiled(compile_level(generated_level(seed, size, walls).encode('utf-8')))
+    return analyze(f'seed {seed}', level, default_hazards, cache_dir=None)
+
+
+def print_report(report):
+    margins = ' '.join(f'{report.margins[d] / 1000:>8.1f}' if d in report.margins else f"{'-':>8}"
+                       for d in sorted(WAVE_DELAYS))
+    path = f'{report.path_cells:>6} {report.path_ms / 1000:>7.1f}' if report.path_cells is not None \
+        else f"{'нет':>6} {'-':>7}"
+    regions = ', '.join(f'{count} кл. у {cell}' for count, cell in report.regions) or '-'
+    print(f'{report.name:>12} {report.width:>4}x{report.height:<4} {path} {margins}  {regions}')
+
+
+def print_summary(reports, elapsed):
+    solvable = sum(report.solvable for report in reports)
+    no_path = sum(report.path_cells is None for report in reports)
+    with_regions = sum(bool(report.regions) for report in reports)
+    print(f'уровней: {len(reports)}, проходимы на всех сложностях: {solvable}, выход недостижим: {no_path}, '
+          f'с недостижимыми областями: {with_regions}')
+    paths = sorted(report.path_cells for report in reports if report.path_cells is not None)
+    if paths:
+        print(f'путь, клеток: медиана {statistics.median(paths):.0f}, максимум {paths[-1]}')
+        for difficulty in sorted(WAVE_DELAYS):
+            margins = [report.margins[difficulty] for report in reports if report.path_cells is not None]
+            failed = sum(margin <= 0 for margin in margins)
+            print(f'сложность {difficulty}: волна успевает в {failed} уровнях, '
+                  f'запас: минимум {min(margins) / 1000:.1f} с, медиана {statistics.median(margins) / 1000:.1f} с')
+    print(f'{elapsed:.2f} с, {len(reports) / elapsed:.0f} уровней/с')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка проходимости уровней')
+    parser.add_argument('files', nargs='*', help='файлы уровней из каталога levels (по умолчанию все)')
+    parser.add_argument('--levels', default='levels', help='каталог уровней')
+    parser.add_argument('--generate', type=int, metavar='N', help='проверить N сгенерированных уровней')
+    parser.add_argument('--size', type=int, default=GENERATED_SIZE, help='сторона сгенерированного уровня')
+    parser.add_argument('--walls', type=float, default=GENERATED_WALLS, help='доля заложенных проходов')
+    parser.add_argument('--seed', type=int, default=0, help='первое зерно генерации')
+    parser.add_argument('--workers', type=int, default=None, help='процессов в пуле (по умолчанию по числу ядер)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.generate:
+        seeds = range(args.seed, args.seed + args.generate)
+        with ProcessPoolExecutor(args.workers) as pool:
+            reports = list(pool.map(analyze_generated, seeds, [args.size] * len(seeds), [args.walls] * len(seeds),
+                                    chunksize=max(1, len(seeds) // (4 * (args.workers or os.cpu_count() or 1)))))
+        print_summary(reports, time.perf_counter() - start)
+        return
+
+    files = args.files or sorted(name for name in os.listdir(args.levels) if name.endswith('.txt'))
+    print(f"{'уровень':>12} {'размер':>9} {'путь':>6} {'путь, с':>7} "
+          + ' '.join(f'{f"запас {d}, с":>8}' for d in sorted(WAVE_DELAYS)) + '  недостижимые области')
+    reports = []
+    for filename in files:
+        reports.append(analyze_file(filename, args.levels))
+        print_report(reports[-1])
+    print_summary(reports, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pygame
+
+ASSET_MEMORY_LIMIT = 32 * 1024 * 1024  # Предел памяти под кэш изображений в байтах
+ATLAS_WIDTH = 256  # Ширина атласа мелких изображений в пикселях
+
+
+# Размер поверхности в байтах
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+# Загрузка и кэширование изображений из каталога data
+class AssetManager:
+    def __init__(self, directory='data', memory_limit=ASSET_MEMORY_LIMIT, missing='missing.png'):
+        self.directory = directory  # Каталог с изображениями
+        self.memory_limit = memory_limit  # Предел памяти кэша
+        self.missing = missing  # Изображение на случай отсутствующего файла
+        self.cache = OrderedDict()  # (имя, ключ цвета) -> поверхность, в порядке использования
+        self.memory_used = 0  # Занятая кэшем память
+        self.atlases = {}  # Имя атласа -> {имя изображения: часть атласа}
+        self.preloaded = {}  # Изображения, загруженные в фоне и ждущие конвертации
+        self.preload_lock = threading.Lock()
+        self.hits = 0  # Запросы, обслуженные из кэша
+        self.misses = 0  # Запросы, потребовавшие загрузки
+        self.disk_loads = 0  # Чтения файлов в основном потоке
+        self.load_time = 0.0  # Время загрузки и конвертации в секундах
+
+    # Чтение файла с диска (без конвертации, можно вызывать из любого потока)
+    def _read(self, name):
+        try:
+            return pygame.image.load(os.path.join(self.directory, name))  # Загрузка изображения
+        except FileNotFoundError:
+            return pygame.image.load(os.path.join(self.directory, self.missing))  # Загрузка альтернативного изображения
+
+    # Конвертация под формат экрана
+    @staticmethod
+    def _convert(image, color_key):
+        if color_key is not None:  # Если указан ключ цвета для прозрачности
+            image = image.convert()  # Конвертация изображения для оптимизации
+            if color_key == -1:  # Если ключ цвета равен -1, берем цвет из верхнего левого угла
+                color_key = image.get_at((0, 0))
+            image.set_colorkey(color_key)  # Устанавливаем прозрачность
+        else:
+            image = image.convert_alpha()  # Конвертация с поддержкой альфа-канала
+        return image
+
+    # Изображение по имени файла: из кэша, из фоновой загрузки или с диска
+    def image(self, name, color_key=None):
+        key = (name, color_key)
+        image = self.cache.get(key)
+        if image is not None:
+            self.cache.move_to_end(key)  # Отмечаем как недавно использованное
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        start = time.perf_counter()
+        with self.preload_lock:
+            raw = self.preloaded.pop(name, None)
+        if raw is None:  # Фоновая загрузка не успела или не запрашивалась
+            raw = self._read(name)
+            self.disk_loads += 1
+        image = self._convert(raw, color_key)
+        self.load_time += time.perf_counter() - start
+
+        self.cache[key] = image
+        self.memory_used += surface_bytes(image)
+        self._evict(key)
+        return image
+
+    # Вытеснение давно не использованных изображений сверх предела памяти
+    def _evict(self, keep):
+        while self.memory_used > self.memory_limit and len(self.cache) > 1:
+            key, image = next(iter(self.cache.items()))
+            if key == keep:
+                break
+            del self.cache[key]
+            self.memory_used -= surface_bytes(image)
+
+    # Фоновая загрузка файлов следующего экрана
+    def preload(self, names):
+        with self.preload_lock:
+            names = [name for name in names
+                     if not any(key[0] == name for key in self.cache) and name not in self.preloaded]
+        if not names:
+            return None
+
+        def worker():
+            for name in names:
+                raw = self._read(name)
+                with self.preload_lock:
+                    self.preloaded[name] = raw
+
+        thread = threading.Thread(target=worker, name='asset-preload', daemon=True)
+        thread.start()
+        return thread
+
+    # Упаковка мелких изображений в один атлас; возвращает части атласа по именам
+    def atlas(self, atlas_name, images):
+        if atlas_name in self.atlases:
+            self.hits += 1
+            return self.atlases[atlas_name]
+
+        self.misses += 1
+        start = time.perf_counter()
+        raws = {}
+        for name, filename in images.items():
+            raws[name] = self._read(filename)
+            self.disk_loads += 1
+
+        # Укладка полками: изображения по убыванию высоты слева направо
+        positions = {}
+        x = y = shelf_height = 0
+        for name in sorted(raws, key=lambda item: -raws[item].get_height()):
+            width, height = raws[name].get_size()
+            if x + width > ATLAS_WIDTH and x > 0:  # Полка заполнена - начинаем новую
+                x, y = 0, y + shelf_height
+                shelf_height = 0
+            positions[name] = pygame.Rect(x, y, width, height)
+            x += width
+            shelf_height = max(shelf_height, height)
+
+        surface = pygame.Surface((ATLAS_WIDTH, y + shelf_height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        for name, rect in positions.items():
+            surface.blit(raws[name], rect, special_flags=pygame.BLEND_RGBA_MAX)  # Точная копия пикселей
+        surface = surface.convert_alpha()
+        self.load_time += time.perf_counter() - start
+
+        self.atlases[atlas_name] = {name: surface.subsurface(rect) for name, rect in positions.items()}
+        return self.atlases[atlas_name]
+
+    # Счетчики для проверки кэша
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'disk_loads': self.disk_loads,
+            'load_ms': round(self.load_time * 1000, 2),
+            'memory_bytes': self.memory_used,
+        }
@@ -0,0 +1,252 @@
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from level import EXIT, WALL
+from loader import prepare_level
+from replay import RESULTS, unpack_keys
+from simulation import TICK_MS, movement
+
+PLAYER_SIZE = (25, 35)  # Размер прямоугольника игрока (mario.png)
+SPAWN_OFFSET = 15  # Отступ игрока от угла клетки появления, как у main.Player
+# Смещение за такт по коду клавиш (биты как в replay.pack_keys) - та же нормализация, что у одного игрока
+MOVES = np.array([movement(*unpack_keys(code)) for code in range(16)])
+STEP, RESET, STOP = 0, 1, 2  # Команды процессам-исполнителям
+TIMELINE_CAPACITY = 1024  # Начальный запас тактов в шкале состояний опасностей (растет удвоением)
+
+
+# Дробная координата так же, как при присваивании pygame.Rect.x: половины округляются от нуля
+def rect_round(values):
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int32)
+
+
+# Много независимых забегов по одному уровню: один такт - одна операция на весь массив.
+# Движение, столкновения со стенами, выход и опасности - по тем же правилам, что Simulation.step.
+# У каждого забега свое время уровня (elapsed), и любой забег можно начать заново (reset(indices)).
+# Состояние опасностей зависит только от времени уровня, поэтому поле опасностей одно: оно идет вперед
+# до самого долгого забега и запоминает состояние каждого такта, а забег берет состояние своего такта
+class MazeBatch:
+    def __init__(self, grid, hazards, spawn, count, player_size=PLAYER_SIZE, max_ticks=None, arrays=None):
+        if grid.width is None:
+            raise ValueError('batched environments need a level with fixed size')
+        self.grid = grid  # Сетка клеток уровня
+        self.hazards = hazards  # Поле опасностей, из которого строится шкала состояний по тактам
+        self.count = count  # Количество забегов
+        self.width, self.height = player_size  # Размер игрока в пикселях
+        self.start = (grid.tile_size * spawn[0] + SPAWN_OFFSET, grid.tile_size * spawn[1] + SPAWN_OFFSET)
+        self.max_ticks = max_ticks  # После стольких тактов забег заканчивается без исхода
+        self.cells = np.frombuffer(grid.cells, dtype=np.uint8)  # Коды клеток построчно
+        size = grid.tile_size
+        self.columns = np.arange((self.width - 1) // size + 2)  # Клеток под игроком по X не больше этого
+        self.rows = np.arange((self.height - 1) // size + 2)  # и по Y
+        if arrays is None:  # Свои массивы; исполнители в других процессах передают срезы общей памяти
+            arrays = (np.zeros(count, np.uint8), np.zeros((count, 2), np.int32),
+                      np.zeros(count, bool), np.zeros(count, np.uint8), np.zeros(count, np.int32))
+        # Клавиши, левый верхний угол, конец, исход и тактов с начала каждого забега
+        self.actions, self.positions, self.done, self.results, self.elapsed = arrays
+
+        # Шкала состояний опасностей: такт t - состояние после t тактов уровня (collision_state)
+        hazards.reset()
+        edges, reach = hazards.collision_state()
+        self.timeline_edges = np.empty((TIMELINE_CAPACITY, *edges.shape))
+        self.timeline_reach = np.empty((TIMELINE_CAPACITY, *reach.shape))
+        self.timeline_edges[0], self.timeline_reach[0] = edges, reach
+        self.timeline_length = 1  # Сколько тактов шкалы уже посчитано
+        self.reset()
+
+    # Забеги по уровню из levels/ для заданной сложности
+    @classmethod
+    def from_level(cls, name, difficulty, count, levels_dir='levels', **options):
+        prepared = prepare_level(name, difficulty, levels_dir)
+        return cls(prepared.grid, prepared.hazards, prepared.spawn, count, **options)
+
+    # Забеги indices (индексы или маска; по умолчанию все) с начала уровня, остальные идут дальше
+    def reset(self, indices=None):
+        if indices is None:
+            indices = slice(None)
+        self.positions[indices] = self.start
+        self.done[indices] = False
+        self.results[indices] = RESULTS[None]
+        self.elapsed[indices] = 0
+        return self.positions
+
+    # Шкала состояний опасностей до такта ticks включительно; поле идет вперед только по мере надобности
+    def _extend_timeline(self, ticks):
+        if ticks >= len(self.timeline_edges):  # Запас кончился - удваивается
+            capacity = max(ticks + 1, 2 * len(self.timeline_edges))
+            edges = np.empty((capacity, *self.timeline_edges.shape[1:]))
+            reach = np.empty((capacity, *self.timeline_reach.shape[1:]))
+            edges[:self.timeline_length] = self.timeline_edges[:self.timeline_length]
+            reach[:self.timeline_length] = self.timeline_reach[:self.timeline_length]
+            self.timeline_edges, self.timeline_reach = edges, reach
+        for tick in range(self.timeline_length, ticks + 1):
+            self.hazards.update(int(tick * TICK_MS))
+            self.timeline_edges[tick], self.timeline_reach[tick] = self.hazards.collision_state()
+        self.timeline_length = max(self.timeline_length, ticks + 1)
+
+    # Индексы клеток под прямоугольниками (с отсечением по краям уровня, как TileGrid) и маска настоящих
+    def _covered(self, left, top):
+        grid, size = self.grid, self.grid.tile_size
+        x_start = np.maximum(0, left // size)
+        x_end = np.minimum(grid.width - 1, (left + self.width - 1) // size)
+        y_start = np.maximum(0, top // size)
+        y_end = np.minimum(grid.height - 1, (top + self.height - 1) // size)
+        xs = x_start[:, None] + self.columns
+        ys = y_start[:, None] + self.rows
+        covered = (ys <= y_end[:, None])[:, :, None] & (xs <= x_end[:, None])[:, None, :]
+        cells = np.where(covered, ys[:, :, None] * grid.width + xs[:, None, :], 0)
+        shape = (len(left), len(self.rows) * len(self.columns))
+        return cells.reshape(shape), covered.reshape(shape)
+
+    # Есть ли под прямоугольниками клетка с кодом code
+    def _touches(self, left, top, code):
+        cells, covered = self._covered(left, top)
+        return ((self.cells[cells] == code) & covered).any(axis=1)
+
+    # Один такт всех незакончившихся забегов; actions - коды клавиш (N,) в формате replay.pack_keys.
+    # Возвращает позиции (N, 2), флаги конца (N,) и исходы (N,) в кодах replay.RESULTS
+    def step(self, actions=None):
+        if actions is not None:
+            self.actions[:] = actions
+        running = ~self.done
+        moves = MOVES[self.actions]
+        x, y = self.positions[:, 0], self.positions[:, 1]
+        # Обе проверки - от прежней позиции; сдвиг прямоугольника при проверке отбрасывает дробную часть
+        blocked_x = self._touches(x + np.trunc(moves[:, 0]).astype(np.int32), y, WALL)
+        blocked_y = self._touches(x, y + np.trunc(moves[:, 1]).astype(np.int32), WALL)
+        new_x = np.where(running & ~blocked_x, rect_round(x + moves[:, 0]), x)
+        new_y = np.where(running & ~blocked_y, rect_round(y + moves[:, 1]), y)
+        self.positions[:, 0] = new_x
+        self.positions[:, 1] = new_y
+        self.elapsed += running  # Время уровня идет только у незакончившихся забегов, как Simulation.ticks
+
+        won = running & self._touches(new_x, new_y, EXIT)
+        self._extend_timeline(int(self.elapsed.max()))
+        edges, reach = self.timeline_edges[self.elapsed], self.timeline_reach[self.elapsed]  # Опасности каждого забега
+        cells, covered = self._covered(new_x, new_y)
+        lost = running & ~won & self.hazards.collides_states(edges, reach, new_x, new_y, new_x + self.width,
+                                                             new_y + self.height, cells, covered)
+        self.results[won] = RESULTS['win']
+        self.results[lost] = RESULTS['loss']
+        self.done |= won | lost
+        if self.max_ticks is not None:
+            self.done |= self.elapsed >= self.max_ticks
+        return self.positions, self.done, self.results
+
+
+# Размещение массивов забегов в общей памяти: клавиши, конец, исход, выбор для сброса, позиции,
+# такты забегов и команда исполнителям
+def shared_arrays(buffer, count):
+    offset = -(-4 * count // 8) * 8  # Позиции выровнены по 8 байт
+    actions = np.ndarray((count,), np.uint8, buffer, 0)
+    done = np.ndarray((count,), bool, buffer, count)
+    results = np.ndarray((count,), np.uint8, buffer, 2 * count)
+    selected = np.ndarray((count,), bool, buffer, 3 * count)
+    positions = np.ndarray((count, 2), np.int32, buffer, offset)
+    elapsed = np.ndarray((count,), np.int32, buffer, offset + 8 * count)
+    command = np.ndarray((1,), np.int32, buffer, offset + 12 * count)
+    return actions, positions, done, results, elapsed, selected, command
+
+
+def shared_size(count):
+    return -(-4 * count // 8) * 8 + 12 * count + 4
+
+
+# Исполнитель: свой MazeBatch поверх среза общей памяти, такты по сигналу барьера
+def _worker(memory_name, count, start, end, name, difficulty, levels_dir, max_ticks, barrier):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    actions, positions, done, results, elapsed, selected, command = shared_arrays(memory.buf, count)
+    try:
+        batch = MazeBatch.from_level(name, difficulty, end - start, levels_dir, max_ticks=max_ticks,
+                                     arrays=(actions[start:end], positions[start:end], done[start:end],
+                                             results[start:end], elapsed[start:end]))
+        barrier.wait()  # Уровень загружен
+        while True:
+            barrier.wait()  # Команда записана
+            if command[0] == STOP:
+                break
+            if command[0] == RESET:
+                batch.reset(selected[start:end])
+            else:
+                batch.step()
+            barrier.wait()  # Такт сделан
+    except Exception:
+        barrier.abort()  # Основной процесс получит BrokenBarrierError, а не зависнет
+        raise
+    finally:
+        batch = actions = positions = done = results = elapsed = selected = command = None  # До закрытия памяти
+        memory.close()
+
+
+# Те же забеги, разделенные между процессами; массивы лежат в общей памяти и читаются без копирования.
+# У каждого исполнителя свой MazeBatch со своей шкалой опасностей, время уровня у каждого забега свое
+class ParallelMazeBatch:
+    def __init__(self, name, difficulty, count, workers, levels_dir='levels', max_ticks=None):
+        self.count = count  # Количество забегов
+        workers = max(1, min(workers, count))  # Исполнитель без забегов не нужен
+        self.memory = shared_memory.SharedMemory(create=True, size=shared_size(count))
+        (self.actions, self.positions, self.done, self.results, self.elapsed, self.selected,
+         self.command) = shared_arrays(self.memory.buf, count)
+        bounds = np.linspace(0, count, workers + 1).astype(int)  # Равные доли забегов
+        context = multiprocessing.get_context()
+        self.barrier = context.Barrier(workers + 1)
+        self.processes = [context.Process(target=_worker, name=f'maze-batch-{index}', daemon=True,
+                                          args=(self.memory.name, count, int(start), int(end), name, difficulty,
+                                                levels_dir, max_ticks, self.barrier))
+                          for index, (start, end) in enumerate(zip(bounds[:-1], bounds[1:]))]
+        for process in self.processes:
+            process.start()
+        try:
+            self.barrier.wait()  # Все исполнители загрузили уровень и сбросили свои забеги
+        except threading.BrokenBarrierError:  # Исполнитель упал - общая память не должна остаться в системе
+            self.close()
+            raise
+
+    # Команда всем исполнителям и ожидание ее выполнения
+    def _run(self, command):
+        self.command[0] = command
+        self.barrier.wait()
+        self.barrier.wait()
+
+    # Забеги indices (индексы или маска; по умолчанию все) с начала уровня, как MazeBatch.reset
+    def reset(self, indices=None):
+        if indices is None:
+            self.selected[:] = True
+        else:
+            self.selected[:] = False
+            self.selected[indices] = True
+        self._run(RESET)
+        return self.positions
+
+    # Один такт всех забегов, как MazeBatch.step
+    def step(self, actions=None):
+        if actions is not None:
+            self.actions[:] = actions
+        self._run(STEP)
+        return self.positions, self.done, self.results
+
+    # Остановка исполнителей и освобождение общей памяти
+    def close(self):
+        if self.memory is None:
+            return
+        self.command[0] = STOP
+        try:
+            self.barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:  # Исполнители уже остановились с ошибкой
+            pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        del self.actions, self.positions, self.done, self.results, self.elapsed, self.selected, self.command
+        self.memory.close()
+        self.memory.unlink()
+        self.memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,120 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from array import array
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import main as maze_game
+from loader import prepare_level
+from simulation import TICK_MS
+
+LEVEL, DIFFICULTY = 'lvl 1.txt', 1  # Волна приходит через 16 с: долгий забег без конца уровня
+FRAME_MS = TICK_MS / 4  # Кадров вчетверо больше, чем тактов: проверяется и кадр с тактом, и кадр без него
+WARMUP_FRAMES = 200  # Первые кадры собирают куски фона и кэши и не учитываются
+MAX_FRAMES = 20000  # Предел длины забега
+MEDIAN_LIMIT = 1024  # Байт, которые обычный кадр временно занимает сверх памяти в начале кадра
+PEAK_LIMIT = 6144  # То же для самого тяжелого кадра (полная перерисовка, затопление на экране)
+GROWTH_LIMIT = 8  # Байт, на которые память может в среднем вырасти за кадр (запись ввода растет на полбайта за такт)
+SEED = 2024
+
+
+# Часы игрового цикла с постоянным временем кадра: забег проходит быстрее реального времени
+class FixedClock:
+    def tick(self, framerate=0):
+        return FRAME_MS
+
+
+# Замер памяти каждого кадра через точки профилировщика игрового цикла
+class AllocationMeter:
+    enabled = False  # Панель не рисуется
+
+    def __init__(self, capacity=MAX_FRAMES):
+        self.peaks = array('q', bytes(8 * capacity))  # Временная память кадра сверх начальной
+        self.growth = array('q', bytes(8 * capacity))  # Прирост памяти за кадр
+        self.frames = 0
+        self.start = 0
+
+    def toggle(self):
+        pass
+
+    def begin_frame(self):
+        tracemalloc.reset_peak()
+        self.start = tracemalloc.get_traced_memory()[0]
+
+    def mark(self, name):
+        pass
+
+    def end_frame(self):
+        current, peak = tracemalloc.get_traced_memory()
+        if self.frames < len(self.peaks):
+            self.peaks[self.frames] = peak - self.start
+            self.growth[self.frames] = current - self.start
+        self.frames += 1
+
+    def draw(self, screen):
+        pass
+
+
+# Ввод: клавиши держатся по нескольку тактов; список готов заранее, чтобы сам бот не выделял память
+def scripted_keys(count, seed=SEED):
+    rng = random.Random(seed)
+    choices = [(False, False, False, False), (True, False, False, False), (False, True, False, False),
+               (False, False, True, False), (False, False, False, True), (False, True, False, True)]
+    keys = []
+    while len(keys) < count:
+        keys.extend([rng.choice(choices)] * rng.randint(5, 40))
+    return keys
+
+
+# Забег с замером памяти каждого кадра: (кадров, исход, медиана, 99%, максимум временной памяти, прирост за кадр)
+def measure_run():
+    directory = tempfile.mkdtemp()
+    root = os.getcwd()
+    read_keys = maze_game.read_keys
+    try:
+        # Забег идет в копии data/ и levels/: записи, история и кэши не попадают в каталог игры
+        shutil.copytree('data', os.path.join(directory, 'data'))
+        shutil.copytree('levels', os.path.join(directory, 'levels'))
+        os.chdir(directory)
+
+        game = maze_game.Game()
+        game.clock = FixedClock()
+        game.profiler = meter = AllocationMeter()
+        keys = iter(scripted_keys(MAX_FRAMES))
+        maze_game.read_keys = lambda: next(keys)
+        prepared = prepare_level(LEVEL, DIFFICULTY)
+
+        tracemalloc.start()
+        try:
+            result = maze_game.play_level(game, prepared)
+        finally:
+            tracemalloc.stop()
+        game.run_history.close()
+    finally:
+        maze_game.read_keys = read_keys
+        os.chdir(root)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    frames = min(meter.frames, MAX_FRAMES)
+    peaks = sorted(meter.peaks[WARMUP_FRAMES:frames])
+    growth = sum(meter.growth[WARMUP_FRAMES:frames]) / max(1, frames - WARMUP_FRAMES)
+    return frames, result, peaks[len(peaks) // 2], peaks[len(peaks) * 99 // 100], peaks[-1], growth
+
+
+def main():
+    frames, result, median, p99, peak, growth = measure_run()
+    print(f'{LEVEL}, сложность {DIFFICULTY}: {frames} кадров, исход {result}')
+    print(f'временная память кадра, байт: медиана {median} (предел {MEDIAN_LIMIT}), '
+          f'99% {p99}, максимум {peak} (предел {PEAK_LIMIT})')
+    print(f'прирост памяти за кадр в среднем: {growth:.2f} байт (предел {GROWTH_LIMIT})')
+    if median > MEDIAN_LIMIT or peak > PEAK_LIMIT or growth > GROWTH_LIMIT:
+        print('ПРЕВЫШЕН ПРЕДЕЛ')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
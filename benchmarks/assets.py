@@ -0,0 +1,53 @@
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+from assets import AssetManager
+
+SCREENS = ['menu_background.png', 'stats_background.png', 'settings_background.png', 'win.png',
+           'gameover.png']  # Фоны экранов, загружаемые при каждом входе
+ENTRIES = 50  # Сколько раз открывается каждый экран
+
+
+# Старая загрузка: чтение и конвертация при каждом входе на экран
+def load_every_time(name):
+    try:
+        image = pygame.image.load(os.path.join('data', name))
+    except FileNotFoundError:
+        image = pygame.image.load(os.path.join('data', 'missing.png'))
+    return image.convert_alpha()
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((800, 600))
+
+    start = time.perf_counter()
+    for _ in range(ENTRIES):
+        for name in SCREENS:
+            load_every_time(name)
+    legacy_ms = (time.perf_counter() - start) * 1000 / (ENTRIES * len(SCREENS))
+
+    assets = AssetManager('data')
+    assets.preload(SCREENS).join()  # Фоновая загрузка, как во время предыдущего экрана
+    for name in SCREENS:  # Первый вход: конвертация уже прочитанных файлов
+        assets.image(name)
+    disk_loads = assets.disk_loads
+    start = time.perf_counter()
+    for _ in range(ENTRIES - 1):  # Повторные входы
+        for name in SCREENS:
+            assets.image(name)
+    cached_ms = (time.perf_counter() - start) * 1000 / ((ENTRIES - 1) * len(SCREENS))
+
+    stats = assets.stats()
+    print(f'без кэша: {legacy_ms:.3f} мс на вход, с кэшем: {cached_ms:.4f} мс на вход')
+    print(f"попаданий в кэш: {stats['hit_rate']:.1%}, время загрузки: {stats['load_ms']} мс")
+    print(f"чтений с диска в основном потоке: {stats['disk_loads']}, "
+          f"из них при повторных входах: {stats['disk_loads'] - disk_loads}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from batch import MazeBatch, ParallelMazeBatch
+from benchmarks.timestep import LEVELS, MAX_TICKS, path_follower, shortest_path
+from hazards import HazardField, load_hazards
+from level import TILE_SIZE
+from level_pack import load_compiled_level
+from replay import RESULTS, pack_keys, unpack_keys
+from simulation import Simulation
+
+CHECK_ENVS = 16  # Забегов на уровень при сверке с Simulation: половина - бот, половина - случайный ввод
+DIFFICULTIES = [0, 3]  # Без выбора сложности волна догоняет, на сложной бот успевает
+COUNTS = [1, 16, 256, 4096]  # Количество забегов в пачке
+WORKERS = [1, 2, 4]  # Процессов-исполнителей
+TICKS = 200  # Тактов на замер
+SCALAR_LIMIT = 256  # Больше одиночных симуляций не запускается (оценка по меньшему количеству)
+LEVEL, DIFFICULTY = 'lvl 1.txt', 3  # Уровень для замеров скорости
+
+
+# Случайный ввод, который держит клавиши несколько тактов подряд
+def random_actions(ticks, count, seed=0):
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, 16, (ticks, count), dtype=np.uint8)
+    hold = rng.random((ticks, count)) < 0.9
+    for tick in range(1, ticks):
+        actions[tick][hold[tick]] = actions[tick - 1][hold[tick]]
+    return actions
+
+
+def new_simulation(level, name, difficulty):
+    rect = pygame.Rect(TILE_SIZE * level.spawn[0] + 15, TILE_SIZE * level.spawn[1] + 15, 25, 35)
+    grid = level.grid()
+    return Simulation(grid, rect, HazardField(load_hazards(name, difficulty), grid))
+
+
+# Сверка пачки с одиночными симуляциями такт за тактом: позиции, флаги конца и исходы.
+# Закончившийся забег один раз начинается заново (reset по индексам) - дальше у забегов разное время уровня
+def check():
+    failures = 0
+    for name in LEVELS:
+        level = load_compiled_level(name)
+        for difficulty in DIFFICULTIES:
+            batch = MazeBatch.from_level(name, difficulty, CHECK_ENVS)
+            simulations = [new_simulation(level, name, difficulty) for _ in range(CHECK_ENVS)]
+            bots = [path_follower(shortest_path(level), simulation.player_rect)
+                    for simulation in simulations[:CHECK_ENVS // 2]]
+            noise = random_actions(MAX_TICKS, CHECK_ENVS, seed=difficulty)
+            mismatches = restarts = 0
+            restarted = np.zeros(CHECK_ENVS, bool)
+            for tick in range(MAX_TICKS):
+                actions = noise[tick].copy()
+                for index, bot in enumerate(bots):
+                    actions[index] = pack_keys(*bot())
+                positions, done, results = batch.step(actions)
+                for index, simulation in enumerate(simulations):
+                    simulation.step(unpack_keys(int(actions[index])))
+                    expected = (simulation.player_rect.x, simulation.player_rect.y, simulation.result is not None,
+                                RESULTS[simulation.result])
+                    mismatches += expected != (*positions[index].tolist(), bool(done[index]), int(results[index]))
+                finished = np.flatnonzero(done & ~restarted)
+                batch.reset(finished)
+                restarted[finished] = True
+                restarts += len(finished)
+                for index in finished.tolist():
+                    simulations[index] = new_simulation(level, name, difficulty)
+                    if index < len(bots):
+                        bots[index] = path_follower(shortest_path(level), simulations[index].player_rect)
+                if done.all():
+                    break
+            outcome = np.bincount(results, minlength=3)
+            print(f'{name:>10} сложность {difficulty}: тактов {tick + 1:>5}, перезапусков {restarts:>2}, '
+                  f'побед {outcome[1]:>2}, поражений {outcome[2]:>2}, расхождений {mismatches}')
+            failures += mismatches
+    return failures
+
+
+# Скорость в шагах забегов в секунду
+def throughput(step, reset, count, actions):
+    reset()
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        step(actions[tick])
+    return count * TICKS / (time.perf_counter() - start)
+
+
+def scalar_throughput(count, actions):
+    level = load_compiled_level(LEVEL)
+    count = min(count, SCALAR_LIMIT)
+    simulations = [new_simulation(level, LEVEL, DIFFICULTY) for _ in range(count)]
+    keys = [[unpack_keys(int(code)) for code in row[:count]] for row in actions]
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        for simulation, pressed in zip(simulations, keys[tick]):
+            simulation.step(pressed)
+    return count * TICKS / (time.perf_counter() - start)
+
+
+def main():
+    failures = check()
+
+    print(f'\nшагов забегов в секунду, {LEVEL}, сложность {DIFFICULTY}, ядер: {os.cpu_count()}')
+    print(f"{'забегов':>8} {'Simulation':>11} {'MazeBatch':>11}" + ''.join(f"{f'{n} проц.':>11}" for n in WORKERS))
+    for count in COUNTS:
+        actions = random_actions(TICKS, count, seed=count)
+        row = f'{count:>8} {scalar_throughput(count, actions):>11.0f}'
+        batch = MazeBatch.from_level(LEVEL, DIFFICULTY, count)
+        row += f' {throughput(batch.step, batch.reset, count, actions):>11.0f}'
+        for workers in WORKERS:
+            with ParallelMazeBatch(LEVEL, DIFFICULTY, count, workers) as parallel:
+                row += f' {throughput(parallel.step, parallel.reset, count, actions):>11.0f}'
+        print(row)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
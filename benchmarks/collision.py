@@ -0,0 +1,54 @@
+import random
+import time
+
+import pygame
+
+from benchmarks.mazes import random_maze
+from level import TILE_SIZE, WALL, TileGrid
+
+SIZES = [(31, 22), (100, 100), (300, 300), (1000, 1000)]  # Размеры лабиринтов в клетках
+QUERIES = 20000  # Количество проверок на каждый размер
+PLAYER_SIZE = (25, 35)  # Размер спрайта игрока (mario.png)
+
+
+# Старая проверка: перебор всех стен уровня
+def linear_scan(walls, rect):
+    return any(rect.colliderect(wall) for wall in walls)
+
+
+def bench(width, height):
+    grid = TileGrid(random_maze(width, height, seed=width))  # Сетка строится один раз
+    rng = random.Random(1)
+    rects = [pygame.Rect(rng.randrange(width * TILE_SIZE), rng.randrange(height * TILE_SIZE), *PLAYER_SIZE)
+             for _ in range(QUERIES)]  # Случайные положения игрока
+
+    start = time.perf_counter()
+    for rect in rects:  # Две проверки по осям и проверка выхода, как в кадре игры
+        grid.collides(rect)
+        grid.collides(rect)
+        grid.at_exit(rect)
+    per_frame = (time.perf_counter() - start) / QUERIES * 1e6  # Микросекунды на кадр
+
+    linear = None
+    if width * height <= 100 * 100:  # Перебор на больших картах слишком долгий
+        walls = [pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                 for y in range(height) for x in range(width) if grid.cell(x, y) == WALL]
+        sample = rects[:200]
+        start = time.perf_counter()
+        for rect in sample:
+            linear_scan(walls, rect)
+            linear_scan(walls, rect)
+        linear = (time.perf_counter() - start) / len(sample) * 1e6
+    return per_frame, linear
+
+
+def main():
+    print(f"{'размер':>12} {'сетка, мкс/кадр':>18} {'перебор, мкс/кадр':>20}")
+    for width, height in SIZES:
+        per_frame, linear = bench(width, height)
+        linear_text = f'{linear:.1f}' if linear is not None else '-'
+        print(f'{width:>5}x{height:<6} {per_frame:>18.2f} {linear_text:>20}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+from hazards import HORIZONTAL, HazardField, HazardSpec
+from level import TILE_SIZE
+from level_pack import load_compiled_level
+from rendering import Camera, ChunkRenderer, DirtyRectRenderer
+from simulation import TICK_MS, move_player, movement
+
+WIDTH, HEIGHT = 800, 600  # Размеры окна игры
+# Сценарий: стоим, пока проходит волна, затем ходим в углу уровня, где камера упирается в край
+SCRIPT = [(0, 0, 0, 0)] * 150 + [(0, 1, 0, 0)] * 30 + [(0, 0, 0, 1)] * 20 + [(1, 0, 0, 0)] * 30 + [(0, 0, 0, 0)] * 100
+
+
+def run(dirty):
+    screen = pygame.display.get_surface()
+    images = {name: pygame.image.load(os.path.join('data', file)).convert_alpha()
+              for name, file in [('wall', 'wall.png'), ('empty', 'floor.png'), ('exit', 'exit.png'),
+                                 ('player', 'mario.png')]}
+    level = load_compiled_level('lvl 1.txt')
+    grid = level.grid()
+    level_width, level_height = level.width * TILE_SIZE, level.height * TILE_SIZE
+    player = pygame.sprite.Sprite()
+    player.image = images['player']
+    player.rect = player.image.get_rect().move(TILE_SIZE * level.spawn[0] + 15, TILE_SIZE * level.spawn[1] + 15)
+    # Волна запускается на 10-м кадре и проходит быстрее, чтобы уложиться в сценарий
+    hazards = HazardField([HazardSpec(HORIZONTAL, 10 * TICK_MS, speed=6)], grid)
+    camera = Camera(WIDTH, HEIGHT, level_width, level_height)
+    background = ChunkRenderer(grid, images)
+    font = pygame.font.Font(None, 36)
+    renderer = DirtyRectRenderer(screen)
+    timer_text = font.render('Время: 00:00', True, pygame.Color('white'))
+
+    def draw_scene():
+        screen.fill((0, 0, 0))
+        background.draw(screen, camera)
+        hazards.draw(screen, camera)
+        screen.blit(player.image, camera.apply(player))
+        screen.blit(timer_text, (10, 10))
+
+    pixels = 0
+    start = time.perf_counter()
+    for frame, keys in enumerate(SCRIPT):
+        move_player(player.rect, *movement(*keys), grid)
+        hazards.update(frame * TICK_MS)  # Один такт на кадр
+        camera.update(player)
+        timer_string = f'Время: 00:{frame // 50:02}'  # Секунда меняется каждые 50 кадров
+        timer_text = font.render(timer_string, True, pygame.Color('white'))
+        if dirty:
+            renderer.frame(camera.camera.topleft, {
+                'player': (camera.apply(player), None),
+                'wave': (hazards.bounds(camera), None),
+                'timer': (timer_text.get_rect(topleft=(10, 10)), timer_string),
+            }, draw_scene)
+            pixels += renderer.pixels
+        else:
+            draw_scene()
+            pygame.display.flip()
+            pixels += WIDTH * HEIGHT
+    elapsed = (time.perf_counter() - start) / len(SCRIPT) * 1000
+
+    shown = screen.copy()  # Итоговый кадр должен совпасть с полной перерисовкой
+    draw_scene()
+    same = pygame.image.tostring(shown, 'RGB') == pygame.image.tostring(screen, 'RGB')
+    return elapsed, pixels / len(SCRIPT), renderer.full_frames, same
+
+
+def main():
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    print(f"{'режим':>18} {'мс/кадр':>8} {'пикселей/кадр':>14} {'полных кадров':>14} {'кадр верный':>12}")
+    for name, dirty in [('весь экран', False), ('измененные области', True)]:
+        elapsed, pixels, full_frames, same = run(dirty)
+        print(f'{name:>18} {elapsed:>8.3f} {pixels:>14.0f} {full_frames if dirty else len(SCRIPT):>14} '
+              f'{"да" if same else "НЕТ":>12}')
+
+
+if __name__ == '__main__':
+    main()
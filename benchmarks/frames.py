@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from array import array
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import main as maze_game
+from benchmarks.mazes import random_maze
+from loader import prepare_level
+from profiler import PHASES as GAME_PHASES
+from simulation import TICK_MS
+
+SHIPPED_LEVELS = ['lvl 1.txt', 'lvl 2.txt', 'lvl 3.txt', 'lvl 4.txt', 'lvl 5.txt']  # Уровни из levels/
+GENERATED_SIZES = [50, 200, 1000, 2000]  # Стороны сгенерированных лабиринтов в клетках
+DIFFICULTY = 0  # Сложность не выбрана: волна идет сразу, ее стоимость входит в кадры
+# Режимы игры: настройка тумана и вывод только изменившихся областей
+MODES = {'обычный': (False, False), 'туман': (True, False), 'области': (False, True)}
+PHASES = GAME_PHASES + ['frame']  # Фазы кадра play_level и кадр целиком
+DIRECTIONS = [(0, 1, 0, 0), (1, 0, 0, 0), (0, 0, 1, 0), (0, 0, 0, 1),
+              (0, 1, 0, 1), (1, 0, 1, 0), (0, 0, 0, 0)]  # Наборы нажатых A, D, W, S
+
+
+# Сценарий ввода: случайное направление, которое держится несколько кадров
+def scripted_input(frames, seed):
+    rng = random.Random(seed)
+    script = []
+    while len(script) < frames:
+        script.extend([rng.choice(DIRECTIONS)] * rng.randint(5, 40))
+    return script[:frames]
+
+
+# Пиковая память процесса в мегабайтах
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024  # На macOS значение в байтах
+
+
+# Процентиль отсортированного списка
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def load_tile_images():
+    images = {}
+    for name, file in [('wall', 'wall.png'), ('empty', 'floor.png'), ('exit', 'exit.png'), ('player', 'mario.png')]:
+        images[name] = pygame.image.load(os.path.join('data', file)).convert_alpha()
+    return images
+
+
+# Часы игрового цикла: один такт на кадр, без ожидания
+class FixedClock:
+    def tick(self, framerate=0):
+        return TICK_MS
+
+
+# Набрано нужное число кадров - забег прерывается
+class EnoughFrames(Exception):
+    pass
+
+
+# Замер фаз кадра через точки профилировщика play_level: время фазы и пиковая память после нее
+class PhaseRecorder:
+    enabled = False  # Панель не рисуется
+
+    def __init__(self, frames):
+        self.limit = frames  # Сколько кадров записать
+        self.times = {phase: array('q') for phase in PHASES}  # Длительность фаз в нс по кадрам
+        self.rss = dict.fromkeys(PHASES, 0.0)  # Пиковая память после фазы в МБ
+        self.rss_growth = dict.fromkeys(PHASES, 0.0)  # На сколько пиковая память выросла во время фазы
+        self.frames = 0
+        self.start = self.last = 0
+        self.last_rss = peak_rss_mb()
+        self.frame = dict.fromkeys(PHASES, 0)  # Фазы текущего кадра
+        self.seen = {'frame'}  # Фазы, которые отмечались
+
+    def toggle(self):
+        pass
+
+    def begin_frame(self):
+        self.frame = dict.fromkeys(PHASES, 0)
+        self.start = self.last = time.perf_counter_ns()
+
+    # Память снимается вне замера времени, чтобы не попасть в следующую фазу
+    def mark(self, name):
+        self.frame[name] += time.perf_counter_ns() - self.last
+        self.seen.add(name)
+        rss = peak_rss_mb()
+        self.rss[name] = max(self.rss[name], rss)
+        self.rss_growth[name] += rss - self.last_rss
+        self.last_rss = rss
+        self.last = time.perf_counter_ns()
+
+    def end_frame(self):
+        self.frame['frame'] = sum(self.frame.values())
+        self.rss['frame'] = max(self.rss['frame'], self.last_rss)
+        for phase, value in self.frame.items():
+            self.times[phase].append(value)
+        self.frames += 1
+        if self.frames >= self.limit:
+            raise EnoughFrames
+
+    def draw(self, screen):
+        pass
+
+
+# Прогон одного уровня через игровой цикл main.play_level; забег начинается заново, пока не наберется
+# frames кадров. Идет в каталоге копии игры (текущий каталог)
+def run_level(game, name, mode, frames, seed):
+    fog, dirty = MODES[mode]
+    game.settings_store.set('Туман', int(fog))
+    maze_game.DIRTY_RECT_RENDER = dirty
+    keys = iter(tuple(map(bool, keys)) for keys in scripted_input(frames * 4, seed))  # Кадр - не больше такта
+    maze_game.read_keys = lambda: next(keys, (False, False, False, False))
+    game.profiler = recorder = PhaseRecorder(frames)
+
+    start = time.perf_counter()
+    prepared = prepare_level(name, DIFFICULTY)
+    build_ms = (time.perf_counter() - start) * 1000
+    build_rss = peak_rss_mb()
+    runs = 0
+    try:
+        while True:
+            runs += 1
+            maze_game.play_level(game, prepared)
+            prepared = prepare_level(name, DIFFICULTY)  # Забег окончен раньше - такой же забег заново
+    except EnoughFrames:
+        pass
+
+    grid = prepared.grid
+    result = {'level': f'{name} {mode}', 'size': [grid.width, grid.height], 'frames': frames, 'runs': runs,
+              'build_ms': round(build_ms, 2), 'build_peak_rss_mb': round(build_rss, 1),
+              'frames_peak_rss_mb': round(peak_rss_mb(), 1), 'phases': {}}
+    recorder.rss_growth['frame'] = sum(recorder.rss_growth.values())
+    for phase in PHASES:
+        if phase not in recorder.seen:  # Фаза не отмечалась в этом режиме (flip при выводе областей)
+            continue
+        values = sorted(value / 1e6 for value in recorder.times[phase])
+        stats = {key: round(percentile(values, fraction), 4)
+                 for key, fraction in [('p50', 0.5), ('p95', 0.95), ('p99', 0.99)]}
+        stats['peak_rss_mb'] = round(recorder.rss[phase], 1)
+        stats['rss_growth_mb'] = round(recorder.rss_growth[phase], 2)
+        result['phases'][phase] = stats
+    return result
+
+
+# Текущий коммит, чтобы результаты можно было сравнивать между коммитами
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results, baseline=None):
+    previous = {run['level']: run for run in baseline['runs']} if baseline else {}
+    print(f"{'уровень, режим':>24} {'фаза':>10} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} "
+          f"{'RSS, МБ':>8} {'прирост':>8}")
+    for run in results['runs']:
+        print(f"{run['level']:>24} {'сборка':>10} {run['build_ms']:>9.1f} {'':>9} {'':>9} "
+              f"{run['build_peak_rss_mb']:>8.1f}")
+        for phase, stats in run['phases'].items():
+            line = (f"{run['level']:>24} {phase:>10} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f} "
+                    f"{stats['peak_rss_mb']:>8.1f} {stats['rss_growth_mb']:>8.2f}")
+            old_phases = previous.get(run['level'], {}).get('phases', {})
+            if phase in old_phases:  # Изменение p95 относительно сохраненного прогона
+                old = old_phases[phase]['p95']
+                line += f"  p95 {'+' if stats['p95'] >= old else ''}{(stats['p95'] - old) / old * 100 if old else 0:.0f}%"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер времени кадра игры без окна')
+    parser.add_argument('--frames', type=int, default=500, help='кадров на уровень')
+    parser.add_argument('--sizes', type=int, nargs='*', default=GENERATED_SIZES,
+                        help='стороны сгенерированных лабиринтов')
+    parser.add_argument('--modes', nargs='*', default=list(MODES), choices=list(MODES), help='режимы игры')
+    parser.add_argument('--seed', type=int, default=0, help='зерно сценария ввода и лабиринтов')
+    parser.add_argument('--output', help='куда сохранить результаты в JSON')
+    parser.add_argument('--compare', help='JSON предыдущего прогона для сравнения')
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    compare = os.path.abspath(args.compare) if args.compare else None
+
+    results = {'commit': git_commit(), 'timestamp': time.time(), 'frames': args.frames, 'runs': []}
+    directory = tempfile.mkdtemp()
+    root = os.getcwd()
+    read_keys, dirty_render = maze_game.read_keys, maze_game.DIRTY_RECT_RENDER
+    try:
+        # Забеги идут в копии data/ и levels/: записи, история, настройки и кэши не попадают в каталог игры
+        shutil.copytree('data', os.path.join(directory, 'data'))
+        shutil.copytree('levels', os.path.join(directory, 'levels'))
+        os.chdir(directory)
+        names = list(SHIPPED_LEVELS)
+        for size in args.sizes:
+            names.append(f'maze {size}x{size}.txt')
+            with open(os.path.join('levels', names[-1]), 'w', encoding='utf-8') as file:
+                file.write('\n'.join(random_maze(size, size, seed=args.seed + size)))
+
+        game = maze_game.Game()
+        game.clock = FixedClock()
+        for name in names:
+            for mode in args.modes:
+                results['runs'].append(run_level(game, name, mode, args.frames, args.seed))
+        game.run_history.close()
+    finally:
+        maze_game.read_keys, maze_game.DIRTY_RECT_RENDER = read_keys, dirty_render
+        os.chdir(root)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    baseline = None
+    if compare:
+        with open(compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+    print_report(results, baseline)
+    if output:
+        with open(output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+from benchmarks.mazes import random_maze
+from hazards import FLOOD, GATE, HORIZONTAL, SCALAR_LIMIT, VERTICAL, HazardField, HazardSpec
+from level import TILE_SIZE, TileGrid
+from rendering import Camera
+from simulation import TICK_MS
+
+WIDTH, HEIGHT = 800, 600  # Размеры окна игры
+COUNTS = [1, 10, 100, 1000]  # Сколько волн одновременно
+SINGLE_WAVE_LIMIT = 3  # Во сколько раз такт одной волны (обычный уровень) может быть дороже цикла Wave
+TICKS = 500  # Тактов на замер
+MAZE_SIZE = 50  # Сторона лабиринта в клетках
+
+
+# Волны с разными скоростями и задержками, чтобы часть из них все время перезапускалась
+def wave_parameters(count, seed=1):
+    rng = random.Random(seed)
+    return [(rng.randrange(0, 2000, 20), rng.randint(1, 8)) for _ in range(count)]
+
+
+# Смесь всех видов опасностей (затопления - каждая двадцатая, их расчет самый дорогой)
+def mixed_specs(count, grid, seed=2):
+    rng = random.Random(seed)
+    floors = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.cell(x, y) == 0]
+    specs = []
+    for index in range(count):
+        delay = rng.randrange(0, 2000, 20)
+        if index % 20 == 19:
+            specs.append(HazardSpec(FLOOD, delay, speed=rng.randint(1, 4), cell=rng.choice(floors)))
+        elif index % 3 == 2:
+            specs.append(HazardSpec(GATE, delay, cell=rng.choice(floors), span=(rng.randint(1, 3), 1),
+                                    period=rng.randrange(500, 3000, 20), closed=rng.randrange(100, 400, 20)))
+        else:
+            specs.append(HazardSpec(rng.choice((HORIZONTAL, VERTICAL)), delay, speed=rng.randint(1, 8)))
+    return specs
+
+
+# Прежняя волна игры, по объекту на волну: эталон, с которым сравнивается поле опасностей
+class Wave:
+    def __init__(self, level_width, level_height):
+        self.active = False  # Флаг активности волны
+        self.level_width = level_width  # Ширина уровня
+        self.level_height = level_height  # Высота уровня
+        self.y_position = 0  # Текущая позиция волны
+        self.speed = 3  # Скорость движения волны
+        self.height = 30  # Высота волны
+
+    # Активация волны
+    def activate(self):
+        self.active = True  # Установка флага активности
+        self.y_position = 0  # Сброс позиции волны
+
+    # Обновление позиции волны
+    def update(self):
+        if self.active:  # Если волна активна
+            self.y_position += self.speed  # Движение волны вниз
+            if self.y_position >= self.level_height:  # Волна дошла до низа
+                self.active = False  # Деактивация волны
+
+    # Проверка столкновения волны с игроком
+    def check_collision(self, player_rect):
+        if self.active:  # Если волна активна
+            wave_rect = pygame.Rect(0, self.y_position, self.level_width, self.height)  # Создание прямоугольника волны
+            return player_rect.colliderect(wave_rect)  # Проверка столкновения
+        return False  # Если волна не активна, столкновения нет
+
+
+# Такты списка объектов Wave: запуск, движение и проверка по одной волне
+def python_ticks(parameters, level_width, level_height, player_rect):
+    waves = []
+    for _, speed in parameters:
+        wave = Wave(level_width, level_height)
+        wave.speed = speed
+        waves.append(wave)
+    start = time.perf_counter()
+    for tick in range(1, TICKS + 1):
+        elapsed = tick * TICK_MS
+        for wave, (delay, _) in zip(waves, parameters):
+            if not wave.active and elapsed >= delay:
+                wave.activate()
+            if wave.active:
+                wave.update()
+                wave.check_collision(player_rect)
+    return (time.perf_counter() - start) / TICKS * 1e6
+
+
+# Такты поля опасностей: одно обновление и одна проверка на все волны
+def field_ticks(field, player_rect):
+    start = time.perf_counter()
+    for tick in range(1, TICKS + 1):
+        field.update(tick * TICK_MS)
+        field.collides(player_rect)
+    return (time.perf_counter() - start) / TICKS * 1e6
+
+
+# Отрисовка кадра с опасностями
+def draw_frames(field, screen, camera):
+    start = time.perf_counter()
+    for _ in range(100):
+        field.draw(screen, camera, 0.5)
+    return (time.perf_counter() - start) / 100 * 1e6
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    grid = TileGrid(random_maze(MAZE_SIZE, MAZE_SIZE, seed=1))
+    level_width, level_height = grid.width * TILE_SIZE, grid.height * TILE_SIZE
+    player_rect = pygame.Rect(level_width // 2, level_height // 2, 25, 35)  # Игрок стоит в центре
+    camera = Camera(WIDTH, HEIGHT, level_width, level_height)
+    camera.follow(player_rect)
+
+    # Поле выбирает способ по числу опасностей (циклом до SCALAR_LIMIT); оба способа замеряются отдельно
+    print(f"{'волн':>6} {'цикл Wave':>10} {'списки':>9} {'NumPy':>9} {'поле':>9} {'ускорение':>10} "
+          f"{'смесь':>9} {'отрисовка':>10}   (мкс; порог списков {SCALAR_LIMIT})")
+    loop_costs, field_costs = [], []
+    for count in COUNTS:
+        parameters = wave_parameters(count)
+        specs = [HazardSpec(HORIZONTAL, delay, speed=speed) for delay, speed in parameters]
+        loop_cost = python_ticks(parameters, level_width, level_height, player_rect)
+        scalar_cost = field_ticks(HazardField(specs, grid, scalar_limit=count), player_rect)
+        numpy_cost = field_ticks(HazardField(specs, grid, scalar_limit=0), player_rect)
+        field_cost = scalar_cost if count <= SCALAR_LIMIT else numpy_cost  # Способ, который выберет поле
+        mixed = HazardField(mixed_specs(count, grid), grid)
+        mixed_cost = field_ticks(mixed, player_rect)
+        draw_cost = draw_frames(mixed, screen, camera)
+        loop_costs.append(loop_cost)
+        field_costs.append(field_cost)
+        print(f'{count:>6} {loop_cost:>10.1f} {scalar_cost:>9.1f} {numpy_cost:>9.1f} {field_cost:>9.1f} '
+              f'{loop_cost / field_cost:>9.1f}x {mixed_cost:>9.1f} {draw_cost:>10.1f}')
+
+    growth = COUNTS[-1] / COUNTS[0]
+    loop_growth = loop_costs[-1] / loop_costs[0]
+    field_growth = field_costs[-1] / field_costs[0]
+    print(f'рост стоимости такта при {growth:.0f}x волн: цикл Wave {loop_growth:.0f}x, поле {field_growth:.1f}x')
+    print(f'одна волна: поле {field_costs[0]:.1f} мкс, цикл Wave {loop_costs[0]:.1f} мкс '
+          f'(предел {SINGLE_WAVE_LIMIT}x)')
+    print('отрисовка растет с площадью полупрозрачных полос и клеток на экране, а не с числом опасностей')
+    if field_growth >= growth / 10:  # Стоимость должна расти намного медленнее числа волн
+        sys.exit(1)
+    if field_costs[0] > loop_costs[0] * SINGLE_WAVE_LIMIT:  # Обычный уровень не должен стать медленнее
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+from benchmarks.frames import load_tile_images
+from benchmarks.mazes import random_maze
+from hazards import HazardField, load_hazards
+from hotreload import LevelWatcher
+from level import TILE_SIZE
+from level_pack import compile_level, read_compiled
+from rendering import Camera, ChunkRenderer
+
+WIDTH, HEIGHT = 800, 600  # Размеры окна игры
+SIZES = [100, 1000, 3000]  # Стороны лабиринтов в клетках
+EDITS = [1, 20, 400]  # Сколько клеток меняет правка
+FRAME = 1000 / 60  # Бюджет кадра в мс
+
+
+# Правка текста уровня: count случайных клеток внутри рамки меняются на стену или пол
+def edit_rows(rows, count, rng):
+    rows = [list(row) for row in rows]
+    for _ in range(count):
+        x, y = rng.randrange(1, len(rows[0]) - 1), rng.randrange(2, len(rows) - 2)
+        rows[y][x] = '.' if rows[y][x] == '#' else '#'
+    return [''.join(row) for row in rows]
+
+
+def write_rows(path, rows):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(rows))
+
+
+# Куски фона вокруг нескольких точек уровня уже собраны, как после прогулки игрока
+def warm_chunks(renderer, grid, screen, rng):
+    camera = Camera(WIDTH, HEIGHT, grid.width * TILE_SIZE, grid.height * TILE_SIZE)
+    for _ in range(8):
+        camera.follow(pygame.Rect(rng.randrange(grid.width) * TILE_SIZE, rng.randrange(grid.height) * TILE_SIZE, 1, 1))
+        renderer.draw(screen, camera)
+
+
+# Совпадают ли сетка и собранные куски с уровнем, построенным заново из файла
+def matches_rebuild(grid, renderer, path, images):
+    with open(path, 'rb') as file:
+        level = read_compiled(compile_level(file.read()))
+    if bytes(grid.cells) != bytes(level.cells) or grid.exits != level.exits:
+        return False
+    fresh = ChunkRenderer(level.grid(), images)
+    return all(pygame.image.tobytes(chunk, 'RGB') == pygame.image.tobytes(fresh.get_chunk(*key), 'RGB')
+               for key, chunk in renderer.chunks.items())
+
+
+def main():
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    images = load_tile_images()
+    failures = 0
+    print(f"{'размер':>10} {'клеток':>7} {'перестройка, мс':>16} {'правка, мс':>11} {'кусков':>7} {'сверка':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            rng = random.Random(size)
+            name = f'{size}.txt'
+            path = os.path.join(directory, name)
+            rows = random_maze(size, size, seed=size)
+            write_rows(path, rows)
+            with open(path, 'rb') as file:
+                grid = read_compiled(compile_level(file.read())).grid()
+            renderer = ChunkRenderer(grid, images)
+            warm_chunks(renderer, grid, screen, rng)
+            watcher = LevelWatcher(name, grid, directory, interval=0)
+            hazards = HazardField(load_hazards(name, 1, directory), grid)
+
+            for count in EDITS:
+                rows = edit_rows(rows, count, rng)
+                write_rows(path, rows)
+                os.utime(path, ns=(time.time_ns(), time.time_ns() + count))  # Время изменения точно другое
+
+                # Прежний путь: уровень и все собранные куски строятся заново
+                start = time.perf_counter()
+                with open(path, 'rb') as file:
+                    rebuilt = read_compiled(compile_level(file.read())).grid()
+                fresh = ChunkRenderer(rebuilt, images)
+                for key in renderer.chunks:
+                    fresh.get_chunk(*key)
+                rebuild = time.perf_counter() - start
+
+                # Горячая перезагрузка: разница с сеткой и только изменившиеся клетки в кусках
+                start = time.perf_counter()
+                patch = watcher.poll()
+                patched = renderer.patch_cells(patch.cells)
+                if patch.walls_changed:
+                    hazards.refresh_floods()
+                reload = time.perf_counter() - start
+
+                ok = not patch.resized and matches_rebuild(grid, renderer, path, images)
+                failures += not ok
+                print(f'{size:>4}x{size:<5} {count:>7} {rebuild * 1000:>16.1f} {reload * 1000:>11.2f} '
+                      f'{patched:>7} {"да" if ok else "НЕТ":>7}')
+    print(f'правка должна укладываться в кадр ({FRAME:.1f} мс)')
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
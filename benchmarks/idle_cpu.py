@@ -0,0 +1,156 @@
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+import ui
+from assets import AssetManager
+from persistence import RunHistory, SettingsStore
+
+FPS = 50  # Частота кадров старых экранов
+IDLE_SECONDS = 3  # Сколько секунд экран стоит без ввода
+IDLE_CPU_LIMIT = 0.03  # Допустимая доля загрузки ядра (dummy-драйвер SDL сам ждет событий опросом, это около 2%)
+# На dummy-драйвере кадр почти ничего не стоит, поэтому холостые кадры видны по числу вызовов, а не по загрузке:
+REDRAW_LIMIT = 2  # Сколько раз экран без ввода может вывести кадр
+WAKEUPS_PER_SECOND = 2  # Сколько раз в секунду он может обращаться к очереди событий (настройки - раз в секунду)
+CENTER_X, CENTER_Y = ui.WIDTH // 2, ui.HEIGHT // 2
+# Экраны игры и куда щелкнуть, чтобы выйти из них (кнопки "Играть" и "Назад"); экран результата
+# закрывается сам через 5 секунд
+SCREENS = {
+    'меню': (ui.main_menu, (CENTER_X, CENTER_Y - 50)),
+    'настройки': (ui.settings, (CENTER_X, CENTER_Y + 200)),
+    'статистика': (ui.stats_screen, (CENTER_X, CENTER_Y + 150)),
+    'результат': (ui.win, None),
+}
+
+
+# Игра для экранов ui без main.Game: окно, ресурсы и хранилища во временном каталоге
+class IdleGame:
+    def __init__(self, directory):
+        self.screen = pygame.display.get_surface()  # Окно создается до игры
+        self.assets = AssetManager('data')
+        self.settings_store = SettingsStore(os.path.join(directory, 'settings.txt'), {'Сложность': 0, 'Туман': 0})
+        self.run_history = RunHistory(os.path.join(directory, 'stats.db'))
+
+    def terminate(self):
+        raise RuntimeError('окно закрыто во время замера')
+
+    def close(self):
+        self.run_history.close()
+
+
+# Старое меню: перерисовка и flip 50 раз в секунду
+def legacy_menu(screen, background, items):
+    clock = pygame.time.Clock()
+    end = time.monotonic() + IDLE_SECONDS
+    while time.monotonic() < end:
+        screen.blit(background, (0, 0))
+        for surface, position in items:
+            screen.blit(surface, position)
+        pygame.event.get()
+        pygame.display.flip()
+        clock.tick(FPS)
+
+
+# Подсчет выводов кадра и обращений к очереди событий, пока открыт блок with
+class CallCounter:
+    CALLS = {'redraws': [(pygame.display, 'flip'), (pygame.display, 'update')],
+             'wakeups': [(pygame.event, 'wait'), (pygame.event, 'get'), (pygame.event, 'poll'), (pygame.event, 'pump')]}
+
+    def __init__(self):
+        self.redraws = self.wakeups = 0
+        self.originals = []
+
+    def _wrap(self, kind, function):
+        def counted(*args, **kwargs):
+            setattr(self, kind, getattr(self, kind) + 1)
+            return function(*args, **kwargs)
+        return counted
+
+    def __enter__(self):
+        for kind, targets in self.CALLS.items():
+            for module, name in targets:
+                function = getattr(module, name)
+                self.originals.append((module, name, function))
+                setattr(module, name, self._wrap(kind, function))
+        return self
+
+    def __exit__(self, *exc_info):
+        for module, name, function in self.originals:
+            setattr(module, name, function)
+        self.originals = []
+
+
+# Доля процессорного времени за время работы функции
+def cpu_share(function, *args):
+    wall, cpu = time.monotonic(), time.process_time()
+    result = function(*args)
+    return (time.process_time() - cpu) / (time.monotonic() - wall), result
+
+
+# Настоящий экран игры, который seconds секунд стоит без ввода (затем щелчок по кнопке выхода приходит
+# таймером SDL): доля процессорного времени, выводы кадра, обращения к очереди событий и длительность
+def idle_screen(game, name, seconds=IDLE_SECONDS):
+    function, click = SCREENS[name]
+    pygame.event.clear()
+    if click is not None:
+        pygame.time.set_timer(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=click, button=1), int(seconds * 1000), 1)
+    start = time.monotonic()
+    with CallCounter() as counter:
+        share, _ = cpu_share(function, game)
+    return share, counter.redraws, counter.wakeups, time.monotonic() - start
+
+
+# Превышенные пределы экрана без ввода (пустой список - экран не работает вхолостую)
+def idle_problems(share, redraws, wakeups, seconds):
+    problems = []
+    if share > IDLE_CPU_LIMIT:
+        problems.append(f'загрузка ядра {share:.1%} (предел {IDLE_CPU_LIMIT:.0%})')
+    if redraws > REDRAW_LIMIT:
+        problems.append(f'{redraws} кадров (предел {REDRAW_LIMIT})')
+    if wakeups > WAKEUPS_PER_SECOND * seconds + 2:
+        problems.append(f'{wakeups} обращений к очереди событий за {seconds:.1f} с')
+    return problems
+
+
+# Фон и пункты главного меню (окно должно быть создано)
+def menu_scene():
+    background = pygame.image.load(os.path.join('data', 'menu_background.png')).convert()
+    font = pygame.font.Font(None, 50)
+    items = [(font.render(text, True, pygame.Color('white')), (300, 200 + 50 * i))
+             for i, text in enumerate(['Играть', 'Статистика', 'Настройки', 'Выход'])]
+    return background, items
+
+
+def main():
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((ui.WIDTH, ui.HEIGHT))
+    background, items = menu_scene()
+    with CallCounter() as counter:
+        legacy, _ = cpu_share(legacy_menu, screen, background, items)
+    print(f"{'экран':>12} {'ядро':>6} {'кадров':>7} {'событий':>8} {'секунд':>7}")
+    print(f"{'старое меню':>12} {legacy:>6.1%} {counter.redraws:>7} {counter.wakeups:>8} {IDLE_SECONDS:>7.1f}")
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        game = IdleGame(directory)
+        try:
+            for name in SCREENS:
+                share, redraws, wakeups, seconds = idle_screen(game, name)
+                print(f'{name:>12} {share:>6.1%} {redraws:>7} {wakeups:>8} {seconds:>7.1f}')
+                for problem in idle_problems(share, redraws, wakeups, seconds):
+                    print(f'  {problem}')
+                    failed = True
+        finally:
+            game.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
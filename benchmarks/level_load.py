@@ -0,0 +1,52 @@
+import os
+import tempfile
+import time
+
+from benchmarks.mazes import random_maze
+from level import TileGrid, parse_level
+from level_pack import LevelPack, compile_level, load_compiled_level, write_pack
+
+SIZES = [31, 300, 1000, 2000]  # Стороны лабиринтов в клетках
+REPEATS = 5  # Повторов на каждый способ
+
+
+def timed(function):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        cache_dir = os.path.join(directory, 'cache')
+        entries = []
+        for size in SIZES:
+            with open(os.path.join(directory, f'{size}.txt'), 'w', encoding='utf-8') as file:
+                file.write('\n'.join(random_maze(size, size, seed=size)))
+            with open(os.path.join(directory, f'{size}.txt'), 'rb') as file:
+                entries.append((f'{size}.txt', compile_level(file.read())))
+        pack_path = os.path.join(directory, 'levels.pack')
+        write_pack(pack_path, entries)
+        pack = LevelPack(pack_path)
+
+        print(f"{'размер':>10} {'текст, мс':>10} {'кэш, мс':>9} {'архив, мс':>10}")
+        for size in SIZES:
+            name = f'{size}.txt'
+
+            # Старый путь: чтение и разбор текста, затем построение сетки
+            def from_text():
+                with open(os.path.join(directory, name), 'r', encoding='utf-8') as file:
+                    TileGrid(parse_level(file.read()))
+
+            load_compiled_level(name, directory, cache_dir)  # Первая загрузка строит кэш
+            cached = timed(lambda: load_compiled_level(name, directory, cache_dir).grid())
+            packed = timed(lambda: pack.level(name).grid())
+            print(f'{size:>4}x{size:<5} {timed(from_text):>10.2f} {cached:>9.2f} {packed:>10.3f}')
+        pack.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+import random
+
+
+# Генерация случайного лабиринта в формате файлов из levels/
+def random_maze(width, height, seed=0, density=0.3):
+    rng = random.Random(seed)  # Отдельный генератор, чтобы результат был воспроизводимым
+    rows = []
+    for y in range(height):  # Проход по строкам
+        if y == 0 or y == height - 1:  # Верхняя и нижняя граница - сплошная стена
+            rows.append('#' * width)
+            continue
+        row = ['#' if rng.random() < density else '.' for _ in range(width)]  # Случайные стены
+        row[0] = row[-1] = '#'  # Боковые границы
+        rows.append(''.join(row))
+    rows[1] = '#@' + rows[1][2:]  # Старт игрока в левом верхнем углу
+    rows[-2] = rows[-2][:-2] + 'E#'  # Выход в правом нижнем углу
+    return rows
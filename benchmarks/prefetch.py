@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.mazes import random_maze
+from loader import LevelLoader, prepare_level
+
+SIZES = [31, 300, 1000]  # Стороны лабиринтов в клетках
+RESULT_SCREEN = 3.0  # Сколько секунд экран результата гарантированно показан (ввод заблокирован)
+FRAME = 1 / 60  # Период опроса событий экраном результата
+
+
+# Уровень с затоплением от старта: расстояния затопления - самый дорогой этап построения
+def write_level(directory, size):
+    name = f'{size}.txt'
+    rows = random_maze(size, size, seed=size, density=0.1)
+    rows[1] = '#@.' + rows[1][3:]  # Старт не замурован: вода расходится по всему лабиринту
+    rows[2] = '#.' + rows[2][2:]
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as file:
+        file.write('\n'.join(rows))
+    with open(os.path.join(directory, f'{size}.hazards'), 'w', encoding='utf-8') as file:
+        file.write('horizontal *\nflood * delay=5000 cell=1,1 speed=1\n')
+    return name
+
+
+# Экран результата в основном потоке, пока уровень грузится в фоне: самый долгий промежуток между кадрами
+def result_screen(loader, duration):
+    longest = 0.0
+    end = time.perf_counter() + duration
+    last = time.perf_counter()
+    while True:
+        loader.wait(FRAME)  # Как экран результата: ожидание события с таймаутом
+        now = time.perf_counter()
+        longest = max(longest, now - last)
+        last = now
+        if now >= end:
+            return longest
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'размер':>10} {'в основном потоке, мс':>22} {'передача, мс':>13} {'макс. кадр, мс':>15}")
+        for size in SIZES:
+            name = write_level(directory, size)
+            cache_dir = os.path.join(directory, '.compiled')
+
+            # Прежний путь: уровень строится в основном потоке после экрана результата
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            start = time.perf_counter()
+            prepare_level(name, 1, directory)
+            synchronous = time.perf_counter() - start
+
+            # Загрузка в фоне во время экрана результата, затем передача готового уровня
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            loader = LevelLoader(directory)
+            loader.prefetch(name, 1)
+            longest = result_screen(loader, max(RESULT_SCREEN, synchronous * 1.5))
+            start = time.perf_counter()
+            loader.take(name, 1)
+            handoff = time.perf_counter() - start
+            print(f'{size:>4}x{size:<5} {synchronous * 1000:>22.1f} {handoff * 1000:>13.3f} {longest * 1000:>15.1f}')
+        print(f'макс. кадр - самый долгий промежуток между кадрами экрана результата (цель {FRAME * 1000:.1f} мс)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+from benchmarks.mazes import random_maze
+from level import EXIT, TILE_SIZE, WALL, TileGrid
+from rendering import ChunkRenderer
+
+WIDTH, HEIGHT = 800, 600  # Размеры окна игры
+SIZES = [(31, 22), (100, 100), (1000, 1000)]  # Размеры лабиринтов в клетках
+FRAMES = 200  # Количество кадров на каждый размер
+
+
+# Камера с тем же интерфейсом, что и в игре
+class FixedCamera:
+    def __init__(self, x, y):
+        self.camera = pygame.Rect(x, y, WIDTH, HEIGHT)
+
+
+# Старая отрисовка: каждый тайл уровня отдельно
+def draw_tiles(screen, tiles, camera):
+    for image, rect in tiles:
+        screen.blit(image, rect.move(camera.camera.topleft))
+    return len(tiles)
+
+
+def bench(screen, tile_images, width, height):
+    grid = TileGrid(random_maze(width, height, seed=width))
+    renderer = ChunkRenderer(grid, tile_images)
+    level_width, level_height = width * TILE_SIZE, height * TILE_SIZE
+    cameras = [FixedCamera(-(i * 7 % (level_width - WIDTH)), -(i * 5 % (level_height - HEIGHT)))
+               for i in range(FRAMES)]  # Камера смещается от кадра к кадру
+
+    start = time.perf_counter()
+    blits = 0
+    for camera in cameras:
+        renderer.draw(screen, camera)
+        blits += renderer.blits
+    chunk_ms = (time.perf_counter() - start) / FRAMES * 1000
+
+    tile_ms = tile_blits = None
+    if width * height <= 100 * 100:  # Потайловая отрисовка больших карт слишком долгая
+        names = {WALL: 'wall', EXIT: 'exit'}
+        tiles = [(tile_images[names.get(grid.cell(x, y), 'empty')],
+                  pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+                 for y in range(height) for x in range(width)]
+        start = time.perf_counter()
+        for camera in cameras:
+            tile_blits = draw_tiles(screen, tiles, camera)
+        tile_ms = (time.perf_counter() - start) / FRAMES * 1000
+    return chunk_ms, blits / FRAMES, renderer.memory_used, tile_ms, tile_blits
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    tile_images = {name: pygame.image.load(os.path.join('data', f'{file}.png')).convert_alpha()
+                   for name, file in [('wall', 'wall'), ('empty', 'floor'), ('exit', 'exit')]}
+    print(f"{'размер':>12} {'куски, мс':>10} {'blit/кадр':>10} {'память, МБ':>11} {'тайлы, мс':>10} {'blit/кадр':>10}")
+    for width, height in SIZES:
+        chunk_ms, chunk_blits, memory, tile_ms, tile_blits = bench(screen, tile_images, width, height)
+        tile_text = f'{tile_ms:.2f}' if tile_ms is not None else '-'
+        print(f'{width:>5}x{height:<6} {chunk_ms:>10.2f} {chunk_blits:>10.1f} {memory / 2 ** 20:>11.1f} '
+              f'{tile_text:>10} {tile_blits or "-":>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import os
+import sys
+import time
+
+import pygame
+
+from benchmarks.frames import scripted_input
+from benchmarks.timestep import LEVELS, MAX_TICKS, PLAYER_SIZE, path_follower, shortest_path
+from level import TILE_SIZE
+from level_pack import load_compiled_level
+from replay import NO_HASH, Recorder, Replay, matches, play, replay_simulation
+from simulation import TICK_MS
+
+FIXTURES = os.path.join('benchmarks', 'fixtures')  # Эталонные записи
+DIFFICULTY = 3  # Сложность записей по уровням: волна выходит через 8 с
+STARTS = {'': 0, ' поздно': 250}  # Бот стоит столько тактов до старта: сразу доходит до выхода, поздно - в волну
+MAZE_SEED = 2024  # Зерно процедурного лабиринта для записи
+MAZE_TICKS = 3000  # Тактов случайного ввода в лабиринте
+
+
+# Ввод бота, который стоит wait тактов и потом идет по кратчайшему пути
+def delayed_follower(follow, wait):
+    ticks = 0
+
+    def read():
+        nonlocal ticks
+        ticks += 1
+        return (False, False, False, False) if ticks <= wait else follow()
+    return read
+
+
+# Запись эталонов: бот проходит уровни сразу и с опозданием, в лабиринте - случайный ввод
+def record():
+    os.makedirs(FIXTURES, exist_ok=True)
+    for filename in os.listdir(FIXTURES):  # Старые эталоны с другими именами не должны остаться
+        if filename.endswith('.rpl'):
+            os.remove(os.path.join(FIXTURES, filename))
+    for name in LEVELS:
+        level = load_compiled_level(name)
+        for suffix, wait in STARTS.items():
+            rect = pygame.Rect(TILE_SIZE * level.spawn[0] + 15, TILE_SIZE * level.spawn[1] + 15, *PLAYER_SIZE)
+            replay = Replay(name, level.source_hash, DIFFICULTY, rect)
+            simulation = replay_simulation(replay)
+            follow = path_follower(shortest_path(level), simulation.player_rect)
+            simulation.run(Recorder(replay, delayed_follower(follow, wait)).read, MAX_TICKS)
+            replay.finish(simulation.result, simulation.player_rect.topleft)
+            replay.save(os.path.join(FIXTURES, f'{os.path.splitext(name)[0]}{suffix}.rpl'))
+
+    replay = Replay(f'maze {MAZE_SEED}', NO_HASH, 3, (55, 55, *PLAYER_SIZE), MAZE_SEED)
+    simulation = replay_simulation(replay)
+    script = iter(scripted_input(MAZE_TICKS, MAZE_SEED))
+    simulation.run(Recorder(replay, lambda: next(script)).read, MAZE_TICKS)
+    replay.finish(simulation.result, simulation.player_rect.topleft)
+    replay.save(os.path.join(FIXTURES, f'maze {MAZE_SEED}.rpl'))
+
+
+# Воспроизведение эталонов: конечное состояние должно совпасть с записанным
+def verify():
+    failures = 0
+    print(f"{'запись':>14} {'исход':>6} {'тактов':>7} {'байт':>6} {'мс':>7} {'x реального':>12} {'совпадает':>10}")
+    for filename in sorted(os.listdir(FIXTURES)):
+        if not filename.endswith('.rpl'):
+            continue
+        path = os.path.join(FIXTURES, filename)
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        simulation = play(replay)
+        elapsed = time.perf_counter() - start
+        ok = matches(replay, simulation)
+        failures += not ok
+        print(f'{filename[:-4]:>14} {str(replay.result):>6} {replay.ticks:>7} {os.path.getsize(path):>6} '
+              f'{elapsed * 1000:>7.1f} {replay.ticks * TICK_MS / 1000 / elapsed:>12.0f} {"да" if ok else "НЕТ":>10}')
+        if not ok:
+            print(f'    ожидалось {replay.result} {replay.ticks} {replay.final}, '
+                  f'получено {simulation.result} {simulation.ticks} {simulation.player_rect.topleft}')
+    if failures:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Проверка воспроизведения эталонных записей')
+    parser.add_argument('--record', action='store_true', help='перезаписать эталоны')
+    args = parser.parse_args()
+    if args.record:
+        record()
+    verify()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import os
+import statistics
+import tempfile
+import time
+
+from persistence import RunHistory
+
+FPS = 50  # Количество кадров в секунду
+FRAMES = 3000  # Длина прогона в кадрах
+RUN_EVERY = 5  # Как часто (в кадрах) завершается забег - намного чаще, чем в игре
+FRAME_BUDGET_MS = 1000 / FPS  # Время, отведенное на один кадр
+
+
+# Старая запись: перечитывание и перезапись stats.txt прямо в кадре
+def record_legacy(path):
+    stats = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                key, value = line.strip().split(' - ')
+                stats[key] = int(value)
+    stats['уровней сыграно'] = stats.get('уровней сыграно', 0) + 1
+    with open(path, 'w', encoding='utf-8') as file:
+        for key, value in stats.items():
+            file.write(f"{key} - {value}\n")
+
+
+def measure(record):
+    samples = []
+    for frame in range(FRAMES):
+        if frame % RUN_EVERY == 0:
+            start = time.perf_counter()
+            record(frame)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99)], samples[-1]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        history = RunHistory(os.path.join(directory, 'stats.db'))
+        history_result = measure(lambda frame: history.record('lvl 1.txt', 2, 'win' if frame % 2 else 'loss', 15000))
+        start = time.perf_counter()
+        history.flush()  # Фоновая запись того, что накопилось
+        flush_ms = (time.perf_counter() - start) * 1000
+        totals = history.totals()
+        history.close()
+
+        legacy_path = os.path.join(directory, 'stats.txt')
+        legacy_result = measure(lambda frame: record_legacy(legacy_path))
+
+    print(f"{'способ':>10} {'p50, мс':>9} {'p99, мс':>9} {'max, мс':>9}")
+    for name, (p50, p99, worst) in [('sqlite', history_result), ('stats.txt', legacy_result)]:
+        print(f'{name:>10} {p50:>9.4f} {p99:>9.4f} {worst:>9.4f}')
+    print(f'дозапись в фоне после прогона: {flush_ms:.1f} мс, забегов в базе: {totals["уровней сыграно"]}')
+    worst = history_result[2]
+    print(f'худшая запись забега: {worst:.4f} мс из {FRAME_BUDGET_MS:.0f} мс кадра -',
+          'кадр не задерживается' if worst < FRAME_BUDGET_MS / 10 else 'ЗАДЕРЖКА КАДРА')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 7  # Запусков на каждое измерение (первый - прогрев дискового кэша, не учитывается)
+TOP_MODULES = 12  # Сколько самых дорогих пакетов показывать
+LIBRARIES = {'pygame', 'numpy', 'pkg_resources'}  # Тяжелые библиотеки, которые показываются с зависимостями
+READY = 'READY'  # Строка, которую процесс печатает после первого интерактивного кадра
+
+# Импорт игры без побочных эффектов: окно не должно открываться
+IMPORT_ONLY = f'''
+import os
+import pygame
+import main
+assert not pygame.display.get_init(), 'import main открыл окно'
+assert not pygame.font.get_init(), 'import main инициализировал шрифты'
+print({READY!r}, flush=True)
+os._exit(0)
+'''
+
+# Запуск игры до первого кадра заставки: экран нарисован и готов принимать ввод
+FIRST_FRAME = f'''
+import os
+import ui
+
+def wait(self, timeout=0):
+    self.draw()
+    print({READY!r}, flush=True)
+    os._exit(0)
+
+ui.RetainedScreen.wait = wait
+import main
+main.main()
+'''
+
+
+# Модули игры берутся из каталога проекта, даже если процесс запущен в его копии
+def environment():
+    path = os.pathsep.join(filter(None, [os.getcwd(), os.environ.get('PYTHONPATH')]))
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1', PYTHONPATH=path)
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    return env
+
+
+# Время от запуска процесса до строки READY (или до завершения) в мс; выход интерпретатора не учитывается
+def timed_run(code, directory):
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, env=environment(), text=True,
+                               cwd=directory)
+    for line in process.stdout:
+        if line.strip() == READY:
+            elapsed = time.perf_counter() - start
+            break
+    else:
+        elapsed = time.perf_counter() - start
+    if process.wait() != 0:
+        raise SystemExit(f'процесс завершился с кодом {process.returncode}')
+    return elapsed * 1000
+
+
+# Минимум и медиана времени запуска
+def measure(code, directory):
+    times = [timed_run(code, directory) for _ in range(RUNS)][1:]
+    return min(times), statistics.median(times)
+
+
+# Разбор вывода -X importtime: собственное время модулей, сгруппированное по пакетам верхнего уровня
+def import_breakdown():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], capture_output=True,
+                            env=environment(), text=True, check=True)
+    own = {}  # Пакет -> собственное время импорта его модулей в мкс
+    total = {}  # Модуль игры -> полное время импорта с зависимостями в мкс
+    game_modules = {os.path.splitext(name)[0] for name in os.listdir('.') if name.endswith('.py')}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        own[package] = own.get(package, 0) + int(self_us)
+        if (package in game_modules or package in LIBRARIES) and name.strip() == package:
+            total[package] = int(cumulative_us)
+    return own, total
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        # Игра запускается в копии data/ и levels/: настройки и скомпилированные уровни не попадают в каталог игры
+        shutil.copytree('data', os.path.join(directory, 'data'))
+        shutil.copytree('levels', os.path.join(directory, 'levels'))
+        rows = [('пустой интерпретатор', measure(f'print({READY!r})', directory)),
+                ('import main (окно не открыто)', measure(IMPORT_ONLY, directory)),
+                ('первый интерактивный кадр', measure(FIRST_FRAME, directory))]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f'{"от запуска процесса":<34} {"мин, мс":>8} {"медиана":>8}')
+    for name, (best, median) in rows:
+        print(f'{name:<34} {best:>8.1f} {median:>8.1f}')
+    print(f'{"  окно и заставка после импорта":<34} {rows[2][1][0] - rows[1][1][0]:>8.1f} '
+          f'{rows[2][1][1] - rows[1][1][1]:>8.1f}')
+
+    own, total = import_breakdown()
+    print('\nсобственное время импорта по пакетам')
+    for package, us in sorted(own.items(), key=lambda item: -item[1])[:TOP_MODULES]:
+        print(f'  {package:<32} {us / 1000:>8.1f} мс')
+    print('\nмодули с зависимостями (в порядке импорта, повторные зависимости не считаются)')
+    for module, us in total.items():
+        print(f'  {module:<32} {us / 1000:>8.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+from maze import StreamedMaze
+from rendering import Camera, ChunkRenderer
+
+WIDTH, HEIGHT = 800, 600  # Размеры окна игры
+FRAMES = 20000  # Кадров пути
+SPEED = 12  # Пикселей за кадр по каждой оси - быстрее игрока, чтобы уйти далеко
+REPORT_EVERY = 4000  # Как часто печатать состояние
+
+
+def main():
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    images = {name: pygame.image.load(os.path.join('data', file)).convert_alpha()
+              for name, file in [('wall', 'wall.png'), ('empty', 'floor.png'), ('exit', 'exit.png')]}
+    maze = StreamedMaze(seed=1)
+    renderer = ChunkRenderer(maze, images, memory_limit=16 * 1024 * 1024)
+    camera = Camera(WIDTH, HEIGHT, None, None)
+    target = pygame.sprite.Sprite()
+    target.rect = pygame.Rect(0, 0, 25, 35)
+
+    tracemalloc.start()
+    print(f"{'кадр':>6} {'путь, клеток':>13} {'кусков в кэше':>14} {'генераций':>10} "
+          f"{'фон, МБ':>8} {'Python, МБ':>11} {'мс/кадр':>8}")
+    start = time.perf_counter()
+    for frame in range(1, FRAMES + 1):
+        target.rect.topleft = (frame * SPEED, frame * SPEED // 2)  # Игрок уходит вправо и вниз
+        maze.update(*target.rect.center)
+        camera.update(target)
+        renderer.draw(screen, camera)
+        if frame % REPORT_EVERY == 0:
+            elapsed = (time.perf_counter() - start) / REPORT_EVERY * 1000
+            current, _ = tracemalloc.get_traced_memory()
+            print(f'{frame:>6} {target.rect.x // 40:>13} {len(maze.chunks):>14} {maze.generated:>10} '
+                  f'{renderer.memory_used / 2 ** 20:>8.1f} {current / 2 ** 20:>11.2f} {elapsed:>8.3f}')
+            start = time.perf_counter()
+
+
+if __name__ == '__main__':
+    main()
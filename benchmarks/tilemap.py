@@ -0,0 +1,92 @@
+import gc
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+from benchmarks.mazes import random_maze
+from level import EXIT, TILE_SIZE, WALL
+from level_pack import compile_level, read_compiled
+from rendering import ChunkRenderer, TileRenderer
+
+SIZES = [100, 1000, 3000]  # Стороны лабиринтов в клетках
+SPRITE_CELL_LIMIT = 1000 * 1000  # Больше спрайтов не создается: 3000x3000 заняли бы несколько ГБ
+
+
+# Прежнее построение уровня: спрайт на каждую клетку и второй спрайт над выходом
+def build_sprites(level, images):
+    all_sprites = pygame.sprite.Group()
+    tiles_group = pygame.sprite.Group()
+
+    def tile(image, x, y):
+        sprite = pygame.sprite.Sprite(tiles_group, all_sprites)
+        sprite.image = image
+        sprite.rect = image.get_rect().move(TILE_SIZE * x, TILE_SIZE * y)
+
+    for y in range(level.height):
+        row = y * level.width
+        for x in range(level.width):
+            code = level.cells[row + x]
+            if code == WALL:
+                tile(images['wall'], x, y)
+            else:
+                tile(images['empty'], x, y)
+                if code == EXIT:
+                    tile(images['exit'], x, y)
+    return all_sprites, tiles_group, level.grid()
+
+
+# Новое построение: сетка кодов клеток и отрисовщики без объектов на клетку
+def build_tilemap(level, images):
+    grid = level.grid()
+    return grid, TileRenderer(grid, images), ChunkRenderer(grid, images)
+
+
+# Время построения (без трассировки памяти) и удерживаемая после него память
+def measure(build, level, images):
+    gc.collect()
+    start = time.perf_counter()
+    result = build(level, images)
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    result = build(level, images)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    return elapsed * 1000, memory / 2 ** 20
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((800, 600))
+    images = {name: pygame.image.load(os.path.join('data', file)).convert_alpha()
+              for name, file in [('wall', 'wall.png'), ('empty', 'floor.png'), ('exit', 'exit.png')]}
+
+    print(f"{'размер':>10} {'спрайты, мс':>12} {'спрайты, МБ':>12} {'сетка, мс':>10} {'сетка, МБ':>10} "
+          f"{'байт/клетку':>12}")
+    sprite_ms_per_cell = sprite_mb_per_cell = None
+    for size in SIZES:
+        level = read_compiled(compile_level('\n'.join(random_maze(size, size, seed=size)).encode('utf-8')))
+        cells = size * size
+        grid_ms, grid_mb = measure(build_tilemap, level, images)
+        grid_mb += len(level.cells) / 2 ** 20  # Байты клеток выделены при чтении уровня, а не при построении
+        if cells <= SPRITE_CELL_LIMIT:
+            sprite_ms, sprite_mb = measure(build_sprites, level, images)
+            sprite_ms_per_cell, sprite_mb_per_cell = sprite_ms / cells, sprite_mb / cells
+            sprite_text = f'{sprite_ms:>12.0f} {sprite_mb:>12.1f}'
+        else:  # Оценка по стоимости клетки на предыдущем размере
+            sprite_text = f'{f"~{sprite_ms_per_cell * cells:.0f}":>12} {f"~{sprite_mb_per_cell * cells:.0f}":>12}'
+        print(f'{size:>4}x{size:<5} {sprite_text} {grid_ms:>10.2f} {grid_mb:>10.2f} '
+              f'{grid_mb * 2 ** 20 / cells:>12.2f}')
+    print('~ - оценка: столько спрайтов не помещается в память')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import sys
+import time
+from collections import deque
+
+import pygame
+
+from hazards import HazardField, default_hazards
+from level import TILE_SIZE, WALL
+from level_pack import load_compiled_level
+from simulation import TICK_MS, WAVE_DELAYS, Simulation
+
+LEVELS = ['lvl 1.txt', 'lvl 2.txt', 'lvl 3.txt', 'lvl 4.txt', 'lvl 5.txt']  # Уровни из levels/
+RENDER_RATES = [20, 50, 240]  # Частоты отрисовки, при которых исход должен совпасть
+PLAYER_SIZE = (25, 35)  # Размер спрайта игрока (mario.png)
+MAX_TICKS = 60 * 50  # Не больше минуты игрового времени
+
+
+# Кратчайший путь по клеткам от старта до выхода
+def shortest_path(level):
+    start, goal = level.spawn, level.exits[0]
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) == goal:
+            break
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if (0 <= nx < level.width and 0 <= ny < level.height and (nx, ny) not in previous
+                    and level.cells[ny * level.width + nx] != WALL):
+                previous[(nx, ny)] = (x, y)
+                queue.append((nx, ny))
+    path = [goal]
+    while previous[path[-1]] is not None:
+        path.append(previous[path[-1]])
+    return path[::-1]
+
+
+# Бот: ведет игрока от центра клетки к центру следующей, по одной оси за раз
+def path_follower(path, rect):
+    state = {'index': 1}
+
+    def read_input():
+        while state['index'] < len(path):
+            x, y = path[state['index']]
+            dx = x * TILE_SIZE + TILE_SIZE // 2 - rect.centerx
+            dy = y * TILE_SIZE + TILE_SIZE // 2 - rect.centery
+            if abs(dx) > 3:
+                return dx < 0, dx > 0, False, False
+            if abs(dy) > 3:
+                return False, False, dy < 0, dy > 0
+            state['index'] += 1  # Клетка достигнута
+        return False, False, False, False
+
+    return read_input
+
+
+def new_simulation(level, difficulty):
+    rect = pygame.Rect(TILE_SIZE * level.spawn[0] + 15, TILE_SIZE * level.spawn[1] + 15, *PLAYER_SIZE)
+    grid = level.grid()
+    simulation = Simulation(grid, rect, HazardField(default_hazards(difficulty), grid))
+    return simulation, path_follower(shortest_path(level), rect)
+
+
+# Исход без отрисовки: все такты подряд
+def headless(level, difficulty):
+    simulation, read_input = new_simulation(level, difficulty)
+    simulation.run(read_input, MAX_TICKS)
+    return (simulation.result, simulation.ticks, tuple(simulation.player_rect)), simulation
+
+
+# Игровой цикл с заданной частотой отрисовки (время кадра подставляется, а не измеряется)
+def play(level, difficulty, fps):
+    simulation, read_input = new_simulation(level, difficulty)
+    frames = 0
+    while simulation.result is None and simulation.ticks < MAX_TICKS:
+        simulation.advance(1000 / fps, read_input)
+        simulation.interpolated_rect(simulation.accumulator / TICK_MS)  # Отрисовка берет промежуточную позицию
+        frames += 1
+    return (simulation.result, simulation.ticks, tuple(simulation.player_rect)), frames
+
+
+def main():
+    mismatches = 0
+    print(f"{'уровень':>10} {'сложность':>9} {'исход':>6} {'тактов':>7} {'кадров при 20/50/240':>22} "
+          f"{'без отрисовки, x реального':>27}")
+    for name in LEVELS:
+        level = load_compiled_level(name)
+        for difficulty in [0] + sorted(WAVE_DELAYS):  # 0 - сложность не выбрана, волна идет сразу
+            start = time.perf_counter()
+            expected, simulation = headless(level, difficulty)
+            speedup = simulation.ticks * TICK_MS / 1000 / (time.perf_counter() - start)
+
+            frames = []
+            for fps in RENDER_RATES:
+                outcome, frame_count = play(level, difficulty, fps)
+                frames.append(frame_count)
+                if outcome != expected:
+                    mismatches += 1
+                    print(f'  расхождение при {fps} FPS: {outcome} вместо {expected}')
+            print(f"{name:>10} {difficulty:>9} {expected[0] or '-':>6} {expected[1]:>7} "
+                  f"{'/'.join(map(str, frames)):>22} {speedup:>27.0f}")
+    if mismatches:
+        sys.exit(1)
+    print('исход одинаков при любой частоте отрисовки')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import os
+import statistics
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pygame
+
+from benchmarks.frames import scripted_input
+from benchmarks.mazes import random_maze
+from level import TILE_SIZE
+from level_pack import compile_level, read_compiled
+from rendering import Camera
+from simulation import move_player, movement
+from visibility import VIEW_RADIUS, FogOverlay, VisibilityCache, field_of_view
+
+WIDTH, HEIGHT = 800, 600  # Размеры окна игры
+SIZES = [100, 1000, 3000]  # Стороны лабиринтов в клетках
+FRAMES = 3000  # Кадров на прогон (один такт на кадр)
+FULL_GRID_LIMIT = 1000 * 1000  # Больше клеток видимость без предела дальности не считается (слишком долго)
+
+
+# Видимость без предела дальности и без кэша: прежний подход "каждый кадр по всей сетке"
+def full_grid_view(grid, x, y):
+    return field_of_view(grid, x, y, max(grid.width, grid.height))
+
+
+# Прогулка игрока по уровню; на каждом кадре - видимость и маска, как в игре
+def walk(grid, spawn, compute, fog, screen):
+    rect = pygame.Rect(TILE_SIZE * spawn[0] + 15, TILE_SIZE * spawn[1] + 15, 25, 35)
+    camera = Camera(WIDTH, HEIGHT, grid.width * TILE_SIZE, grid.height * TILE_SIZE)
+    view_times, mask_times, fills = [], [], []
+    for keys in scripted_input(FRAMES, seed=grid.width):
+        move_player(rect, *movement(*keys), grid)
+        camera.follow(rect)
+        start = time.perf_counter()
+        visible = compute(rect.centerx // TILE_SIZE, rect.centery // TILE_SIZE)
+        middle = time.perf_counter()
+        fog.draw(screen, camera, visible)
+        end = time.perf_counter()
+        view_times.append(middle - start)
+        mask_times.append(end - middle)
+        fills.append(fog.fills)
+    return view_times, mask_times, fills
+
+
+# Маска, которая каждый кадр закрашивается целиком и открывает все видимые клетки
+class RebuiltFog(FogOverlay):
+    def draw(self, screen, camera, visible):
+        self.origin = None
+        super().draw(screen, camera, visible)
+
+
+def report(label, times):
+    times = sorted(times)
+    return (f'{label:>16} {statistics.mean(times) * 1000:>9.3f} {times[len(times) // 2] * 1000:>9.3f} '
+            f'{times[-1] * 1000:>9.3f}')
+
+
+def main():
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    print(f'дальность видимости {VIEW_RADIUS} клеток, {FRAMES} кадров прогулки; время на кадр, мс')
+    print(f"{'размер':>10} {'способ':>16} {'среднее':>9} {'медиана':>9} {'макс.':>9}")
+    for size in SIZES:
+        rows = random_maze(size, size, seed=size, density=0.15)  # Реже стены - игрок проходит много клеток
+        rows[2] = '#..' + rows[2][3:]  # Старт не замурован
+        level = read_compiled(compile_level('\n'.join(rows).encode('utf-8')))
+        grid, spawn = level.grid(), level.spawn
+        label = f'{size}x{size}'
+
+        if size * size <= FULL_GRID_LIMIT:
+            times, _, _ = walk(grid, spawn, lambda x, y: full_grid_view(grid, x, y), FogOverlay(WIDTH, HEIGHT),
+                               screen)
+            print(f'{label:>10}' + report('вся сетка', times))
+
+        times, _, _ = walk(grid, spawn, lambda x, y: field_of_view(grid, x, y), FogOverlay(WIDTH, HEIGHT), screen)
+        print(f'{label:>10}' + report('без кэша', times))
+
+        cache = VisibilityCache(grid)
+        times, mask_times, fills = walk(grid, spawn, cache.around, FogOverlay(WIDTH, HEIGHT), screen)
+        print(f'{label:>10}' + report('с кэшем', times) + f'   расчетов {cache.computed} на {FRAMES} кадров')
+
+        _, rebuilt_times, rebuilt_fills = walk(grid, spawn, VisibilityCache(grid).around,
+                                               RebuiltFog(WIDTH, HEIGHT), screen)
+        print(f'{label:>10}' + report('маска заново', rebuilt_times)
+              + f'   клеток за кадр {statistics.mean(rebuilt_fills):.0f}')
+        print(f'{label:>10}' + report('маска по частям', mask_times) + f'   клеток за кадр {statistics.mean(fills):.1f}')
+
+
+if __name__ == '__main__':
+    main()
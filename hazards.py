@@ -0,0 +1,451 @@
+import os
+from array import array
+from collections import deque
+
+import numpy as np
+import pygame
+
+from level import WALL
+from simulation import WAVE_DELAYS
+
+# Виды опасностей
+HORIZONTAL = 0  # Полоса, идущая сверху вниз (как прежняя волна)
+VERTICAL = 1  # Полоса, идущая слева направо
+FLOOD = 2  # Затопление, расходящееся от клетки по проходам
+GATE = 3  # Ворота, которые периодически закрываются
+KINDS = {'horizontal': HORIZONTAL, 'vertical': VERTICAL, 'flood': FLOOD, 'gate': GATE}
+
+COLORS = {HORIZONTAL: (0, 0, 255, 128), VERTICAL: (0, 0, 255, 128),
+          FLOOD: (0, 90, 255, 128), GATE: (200, 0, 0, 128)}  # Цвета опасностей на экране
+UNREACHABLE = np.iinfo(np.int32).max  # Расстояние до клеток, куда вода не доходит
+SCALAR_LIMIT = 32  # До стольких опасностей такт считается циклом по спискам: вызовы NumPy дороже самой работы
+
+
+# Описание одной опасности уровня
+class HazardSpec:
+    def __init__(self, kind, delay, speed=3, size=30, cell=(0, 0), span=(1, 1), period=0, closed=0):
+        self.kind = kind  # Вид опасности
+        self.delay = delay  # Время запуска от начала уровня в мс
+        self.speed = speed  # Пикселей за такт (для затопления - рост радиуса)
+        self.size = size  # Толщина полосы в пикселях
+        self.cell = cell  # Клетка источника затопления или левый верхний угол ворот
+        self.span = span  # Размер ворот в клетках
+        self.period = period  # Период ворот в мс
+        self.closed = closed  # Сколько мс периода ворота закрыты
+
+
+# Расстояния в клетках от ближайшей из клеток sources по проходам (обход в ширину).
+# Волновой фронт на NumPy делает по проходу всей сетки на шаг и в извилистых лабиринтах медленнее очереди
+def flood_distances(passable, sources):
+    height, width = passable.shape
+    row = width + 2  # Сетка с рамкой из стен: у соседей не нужно проверять границы
+    open_cells = np.pad(passable, 1).astype(np.uint8).tobytes()
+    distances = array('i', [UNREACHABLE]) * len(open_cells)  # NumPy читает массив без копирования и без долгой блокировки GIL
+    queue = deque()
+    for x, y in sources:
+        index = (y + 1) * row + x + 1
+        if open_cells[index] and distances[index]:
+            distances[index] = 0
+            queue.append(index)
+    while queue:
+        index = queue.popleft()
+        step = distances[index] + 1
+        for neighbour in (index - 1, index + 1, index - row, index + row):
+            if open_cells[neighbour] and distances[neighbour] == UNREACHABLE:
+                distances[neighbour] = step
+                queue.append(neighbour)
+    return np.frombuffer(distances, dtype=np.int32).reshape(height + 2, row)[1:-1, 1:-1]
+
+
+# Все опасности уровня в массивах NumPy: одно обновление и одна проверка столкновения на такт.
+# Если опасностей не больше scalar_limit (обычный уровень - одна волна), такт считается циклом по
+# спискам Python, а массивы догоняют списки только перед отрисовкой и проверкой затопления
+class HazardField:
+    def __init__(self, specs, grid, scalar_limit=SCALAR_LIMIT):
+        self.grid = grid  # Сетка клеток уровня
+        self.tile_size = grid.tile_size  # Размер клетки в пикселях
+        bounded = grid.width is not None
+        level_width = grid.width * self.tile_size if bounded else np.inf
+        level_height = grid.height * self.tile_size if bounded else np.inf
+
+        count = len(specs)
+        self.kind = np.array([spec.kind for spec in specs], dtype=np.int8)
+        self.delay = np.array([spec.delay for spec in specs], dtype=np.float64)
+        self.speed = np.array([spec.speed for spec in specs], dtype=np.float64)
+        self.size = np.array([spec.size for spec in specs], dtype=np.float64)
+        self.period = np.array([spec.period or 1 for spec in specs], dtype=np.float64)
+        self.closed = np.array([spec.closed for spec in specs], dtype=np.float64)
+        self.position = np.zeros(count)  # Позиция полосы или радиус затопления в пикселях
+        self.previous = np.zeros(count)  # Позиция в прошлом такте (для плавной отрисовки)
+        self.active = np.zeros(count, dtype=bool)  # Опасность сейчас действует
+
+        self.horizontal = self.kind == HORIZONTAL
+        self.vertical = self.kind == VERTICAL
+        self.floods = self.kind == FLOOD
+        self.gates = self.kind == GATE
+        self.movers = self.horizontal | self.vertical | self.floods  # Опасности, которые движутся каждый такт
+        self.boxes = self.horizontal | self.vertical | self.gates  # Опасности-прямоугольники
+        self.extent = np.where(self.horizontal, level_height,
+                               np.where(self.vertical, level_width, np.inf))  # Где полоса гаснет
+
+        # Прямоугольники опасностей; у полос подвижная сторона обновляется каждый такт
+        self.left = np.where(self.horizontal, 0.0 if bounded else -np.inf, 0.0)
+        self.right = np.where(self.horizontal, level_width, 0.0)
+        self.top = np.where(self.vertical, 0.0 if bounded else -np.inf, 0.0)
+        self.bottom = np.where(self.vertical, level_height, 0.0)
+        for index, spec in enumerate(specs):
+            if spec.kind == GATE:
+                self.left[index] = spec.cell[0] * self.tile_size
+                self.top[index] = spec.cell[1] * self.tile_size
+                self.right[index] = (spec.cell[0] + spec.span[0]) * self.tile_size
+                self.bottom[index] = (spec.cell[1] + spec.span[1]) * self.tile_size
+
+        # Расстояния от источников затопления до каждой клетки
+        sources = [spec.cell for spec in specs if spec.kind == FLOOD]
+        if sources and not bounded:
+            raise ValueError('flood hazards need a level with fixed size')
+        self.flood_sources = sources  # Клетки источников затопления
+        self.refresh_floods()
+
+        self.surfaces = {}  # Готовые полупрозрачные поверхности по видам опасностей
+
+        # Рабочие массивы такта и готовые прямоугольники для отрисовки
+        self.first_delay = float(self.delay.min()) if count else np.inf  # До этого времени обновлять нечего
+        self.started = np.zeros(count, dtype=bool)
+        self.mask = np.zeros(count, dtype=bool)
+        self.ended = np.zeros(count, dtype=bool)
+        self.hits = np.zeros(count, dtype=bool)
+        self.scratch = np.zeros(count)
+        self.screen_edges = np.zeros((5, count))  # Позиция и стороны опасностей на экране
+        self.shown = np.zeros(count, dtype=bool)  # Опасности, видимые на экране
+        self.rect_pool = []  # Прямоугольники, которые screen_rects переиспользует из кадра в кадр
+        self.rects_key = self.rects = None  # Камера и доля такта последнего screen_rects и его результат
+
+        # Списки для такта без NumPy: постоянные параметры и копии изменяемого состояния
+        self.scalar = count <= scalar_limit  # Такт считается циклом по спискам
+        self.params = list(zip(self.kind.tolist(), self.delay.tolist(), self.speed.tolist(), self.size.tolist(),
+                               self.period.tolist(), self.closed.tolist(), self.extent.tolist()))
+        self.box_list = self.boxes.tolist()  # Опасность - прямоугольник
+        self.mover_list = np.flatnonzero(self.horizontal | self.vertical).tolist()  # Полосы: у них меняются стороны
+        self.has_floods = bool(sources)
+        self._sync_lists()
+
+    # Копии состояния в списках по массивам (после создания и сброса)
+    def _sync_lists(self):
+        self.position_list = self.position.tolist()
+        self.previous_list = self.previous.tolist()
+        self.active_list = self.active.tolist()
+        self.stale = False  # Списки ушли вперед массивов
+        self.edge_list = [list(edges) for edges in zip(self.left.tolist(), self.top.tolist(),
+                                                       self.right.tolist(), self.bottom.tolist())]
+
+    # Перенос состояния из списков в массивы после тактов циклом
+    def _sync_arrays(self):
+        if not self.stale:
+            return
+        self.stale = False
+        self.position[:] = self.position_list
+        self.previous[:] = self.previous_list
+        self.active[:] = self.active_list
+        for index in self.mover_list:
+            self.left[index], self.top[index], self.right[index], self.bottom[index] = self.edge_list[index]
+
+    # Возврат всех опасностей к началу уровня
+    def reset(self):
+        self.position[:] = 0
+        self.previous[:] = 0
+        self.active[:] = False
+        self.flood_key = self.flood_mask = None
+        self.rects_key = None
+        self._sync_lists()
+
+    # Расстояния затопления по текущим стенам (заново - после изменения стен при горячей перезагрузке уровня)
+    def refresh_floods(self):
+        if self.flood_sources:
+            grid = self.grid
+            cells = np.frombuffer(grid.cells, dtype=np.uint8).reshape(grid.height, grid.width)
+            passable = cells != WALL
+            self.flood_distance = np.stack([flood_distances(passable, [source]).ravel()
+                                            for source in self.flood_sources])
+        else:
+            self.flood_distance = np.zeros((0, 0), dtype=np.int32)
+        self.flood_key = None  # Радиусы, для которых построена маска затопления
+        self.flood_mask = None  # Затопленные клетки
+        self.rects_key = None
+
+    # Есть ли хоть одна действующая опасность
+    @property
+    def any_active(self):
+        if self.scalar:
+            return True in self.active_list
+        return np.count_nonzero(self.active) > 0  # count_nonzero не создает временных массивов, в отличие от any()
+
+    # Обновление всех опасностей за такт; elapsed_ms - время уровня после такта.
+    # Промежуточные значения пишутся в рабочие массивы, новых массивов за такт не создается
+    def update(self, elapsed_ms):
+        if elapsed_ms < self.first_delay:  # Ни одна опасность еще не запущена
+            return
+        self.rects_key = None  # Опасности сдвинулись - прямоугольники на экране считаются заново
+        if self.scalar:
+            self._update_scalar(elapsed_ms)
+            return
+        started, mask, scratch = self.started, self.mask, self.scratch
+        np.less_equal(self.delay, elapsed_ms, out=started)
+        np.logical_not(self.active, out=mask)
+        mask &= started
+        mask &= self.movers  # Запуск с начала, в том числе после ухода за край
+        np.copyto(self.position, 0.0, where=mask)
+        np.copyto(self.previous, 0.0, where=mask)
+        self.active |= mask
+
+        np.logical_and(self.movers, self.active, out=mask)  # Движущиеся опасности
+        np.copyto(self.previous, self.position, where=mask)
+        np.multiply(self.speed, mask, out=scratch)
+        self.position += scratch
+        np.greater_equal(self.position, self.extent, out=self.ended)
+        self.ended &= mask
+        np.logical_not(self.ended, out=self.ended)
+        self.active &= self.ended  # Полоса дошла до края уровня
+
+        np.subtract(elapsed_ms, self.delay, out=scratch)
+        np.mod(scratch, self.period, out=scratch)  # Фаза ворот
+        np.less(scratch, self.closed, out=mask)
+        mask &= started
+        np.copyto(self.active, mask, where=self.gates)  # Ворота закрыты
+
+        np.add(self.position, self.size, out=scratch)  # Дальняя сторона полосы
+        np.copyto(self.top, self.position, where=self.horizontal)
+        np.copyto(self.bottom, scratch, where=self.horizontal)
+        np.copyto(self.left, self.position, where=self.vertical)
+        np.copyto(self.right, scratch, where=self.vertical)
+
+    # Тот же такт циклом по спискам; массивы обновит _sync_arrays, когда они понадобятся
+    def _update_scalar(self, elapsed_ms):
+        active_list, position_list, previous_list = self.active_list, self.position_list, self.previous_list
+        for index, (kind, delay, speed, size, period, closed, extent) in enumerate(self.params):
+            started = delay <= elapsed_ms
+            if kind == GATE:  # Ворота закрыты часть каждого периода
+                active_list[index] = started and (elapsed_ms - delay) % period < closed
+                continue
+            if not active_list[index]:
+                if not started:
+                    continue
+                position = 0.0  # Запуск с начала, в том числе после ухода за край
+            else:
+                position = position_list[index]
+            previous_list[index] = position
+            position += speed
+            position_list[index] = position
+            active_list[index] = position < extent  # Полоса дошла до края уровня
+            if kind == HORIZONTAL:
+                edges = self.edge_list[index]
+                edges[1], edges[3] = position, position + size
+            elif kind == VERTICAL:
+                edges = self.edge_list[index]
+                edges[0], edges[2] = position, position + size
+        self.stale = True
+
+    # Радиус каждого затопления в клетках (-1 - затопление еще не началось)
+    def _flood_reach(self):
+        self._sync_arrays()
+        return np.where(self.active[self.floods], self.position[self.floods] // self.tile_size, -1)
+
+    # Столкновение прямоугольника игрока с любой опасностью
+    def collides(self, rect):
+        if self.scalar:
+            left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+            for active, box, edges in zip(self.active_list, self.box_list, self.edge_list):
+                if active and box and edges[0] < right and edges[2] > left and edges[1] < bottom and edges[3] > top:
+                    return True
+            return self.has_floods and self._flood_collides(rect)
+        if not self.any_active:
+            return False
+        hits, scratch = self.hits, self.mask
+        np.less(self.left, rect.right, out=hits)
+        hits &= self.active
+        hits &= self.boxes
+        np.greater(self.right, rect.left, out=scratch)
+        hits &= scratch
+        np.less(self.top, rect.bottom, out=scratch)
+        hits &= scratch
+        np.greater(self.bottom, rect.top, out=scratch)
+        hits &= scratch
+        if np.count_nonzero(hits):
+            return True
+        return self._flood_collides(rect)
+
+    # Затопление проверяется только по клеткам под игроком
+    def _flood_collides(self, rect):
+        if not self.has_floods:
+            return False
+        grid, size = self.grid, self.tile_size
+        x_start, x_end = max(0, rect.left // size), min(grid.width - 1, (rect.right - 1) // size)
+        y_start, y_end = max(0, rect.top // size), min(grid.height - 1, (rect.bottom - 1) // size)
+        indices = [y * grid.width + x for y in range(y_start, y_end + 1) for x in range(x_start, x_end + 1)]
+        if not indices:
+            return False
+        return bool((self.flood_distance[:, indices] <= self._flood_reach()[:, None]).any())
+
+    # Состояние опасностей для проверки столкновений: стороны прямоугольников (4, H), у недействующих - пустые,
+    # и радиусы затоплений в клетках (F,). Это копии: поле можно вести дальше, а состояние хранить
+    def collision_state(self):
+        self._sync_arrays()
+        boxes = self.active & self.boxes
+        edges = np.stack([np.where(boxes, self.left, np.inf), np.where(boxes, self.top, np.inf),
+                          np.where(boxes, self.right, -np.inf), np.where(boxes, self.bottom, -np.inf)])
+        return edges, self._flood_reach()
+
+    # Столкновение многих прямоугольников (массивы сторон длины N), у каждого - свое состояние опасностей:
+    # edges (N, 4, H) и reach (N, F) из collision_state (N = 1 - одно состояние на всех);
+    # cells - индексы клеток под каждым прямоугольником (N, m), covered - какие из них действительно под ним
+    def collides_states(self, edges, reach, left, top, right, bottom, cells, covered):
+        hits = ((edges[:, 0] < right[:, None]) & (edges[:, 2] > left[:, None])
+                & (edges[:, 1] < bottom[:, None]) & (edges[:, 3] > top[:, None])).any(axis=1)
+        if self.flood_distance.size:
+            flooded = (self.flood_distance[:, cells] <= reach.T[:, :, None]) & covered
+            hits |= flooded.any(axis=(0, 2))
+        return hits
+
+    # Столкновение многих прямоугольников разом с текущим состоянием опасностей
+    def collides_many(self, left, top, right, bottom, cells, covered):
+        edges, reach = self.collision_state()
+        return self.collides_states(edges[None], reach[None], left, top, right, bottom, cells, covered)
+
+    # Затопленные клетки; маска пересчитывается, только когда вода дошла до новых клеток
+    def flooded(self):
+        reach = self._flood_reach()
+        key = reach.tobytes()
+        if key != self.flood_key:
+            mask = (self.flood_distance <= reach[:, None]).any(axis=0)
+            self.flood_mask = mask.reshape(self.grid.height, self.grid.width)
+            self.flood_key = key
+        return self.flood_mask
+
+    # Прямоугольник из запаса: объекты переиспользуются из кадра в кадр
+    def _pooled_rect(self, index, x, y, width, height):
+        if index == len(self.rect_pool):
+            self.rect_pool.append(pygame.Rect(0, 0, 0, 0))
+        rect = self.rect_pool[index]
+        rect.update(x, y, width, height)
+        return rect
+
+    # Прямоугольники опасностей на экране между прошлым и текущим тактом: список (вид, Rect).
+    # Прямоугольники действительны до следующего вызова; в одном кадре (bounds, draw по каждой
+    # изменившейся области) они считаются один раз
+    def screen_rects(self, camera, alpha=1.0):
+        if not self.any_active:
+            return []
+        offset_x, offset_y = camera.camera.topleft
+        width, height = camera.width, camera.height
+        key = (offset_x, offset_y, width, height, alpha)
+        if key == self.rects_key:
+            return self.rects
+        self._sync_arrays()
+        position, left, right, top, bottom = self.screen_edges
+        np.subtract(self.position, self.previous, out=position)  # Позиция полос между тактами
+        position *= alpha
+        position += self.previous
+        np.round(position, out=position)
+        np.add(position, self.size, out=right)  # Дальняя сторона полосы
+        np.copyto(bottom, right)
+        np.copyto(right, self.right, where=~self.vertical)
+        np.copyto(bottom, self.bottom, where=~self.horizontal)
+        np.copyto(left, self.left)
+        np.copyto(left, position, where=self.vertical)
+        np.copyto(top, self.top)
+        np.copyto(top, position, where=self.horizontal)
+        for edge, offset, limit in ((left, offset_x, width), (right, offset_x, width),
+                                    (top, offset_y, height), (bottom, offset_y, height)):
+            edge += offset  # Переход к координатам экрана и отсечение по его краям
+            np.maximum(edge, 0, out=edge)
+            np.minimum(edge, limit, out=edge)
+        shown, scratch = self.shown, self.hits
+        np.greater(right, left, out=shown)
+        np.greater(bottom, top, out=scratch)
+        shown &= scratch
+        shown &= self.active
+        shown &= self.boxes
+        visible = np.flatnonzero(shown)
+        rects = [(int(self.kind[i]), self._pooled_rect(number, int(left[i]), int(top[i]), int(right[i] - left[i]),
+                                                       int(bottom[i] - top[i])))
+                 for number, i in enumerate(visible.tolist())]
+
+        if self.flood_distance.size and self.active[self.floods].any():  # Видимые затопленные клетки
+            size = self.tile_size
+            x_start, y_start = max(0, -offset_x // size), max(0, -offset_y // size)
+            x_end = min(self.grid.width, (width - offset_x) // size + 1)
+            y_end = min(self.grid.height, (height - offset_y) // size + 1)
+            ys, xs = np.nonzero(self.flooded()[y_start:y_end, x_start:x_end])
+            first = len(rects)
+            rects.extend((FLOOD, self._pooled_rect(first + number, (x + x_start) * size + offset_x,
+                                                   (y + y_start) * size + offset_y, size, size))
+                         for number, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())))
+        self.rects_key, self.rects = key, rects
+        return rects
+
+    # Поверхность вида опасности размером с экран: части прямоугольников вырезаются из нее при выводе
+    def _surface(self, kind, size):
+        surface = self.surfaces.get(kind)
+        if surface is None or surface.get_size() != size:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(COLORS[kind])
+            self.surfaces[kind] = surface
+        return surface
+
+    # Отрисовка всех видимых опасностей одним вызовом blits
+    def draw(self, screen, camera, alpha=1.0):
+        rects = self.screen_rects(camera, alpha)
+        if rects:
+            size = (camera.width, camera.height)
+            # Поверхности залиты целиком, поэтому их часть вырезается тем же прямоугольником, что и место на экране
+            screen.blits([(self._surface(kind, size), rect, rect) for kind, rect in rects],
+                         doreturn=False)
+
+    # Прямоугольник, охватывающий все опасности на экране, или None
+    def bounds(self, camera, alpha=1.0):
+        rects = [rect for _, rect in self.screen_rects(camera, alpha)]
+        return rects[0].unionall(rects[1:]) if rects else None
+
+
+# Опасность по умолчанию: одна волна сверху вниз с задержкой по сложности
+def default_hazards(difficulty):
+    return [HazardSpec(HORIZONTAL, WAVE_DELAYS.get(difficulty, 0))]
+
+
+# Разбор описания опасностей. Строка: вид, сложности (1,2 или *), затем ключ=значение, например
+#   horizontal * speed=3 size=30
+#   flood 2,3 delay=5000 cell=12,7 speed=1
+#   gate 3 cell=4,9 span=2,1 period=3000 closed=1000
+# Без delay опасность запускается с задержкой волны для выбранной сложности
+def parse_hazards(text, difficulty):
+    specs = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split(';', 1)[0].strip()  # Комментарии после ';'
+        if not line:
+            continue
+        kind, difficulties, *options = line.split()
+        if kind not in KINDS:
+            raise ValueError(f'line {number}: unknown hazard {kind!r}')
+        if difficulties != '*' and difficulty not in {int(value) for value in difficulties.split(',')}:
+            continue
+        values = {}
+        for option in options:
+            key, _, value = option.partition('=')
+            numbers = tuple(int(part) for part in value.split(','))
+            values[key] = numbers if key in ('cell', 'span') else numbers[0]
+        values.setdefault('delay', WAVE_DELAYS.get(difficulty, 0))
+        try:
+            specs.append(HazardSpec(KINDS[kind], **values))
+        except TypeError:
+            raise ValueError(f'line {number}: unknown option in {line!r}') from None
+    return specs
+
+
+# Опасности уровня из файла рядом с ним (levels/lvl 1.hazards) или волна по умолчанию
+def load_hazards(filename, difficulty, levels_dir='levels'):
+    path = os.path.join(levels_dir, os.path.splitext(filename)[0] + '.hazards')
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return parse_hazards(file.read(), difficulty)
+    except FileNotFoundError:
+        return default_hazards(difficulty)
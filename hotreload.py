@@ -0,0 +1,148 @@
+import os
+import time
+
+import numpy as np
+
+from level import EXIT, WALL
+from level_pack import CELL_TABLE, compile_level, read_compiled
+
+RELOAD_INTERVAL = 0.25  # Как часто проверяется файл уровня, в секундах
+CODES = np.frombuffer(CELL_TABLE, dtype=np.uint8)  # Байт текста уровня -> код клетки
+# Байты, правка которых сдвигает клетки строки или сами строки (пробелы обрезаются, разделители строк),
+# и байты не из ASCII: такие правки разбираются полной перекомпиляцией уровня
+SHIFTING = np.zeros(256, dtype=bool)
+SHIFTING[list(b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f')] = True
+SHIFTING[128:] = True
+
+
+# Изменение уровня, уже внесенное в сетку
+class LevelPatch:
+    def __init__(self, cells, resized, walls_changed, spawn):
+        self.cells = cells  # Изменившиеся клетки [(x, y)] (при смене размера - пусто: меняется все)
+        self.resized = resized  # Размер уровня изменился, сетка заменена целиком
+        self.walls_changed = walls_changed  # Стены появились или исчезли (нужно пересчитать затопление)
+        self.spawn = spawn  # Клетка появления игрока в новой версии или None
+
+
+# Индексы клеток, которые различаются в двух сетках одного размера (построчно)
+def diff_cells(old, new):
+    old = np.frombuffer(old, dtype=np.uint8)
+    new = np.frombuffer(new, dtype=np.uint8)
+    return np.flatnonzero(old != new)
+
+
+# Запись кодов codes в клетки с индексами changed; возвращает (изменившиеся клетки, изменились ли стены)
+def write_cells(grid, changed, codes):
+    if changed.size and not isinstance(grid.cells, bytearray):  # Клетки поверх кэша или архива только для чтения
+        grid.cells = bytearray(grid.cells)
+    cells = np.frombuffer(grid.cells, dtype=np.uint8)
+    walls_changed = bool(np.count_nonzero(cells[changed] == WALL) or np.count_nonzero(codes == WALL))
+    cells[changed] = codes
+    ys, xs = np.divmod(changed, grid.width)
+    return list(zip(xs.tolist(), ys.tolist())), walls_changed
+
+
+# Внесение новой версии уровня в сетку на месте: при том же размере меняются только различающиеся клетки
+def patch_grid(grid, level):
+    if (level.width, level.height) != (grid.width, grid.height):
+        grid.width, grid.height = level.width, level.height
+        grid.cells = bytearray(level.cells)
+        grid.exits = list(level.exits)
+        return LevelPatch([], True, True, level.spawn)
+
+    changed = diff_cells(grid.cells, level.cells)
+    cells, walls_changed = write_cells(grid, changed, np.frombuffer(level.cells, dtype=np.uint8)[changed])
+    grid.exits = list(level.exits)
+    return LevelPatch(cells, False, walls_changed, level.spawn)
+
+
+# Слежение за файлом уровня в режиме разработки: правки в редакторе попадают в идущий забег.
+# Правка символов на месте (стена вместо пола и т. п.) сравнивается с прежним текстом побайтно и переводится
+# в клетки без разбора всего уровня; вставка и удаление символов разбираются перекомпиляцией уровня
+class LevelWatcher:
+    def __init__(self, name, grid, levels_dir='levels', interval=RELOAD_INTERVAL):
+        self.path = os.path.join(levels_dir, name)  # Файл уровня
+        self.grid = grid  # Сетка идущего забега
+        self.interval = interval  # Период проверки файла в секундах
+        self.next_check = 0.0  # Время следующей проверки
+        self.version = self._version()  # Время изменения и размер файла, с которыми совпадает сетка
+        self.reloads = 0  # Сколько раз уровень был перезагружен
+        self.spawn = None  # Клетка появления по тексту уровня
+        try:
+            with open(self.path, 'rb') as file:
+                self._index(file.read())
+        except OSError:
+            self._index(b'')
+
+    def _version(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:  # Редактор мог удалить файл перед записью новой версии
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    # Текст, с которым совпадает сетка: начала строк и можно ли переводить байты в клетки напрямую
+    def _index(self, data):
+        self.data = data
+        raw = np.frombuffer(data, dtype=np.uint8)
+        self.line_starts = np.concatenate(([0], np.flatnonzero(raw == ord('\n')) + 1))
+        starts = raw[self.line_starts[self.line_starts < len(raw)]]
+        self.simple = (data.isascii() and data.count(b'\r') == data.count(b'\r\n')  # Строки делит только \n
+                       and not any(separator in data for separator in (b'\x0b', b'\x0c', b'\x1c', b'\x1d', b'\x1e'))
+                       and not np.count_nonzero(SHIFTING[starts] & (starts != ord('\n')) & (starts != ord('\r'))))
+        spawn = data.find(b'@')
+        self.spawn = self._cell(spawn) if spawn != -1 else None
+
+    # Клетка (x, y) байта текста с номером offset
+    def _cell(self, offset):
+        row = int(np.searchsorted(self.line_starts, offset, side='right')) - 1
+        return offset - int(self.line_starts[row]), row
+
+    # Правка символов на месте: байты переводятся в клетки напрямую. None, если правка сдвигает клетки
+    def _patch_in_place(self, data):
+        if not self.simple or len(data) != len(self.data):
+            return None
+        old = np.frombuffer(self.data, dtype=np.uint8)
+        new = np.frombuffer(data, dtype=np.uint8)
+        changed = np.flatnonzero(old != new)
+        if np.count_nonzero(SHIFTING[old[changed]]) or np.count_nonzero(SHIFTING[new[changed]]):
+            return None
+        rows = np.searchsorted(self.line_starts, changed, side='right') - 1
+        indices = rows * self.grid.width + (changed - self.line_starts[rows])
+        codes = CODES[new[changed]]
+        exits_changed = np.count_nonzero(codes == EXIT) or np.count_nonzero(CODES[old[changed]] == EXIT)
+        spawn_changed = np.count_nonzero(old[changed] == ord('@')) or np.count_nonzero(new[changed] == ord('@'))
+        cells, walls_changed = write_cells(self.grid, indices, codes)
+        self.data = data
+        if exits_changed:  # Выходы по порядку клеток, как при компиляции
+            grid = self.grid
+            edited = set(cells)
+            exits = [point for point in grid.exits if point not in edited]
+            exits.extend(point for point in cells if grid.cell(*point) == EXIT)
+            grid.exits = sorted(exits, key=lambda point: (point[1], point[0]))
+        if spawn_changed:
+            spawn = data.find(b'@')
+            self.spawn = self._cell(spawn) if spawn != -1 else None
+        return LevelPatch(cells, False, walls_changed, self.spawn)
+
+    # Проверка файла не чаще interval; возвращает LevelPatch, если сетка обновлена, иначе None
+    def poll(self):
+        now = time.monotonic()
+        if now < self.next_check:
+            return None
+        self.next_check = now + self.interval
+        version = self._version()
+        if version is None or version == self.version:
+            return None
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+            patch = self._patch_in_place(data)
+            if patch is None:
+                patch = patch_grid(self.grid, read_compiled(compile_level(data)))
+                self._index(data)
+        except (OSError, ValueError):  # Файл пуст или записан не до конца - следующая проверка прочитает его снова
+            return None
+        self.version = version
+        self.reloads += 1
+        return patch
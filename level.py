@@ -0,0 +1,85 @@
+import os
+
+TILE_SIZE = 40  # Размер одного тайла на карте
+
+# Коды клеток в сетке уровня
+FLOOR = 0  # Пол
+WALL = 1  # Стена
+EXIT = 2  # Выход
+
+# Изображения клетки по коду, снизу вверх (под выходом лежит пол)
+TILE_LAYERS = {FLOOR: ('empty',), WALL: ('wall',), EXIT: ('empty', 'exit')}
+
+
+# Загрузка уровня
+def load_level(filename):
+    filepath = os.path.join('levels', filename)  # Полный путь к файлу уровня
+    with open(filepath, 'r', encoding="utf-8") as file:  # Открытие файла на чтение
+        return parse_level(file.read())
+
+
+# Разбор текста уровня
+def parse_level(text):
+    level_map = [line.strip() for line in text.splitlines()]  # Чтение строк и удаление лишних пробелов
+
+    max_width = max(map(len, level_map))  # Определение максимальной ширины уровня
+    return [line.ljust(max_width, '.') for line in level_map]  # Выравнивание строк уровня до максимальной ширины
+
+
+# Сетка клеток уровня для быстрых проверок столкновений
+class TileGrid:
+    def __init__(self, level, tile_size=TILE_SIZE):
+        self.width = len(level[0]) if level else 0  # Ширина уровня в клетках
+        self.height = len(level)  # Высота уровня в клетках
+        self.tile_size = tile_size  # Размер клетки в пикселях
+        self.cells = bytearray(self.width * self.height)  # Коды клеток построчно
+        self.exits = []  # Координаты клеток выхода
+        for y, row in enumerate(level):  # Проход по строкам уровня
+            for x, char in enumerate(row):  # Проход по символам в строке
+                if char == '#':  # Стена
+                    self.cells[y * self.width + x] = WALL
+                elif char == 'E':  # Выход
+                    self.cells[y * self.width + x] = EXIT
+                    self.exits.append((x, y))
+
+    # Сетка из готовых кодов клеток (например, из скомпилированного уровня)
+    @classmethod
+    def from_cells(cls, width, height, cells, exits=(), tile_size=TILE_SIZE):
+        grid = cls.__new__(cls)
+        grid.width = width  # Ширина уровня в клетках
+        grid.height = height  # Высота уровня в клетках
+        grid.tile_size = tile_size  # Размер клетки в пикселях
+        grid.cells = cells  # Байты или memoryview (поверх архива уровней - только для чтения)
+        grid.exits = list(exits)  # Координаты клеток выхода
+        return grid
+
+    # Код клетки (за пределами уровня - пол, как и раньше: там нет тайлов)
+    def cell(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.width + x]
+        return FLOOR
+
+    # Проверка, есть ли клетка с заданным кодом под прямоугольником
+    def _touches(self, rect, code):
+        if rect.width <= 0 or rect.height <= 0:  # Пустой прямоугольник ни с чем не пересекается
+            return False
+        size = self.tile_size
+        x_start = max(0, rect.left // size)  # Первая клетка по X
+        x_end = min(self.width - 1, (rect.right - 1) // size)  # Последняя клетка по X
+        y_start = max(0, rect.top // size)  # Первая клетка по Y
+        y_end = min(self.height - 1, (rect.bottom - 1) // size)  # Последняя клетка по Y
+        cells = self.cells
+        for y in range(y_start, y_end + 1):  # Проход только по клеткам под прямоугольником
+            row = y * self.width
+            for x in range(x_start, x_end + 1):
+                if cells[row + x] == code:
+                    return True
+        return False
+
+    # Столкновение прямоугольника со стенами
+    def collides(self, rect):
+        return self._touches(rect, WALL)
+
+    # Попадание прямоугольника в зону выхода
+    def at_exit(self, rect):
+        return self._touches(rect, EXIT)
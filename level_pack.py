@@ -0,0 +1,189 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+
+from level import EXIT, WALL, TileGrid, parse_level
+from persistence import write_atomic
+
+LEVEL_MAGIC = b'LVL1'  # Сигнатура скомпилированного уровня
+PACK_MAGIC = b'LVPK'  # Сигнатура архива уровней
+LEVEL_HEADER = struct.Struct('<4sIIiiI16s')  # Сигнатура, ширина, высота, старт X и Y, число выходов, хэш исходника
+POINT = struct.Struct('<ii')  # Координаты клетки выхода
+PACK_HEADER = struct.Struct('<4sI')  # Сигнатура и количество уровней в архиве
+PACK_ENTRY = struct.Struct('<HQQ')  # Длина имени, смещение и размер уровня; за записью следует имя
+CACHE_DIR = os.path.join('levels', '.compiled')  # Кэш скомпилированных уровней
+PACK_PATH = os.path.join('levels', 'levels.pack')  # Архив уровней, если игра поставляется с ним
+
+# Таблица перевода символов уровня в коды клеток: стены и выходы, все остальное - пол
+CELL_TABLE = bytearray(256)
+CELL_TABLE[ord('#')] = WALL
+CELL_TABLE[ord('E')] = EXIT
+CELL_TABLE = bytes(CELL_TABLE)
+
+
+# Хэш исходного текста уровня
+def source_hash(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# Скомпилированный уровень: коды клеток и заголовок
+class CompiledLevel:
+    def __init__(self, width, height, spawn, exits, cells, digest):
+        self.width = width  # Ширина уровня в клетках
+        self.height = height  # Высота уровня в клетках
+        self.spawn = spawn  # Клетка появления игрока или None
+        self.exits = exits  # Клетки выхода
+        self.cells = cells  # Коды клеток построчно
+        self.source_hash = digest  # Хэш исходного текста
+
+    # Сетка для проверок столкновений поверх тех же байтов
+    def grid(self):
+        return TileGrid.from_cells(self.width, self.height, self.cells, self.exits)
+
+
+# Компиляция текста уровня в двоичный формат
+def compile_level(data):
+    level = parse_level(data.decode('utf-8'))  # Тот же разбор и выравнивание, что и в load_level
+    width, height = len(level[0]), len(level)
+    text = ''.join(level).encode('ascii', 'replace')  # Один байт на клетку
+    cells = text.translate(CELL_TABLE)
+
+    spawn_index = text.find(b'@')
+    spawn = divmod(spawn_index, width)[::-1] if spawn_index != -1 else (-1, -1)
+    exits = []
+    index = text.find(b'E')
+    while index != -1:  # Поиск выходов без цикла по клеткам на Python
+        exits.append((index % width, index // width))
+        index = text.find(b'E', index + 1)
+
+    header = LEVEL_HEADER.pack(LEVEL_MAGIC, width, height, spawn[0], spawn[1], len(exits), source_hash(data))
+    return header + b''.join(POINT.pack(*point) for point in exits) + cells
+
+
+# Чтение скомпилированного уровня из буфера: клетки - срез memoryview поверх того же буфера, без копии
+# (для архива это отображение файла в память, для кэша - байты, прочитанные из файла)
+def read_compiled(buffer):
+    buffer = memoryview(buffer)
+    magic, width, height, spawn_x, spawn_y, exit_count, digest = LEVEL_HEADER.unpack_from(buffer)
+    if magic != LEVEL_MAGIC:
+        raise ValueError('not a compiled level')
+    offset = LEVEL_HEADER.size
+    exits = [POINT.unpack_from(buffer, offset + i * POINT.size) for i in range(exit_count)]
+    offset += exit_count * POINT.size
+    cells = buffer[offset:offset + width * height]
+    spawn = (spawn_x, spawn_y) if spawn_x >= 0 else None
+    return CompiledLevel(width, height, spawn, exits, cells, digest)
+
+
+# Загрузка уровня через кэш: перекомпиляция, только если изменился исходный файл
+def load_compiled_level(filename, levels_dir='levels', cache_dir=CACHE_DIR):
+    with open(os.path.join(levels_dir, filename), 'rb') as file:
+        data = file.read()
+    digest = source_hash(data)
+    cache_path = os.path.join(cache_dir, os.path.splitext(filename)[0] + '.lvlc')
+    try:
+        with open(cache_path, 'rb') as file:
+            compiled = file.read()
+        if compiled[:4] == LEVEL_MAGIC and LEVEL_HEADER.unpack_from(compiled)[-1] == digest:
+            return read_compiled(compiled)
+    except (FileNotFoundError, struct.error):  # Кэша нет или он поврежден
+        pass
+
+    compiled = compile_level(data)
+    os.makedirs(cache_dir, exist_ok=True)
+    write_atomic(cache_path, compiled)
+    return read_compiled(compiled)
+
+
+# Архив из многих уровней с индексом смещений, читаемый через mmap. Клетки уровней из архива - срезы
+# отображения без копирования; отображение живет, пока жив хоть один такой уровень или его сетка,
+# даже после close()
+class LevelPack:
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = PACK_HEADER.unpack_from(self.map)
+        if magic != PACK_MAGIC:
+            raise ValueError(f'{path} is not a level pack')
+        self.index = {}  # Имя уровня -> (смещение, размер)
+        offset = PACK_HEADER.size
+        for _ in range(count):
+            name_length, level_offset, size = PACK_ENTRY.unpack_from(self.map, offset)
+            offset += PACK_ENTRY.size
+            name = self.map[offset:offset + name_length].decode('utf-8')
+            offset += name_length
+            self.index[name] = (level_offset, size)
+
+    def names(self):
+        return list(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    # Уровень из архива: с диска читаются только его страницы, клетки не копируются
+    def level(self, name):
+        if self.map is None:
+            raise ValueError('level pack is closed')
+        offset, size = self.index[name]
+        return read_compiled(memoryview(self.map)[offset:offset + size])
+
+    # Закрытие архива. Если уровни из него еще используются, отображение остается за ними
+    # и снимается, когда последний из них будет удален
+    def close(self):
+        if self.map is None:
+            return
+        self.file.close()
+        try:
+            self.map.close()
+        except BufferError:  # На отображение ссылаются клетки живых уровней
+            pass
+        self.map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Архив уровней игры или None, если игра поставляется без него
+def open_pack(path=PACK_PATH):
+    try:
+        return LevelPack(path)
+    except FileNotFoundError:
+        return None
+
+
+# Запись архива из пар (имя, скомпилированный уровень)
+def write_pack(path, entries):
+    index_size = PACK_HEADER.size + sum(PACK_ENTRY.size + len(name.encode('utf-8')) for name, _ in entries)
+    parts = [PACK_HEADER.pack(PACK_MAGIC, len(entries))]
+    offset = index_size
+    for name, compiled in entries:
+        encoded = name.encode('utf-8')
+        parts.append(PACK_ENTRY.pack(len(encoded), offset, len(compiled)) + encoded)
+        offset += len(compiled)
+    parts.extend(compiled for _, compiled in entries)
+    write_atomic(path, b''.join(parts))
+
+
+# Компиляция всех уровней каталога в один архив
+def main():
+    parser = argparse.ArgumentParser(description='Компиляция уровней в архив')
+    parser.add_argument('source', help='каталог с файлами уровней .txt')
+    parser.add_argument('output', help='путь к создаваемому архиву')
+    args = parser.parse_args()
+
+    entries = []
+    for filename in sorted(os.listdir(args.source)):
+        if filename.endswith('.txt'):
+            with open(os.path.join(args.source, filename), 'rb') as file:
+                entries.append((filename, compile_level(file.read())))
+    write_pack(args.output, entries)
+    print(f'{len(entries)} уровней записано в {args.output} ({os.path.getsize(args.output)} байт)')
+
+
+if __name__ == '__main__':
+    main()
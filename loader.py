@@ -0,0 +1,110 @@
+import os
+import threading
+
+from hazards import HazardField, load_hazards
+from level_pack import load_compiled_level, source_hash
+from replay import NO_HASH
+
+
+# Уровень, готовый к игре: сетка, опасности и все, что не требует окна
+class PreparedLevel:
+    def __init__(self, name, difficulty, grid, hazards, spawn, source_hash=NO_HASH, seed=0, maze_exit=None):
+        self.name = name  # Имя уровня для истории забегов и записи
+        self.difficulty = difficulty  # Сложность, для которой построены опасности
+        self.grid = grid  # Сетка клеток уровня
+        self.hazards = hazards  # Опасности уровня
+        self.spawn = spawn  # Клетка появления игрока
+        self.source_hash = source_hash  # Хэш исходного файла уровня
+        self.seed = seed  # Зерно процедурного лабиринта
+        self.maze_exit = maze_exit  # Клетка выхода процедурного лабиринта
+
+
+# Уровень из архива (клетки - без копирования), если он там есть и исходный файл рядом с ним не правили;
+# иначе - из levels/ через кэш
+def load_level_bytes(name, levels_dir, pack):
+    if pack is not None and name in pack:
+        level = pack.level(name)
+        try:
+            with open(os.path.join(levels_dir, name), 'rb') as file:
+                stale = source_hash(file.read()) != level.source_hash
+        except FileNotFoundError:  # Исходник не поставляется вместе с архивом
+            stale = False
+        if not stale:
+            return level
+    return load_compiled_level(name, levels_dir, os.path.join(levels_dir, '.compiled'))  # Разбор или кэш
+
+
+# Чтение и построение уровня из архива pack или из levels/; progress(доля) вызывается после каждого этапа
+def prepare_level(name, difficulty, levels_dir='levels', progress=None, pack=None):
+    report = progress or (lambda fraction: None)
+    level = load_level_bytes(name, levels_dir, pack)
+    report(0.4)
+    grid = level.grid()  # Сетка столкновений поверх байтов уровня
+    specs = load_hazards(name, difficulty, levels_dir)  # Описание опасностей
+    report(0.5)
+    hazards = HazardField(specs, grid)  # Массивы опасностей и расстояния затопления
+    report(1.0)
+    return PreparedLevel(name, difficulty, grid, hazards, level.spawn, level.source_hash)
+
+
+# Загрузка следующего уровня в фоновом потоке, пока показан экран результата или меню
+class LevelLoader:
+    def __init__(self, levels_dir='levels', pack=None):
+        self.levels_dir = levels_dir  # Каталог уровней
+        self.pack = pack  # Архив уровней (LevelPack) или None
+        self.lock = threading.Lock()
+        self.key = None  # (имя, сложность) последней запрошенной загрузки
+        self.thread = None  # Поток текущей загрузки
+        self.done = threading.Event()  # Загрузка завершена (успешно или с ошибкой)
+        self.result = None  # Готовый уровень
+        self.error = None  # Исключение из потока загрузки
+        self.progress = 0.0  # Доля выполненной загрузки
+
+    # Запуск загрузки; повторный запрос того же уровня ничего не делает
+    def prefetch(self, name, difficulty):
+        key = (name, difficulty)
+        with self.lock:
+            if key == self.key:
+                return
+            self.key = key
+            self.result = self.error = None
+            self.progress = 0.0
+            self.done = done = threading.Event()  # Устаревший поток отмечает свое событие и результат не пишет
+
+        def report(fraction):
+            with self.lock:
+                if self.key == key:
+                    self.progress = fraction
+
+        def worker():
+            try:
+                result, error = prepare_level(name, difficulty, self.levels_dir, report, self.pack), None
+            except Exception as exception:  # Ошибка передается в основной поток при получении уровня
+                result, error = None, exception
+            with self.lock:
+                if self.key == key:
+                    self.result, self.error = result, error
+            done.set()
+
+        self.thread = threading.Thread(target=worker, name='level-prefetch', daemon=True)
+        self.thread.start()
+
+    # Готов ли запрошенный уровень
+    def ready(self, name, difficulty):
+        with self.lock:
+            return self.key == (name, difficulty) and self.done.is_set()
+
+    # Ожидание загрузки не дольше timeout секунд; возвращает True, если уровень готов
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    # Готовый уровень; если загрузка не запущена или не закончена - ожидание в текущем потоке
+    def take(self, name, difficulty):
+        self.prefetch(name, difficulty)
+        self.done.wait()
+        with self.lock:
+            result, error = self.result, self.error
+            self.key = self.result = self.error = None  # Уровень отдается один раз: забег меняет его состояние
+        if error is not None:
+            raise error
+        return result
@@ -1,561 +1,290 @@
 import os
 import sys
+import time
 import pygame
 
-# Инициализация Pygame
-pygame.init()  # Инициализация всех модулей Pygame
-pygame.key.set_repeat(200, 70)  # Настройка автоповтора нажатий клавиш (задержка 200 мс, интервал 70 мс)
+from assets import AssetManager
+from hazards import HazardField, load_hazards
+from hotreload import LevelWatcher
+from level import TILE_SIZE
+from level_pack import open_pack
+from loader import LevelLoader, PreparedLevel
+from maze import StreamedMaze
+from persistence import RunHistory, SettingsStore
+from profiler import FrameProfiler
+from rendering import Camera, ChunkRenderer, DirtyRectRenderer, TileRenderer
+from replay import NO_HASH, Recorder, Replay, save_run
+from simulation import Simulation
+from ui import HEIGHT, WIDTH, gameover, get_font, loading_screen, main_menu, start_screen, win
+from visibility import FogOverlay, VisibilityCache
 
 # Константы
-FPS = 50  # Количество кадров в секунду
-WIDTH, HEIGHT = 800, 600  # Размеры окна игры
-STEP = 6  # Шаг перемещения игрока
-TILE_SIZE = 40  # Размер одного тайла на карте
-
-# Окно и таймер
-screen = pygame.display.set_mode((WIDTH, HEIGHT))  # Создание окна игры с заданными размерами
-clock = pygame.time.Clock()  # Создание объекта для управления FPS
-pygame.display.set_caption('Лабиринт')  # Установка заголовка окна
-
-# Группы спрайтов
-all_sprites = pygame.sprite.Group()  # Группа для всех спрайтов
-tiles_group = pygame.sprite.Group()  # Группа для тайлов (стен, пола и т.д.)
-player_group = pygame.sprite.Group()  # Группа для игрока
-
-
-def terminate():
-    pygame.quit()  # Завершение работы Pygame
-    sys.exit()  # Завершение работы программы
-
-
-def load_image(name, color_key=None):
-    fullname = os.path.join('data', name)  # Полный путь к файлу изображения
-    try:
-        image = pygame.image.load(fullname)  # Загрузка изображения
-    except FileNotFoundError:
-        image = pygame.image.load(os.path.join('data', 'missing.png'))  # Загрузка альтернативного изображения
-
-    if color_key is not None:  # Если указан ключ цвета для прозрачности
-        image = image.convert()  # Конвертация изображения для оптимизации
-        if color_key == -1:  # Если ключ цвета равен -1, берем цвет из верхнего левого угла
-            color_key = image.get_at((0, 0))
-        image.set_colorkey(color_key)  # Устанавливаем прозрачность
-    else:
-        image = image.convert_alpha()  # Конвертация с поддержкой альфа-канала
-    return image
-
-
-# Загрузка изображений
-tile_images = {
-    'wall': load_image('wall.png'),  # Загрузка изображения стены
-    'empty': load_image('floor.png'),  # Загрузка изображения пола
-    'missing': load_image('missing.png'),  # Загрузка изображения пустоты
-    'exit': load_image('exit.png')  # Загрузка изображения выхода
-}
-player_image = load_image('mario.png')  # Загрузка изображения игрока
-
-
-# Загрузка уровня
-def load_level(filename):
-    filepath = os.path.join('levels', filename)  # Полный путь к файлу уровня
-    with open(filepath, 'r', encoding="utf-8") as file:  # Открытие файла на чтение
-        level_map = [line.strip() for line in file]  # Чтение строк и удаление лишних пробелов
-
-    max_width = max(map(len, level_map))  # Определение максимальной ширины уровня
-    return [line.ljust(max_width, '.') for line in level_map]  # Выравнивание строк уровня до максимальной ширины
-
-
-class ExitTile(pygame.sprite.Sprite):
-    def __init__(self, x, y):
-        super().__init__(tiles_group, all_sprites)  # Инициализация спрайта и добавление в группы
-        self.image = tile_images['exit']  # Установка изображения тайла выхода
-        self.rect = self.image.get_rect().move(TILE_SIZE * x, TILE_SIZE * y)  # Позиция тайла на экране
-
-
-class Tile(pygame.sprite.Sprite):
-    def __init__(self, tile_type, x, y):
-        super().__init__(tiles_group, all_sprites)  # Инициализация спрайта и добавление в группы
-        self.image = tile_images[tile_type]  # Установка изображения тайла
-        self.rect = self.image.get_rect().move(TILE_SIZE * x, TILE_SIZE * y)  # Позиция тайла на экране
+RENDER_FPS = 0  # Ограничение частоты отрисовки игры (0 - без ограничения); симуляция идет своими тактами
+STREAMED_MAZE = False  # Огромный процедурный лабиринт, генерируемый кусками, вместо уровней из levels/
+STREAMED_MAZE_SEED = 2024  # Зерно генерации огромного лабиринта
+STREAMED_MAZE_EXIT = (1021, 1021)  # Клетка выхода огромного лабиринта (None - лабиринт без выхода)
+CHUNK_RENDER = True  # Отрисовка фона уровня заранее собранными кусками вместо отдельных тайлов
+DIRTY_RECT_RENDER = False  # Вывод на экран только изменившихся областей, пока камера стоит на месте
+HOT_RELOAD = False  # Режим разработки: правки файла уровня в levels/ сразу попадают в идущий забег
+PROFILE_KEY = pygame.K_F3  # Показ панели профилировщика и запись времени фаз кадра
+TRACE_KEY = pygame.K_F4  # Сохранение записанных кадров в data/ для chrome://tracing
+LEVELS = ['lvl 1.txt', 'lvl 2.txt', 'lvl 3.txt', 'lvl 4.txt', 'lvl 5.txt']  # Уровни по порядку прохождения
+
+
+# Окно, ресурсы и хранилища игры; каждое создается при первом обращении, импорт модуля ничего не запускает
+class Game:
+    def __init__(self):
+        self._screen = None  # Поверхность окна
+        self._assets = None  # Кэш изображений
+        self._tile_images = None  # Атлас тайлов и игрока
+        self._settings_store = None  # Настройки
+        self._run_history = None  # История забегов (фоновый поток и база открываются только при обращении)
+        self.level_pack = None  # Архив уровней, если игра поставляется с ним (открывается в main)
+        self.clock = pygame.time.Clock()  # Объект для измерения времени кадра
+        self.profiler = FrameProfiler()  # Время фаз кадра (выключен, пока не нажата PROFILE_KEY)
+
+    # Создание окна при первом вызове: инициализируется только видеоподсистема, без звука и джойстиков
+    def ensure_window(self):
+        if self._screen is None:
+            pygame.display.init()
+            self._screen = pygame.display.set_mode((WIDTH, HEIGHT))  # Создание окна игры с заданными размерами
+            pygame.display.set_caption('Лабиринт')  # Установка заголовка окна
+            pygame.key.set_repeat(200, 70)  # Автоповтор нажатий клавиш (задержка 200 мс, интервал 70 мс)
+        return self._screen
+
+    # Окно игры
+    @property
+    def screen(self):
+        return self.ensure_window()
+
+    @property
+    def assets(self):
+        if self._assets is None:
+            self.ensure_window()  # Конвертация изображений требует окна
+            self._assets = AssetManager('data')
+        return self._assets
+
+    @property
+    def tile_images(self):
+        if self._tile_images is None:
+            self._tile_images = self.assets.atlas('tiles', {  # Мелкие изображения упаковываются в один атлас
+                'wall': 'wall.png',  # Изображение стены
+                'empty': 'floor.png',  # Изображение пола
+                'missing': 'missing.png',  # Изображение пустоты
+                'exit': 'exit.png',  # Изображение выхода
+                'player': 'mario.png',  # Изображение игрока
+            })
+        return self._tile_images
+
+    # Настройки читаются с диска один раз и дальше берутся из памяти
+    @property
+    def settings_store(self):
+        if self._settings_store is None:
+            self._settings_store = SettingsStore(os.path.join('data', 'settings.txt'), {'Сложность': 0, 'Туман': 0})
+        return self._settings_store
+
+    # История забегов; при первом запуске в нее переносятся счетчики из stats.txt
+    @property
+    def run_history(self):
+        if self._run_history is None:
+            self._run_history = RunHistory(os.path.join('data', 'stats.db'), os.path.join('data', 'stats.txt'))
+        return self._run_history
+
+    # Изображение из кэша менеджера ресурсов (с диска - только при первом запросе)
+    def load_image(self, name, color_key=None):
+        return self.assets.image(name, color_key)
+
+    def terminate(self):
+        if self._run_history is not None:
+            self._run_history.close()  # Запись забегов, оставшихся в очереди
+        if self.level_pack is not None:
+            self.level_pack.close()
+        pygame.quit()  # Завершение работы Pygame
+        sys.exit()  # Завершение работы программы
+
+
+# Нажатые клавиши движения: A, D, W, S
+def read_keys():
+    keys = pygame.key.get_pressed()  # Получение состояния клавиш
+    return keys[pygame.K_a], keys[pygame.K_d], keys[pygame.K_w], keys[pygame.K_s]
 
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y):
-        super().__init__(player_group, all_sprites)  # Инициализация спрайта и добавление в группы
-        self.image = player_image  # Установка изображения игрока
+    def __init__(self, x, y, image, *groups):
+        super().__init__(*groups)  # Инициализация спрайта и добавление в группы
+        self.image = image  # Установка изображения игрока
         self.rect = self.image.get_rect().move(TILE_SIZE * x + 15, TILE_SIZE * y + 15)  # Позиция игрока на экране
 
 
-# Генерация уровня
-def generate_level(level):
-    new_player = None  # Изначально игрок не создан
-    for y in range(len(level)):  # Проход по строкам уровня
-        for x in range(len(level[y])):  # Проход по символам в строке
-            if level[y][x] == '.':  # Если символ '.', создаем пол
-                Tile('empty', x, y)
-            elif level[y][x] == '#':  # Если символ '#', создаем стену
-                Tile('wall', x, y)
-            elif level[y][x] == '@':  # Если символ '@', создаем игрока
-                Tile('empty', x, y)  # Сначала создаем пол под игроком
-                new_player = Player(x, y)  # Затем создаем игрока
-            elif level[y][x] == 'E':  # Если символ 'E', создаем выход
-                Tile('empty', x, y)  # Сначала создаем пол под выходом
-                ExitTile(x, y)  # Затем создаем тайл выхода
-    return new_player  # Возвращаем объект игрока
-
-
-# Заставка
-def start_screen():
-    background_image = load_image('background.png')  # Загрузка изображения для заставки
-    screen.blit(background_image, (0, 0))  # Отображение изображения на весь экран
-    pygame.display.flip()  # Обновление экрана
-
-    waiting = True  # Флаг ожидания
-    while waiting:
-        for event in pygame.event.get():  # Обработка событий
-            if event.type == pygame.QUIT:  # Если событие - закрытие окна
-                terminate()  # Завершение программы
-            elif event.type in [pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]:  # Если нажата клавиша или кнопка мыши
-                waiting = False  # Завершение ожидания
-
-
-def settings():
-    settings_image = load_image('settings_background.png')  # Загрузка фона для экрана настроек
-
-    font = pygame.font.Font(None, 50)  # Шрифт для текста
-    easy_text = font.render("Простая", True, pygame.Color('white'))  # Текст кнопки
-    middle_text = font.render("Средняя", True, pygame.Color('white'))  # Текст кнопки
-    hard_text = font.render("Сложная", True, pygame.Color('white'))  # Текст кнопки
-    back_text = font.render("Назад", True, pygame.Color('white'))  # Текст кнопки "Назад"
-
-    easy_rect = easy_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))  # Позиция кнопки
-    middle_rect = middle_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))  # Позиция кнопки
-    hard_rect = hard_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))  # Позиция кнопки
-    back_rect = back_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 200))  # Позиция кнопки "Назад"
-
-    while True:
-        settings_func = read_settings()['Сложность']  # Чтение текущих настроек
-        now_diff = ''
-        if settings_func == 1:
-            now_diff = 'Простая'
-        elif settings_func == 2:
-            now_diff = 'Средняя'
-        elif settings_func == 3:
-            now_diff = 'Сложная'
-        now_text = font.render(f"Текущая сложность: {now_diff}", True, pygame.Color('white'))  # Обновление текста
-        now_rect = now_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 125))  # Позиция текста
-
-        screen.blit(settings_image, (0, 0))  # Отрисовка фона меню
-        screen.blit(now_text, now_rect)  # Отрисовка текста текущей сложности
-        screen.blit(easy_text, easy_rect)  # Отрисовка кнопки
-        screen.blit(middle_text, middle_rect)  # Отрисовка кнопки
-        screen.blit(hard_text, hard_rect)  # Отрисовка кнопки
-        screen.blit(back_text, back_rect)  # Отрисовка кнопки
-
-        for event in pygame.event.get():  # Обработка событий
-            if event.type == pygame.QUIT:  # Если событие - закрытие окна
-                terminate()  # Завершение программы
-            elif event.type == pygame.MOUSEBUTTONDOWN:  # Если нажата кнопка мыши
-                settings_dict = read_settings()  # Чтение настроек
-                if easy_rect.collidepoint(event.pos):  # Если нажата кнопка "Простая"
-                    settings_dict['Сложность'] = 1  # Изменение сложности
-                    update_settings(settings_dict)  # Обновление настроек
-                elif middle_rect.collidepoint(event.pos):  # Если нажата кнопка "Средняя"
-                    settings_dict['Сложность'] = 2  # Изменение сложности
-                    update_settings(settings_dict)  # Обновление настроек
-                elif hard_rect.collidepoint(event.pos):  # Если нажата кнопка "Сложная"
-                    settings_dict['Сложность'] = 3  # Изменение сложности
-                    update_settings(settings_dict)  # Обновление настроек
-                elif back_rect.collidepoint(event.pos):  # Если нажата кнопка "Назад"
-                    return  # Возврат в предыдущее меню
-
-        pygame.display.flip()  # Обновление экрана
-        clock.tick(FPS)  # Ограничение FPS
-
-
-def read_settings():
-    settings_dict = {}  # Словарь для статистики
-    settings_file = os.path.join('data', 'settings.txt')  # Путь к файлу статистики
-    try:
-        with open(settings_file, 'r', encoding='utf-8') as file:  # Открытие файла на чтение
-            for line in file:  # Чтение строк
-                key, value = line.strip().split(' - ')  # Разделение строки на ключ и значение
-                settings_dict[key] = int(value)  # Добавление значения в словарь
-    except FileNotFoundError:  # Если файл не найден
-        settings_dict = {  # Создание начальных значений
-            'Сложность': 0
-        }
-
-        update_settings(settings_dict)  # Обновление файла статистики
-    return settings_dict  # Возврат статистики
-
-
-# Обновление настроек
-def update_settings(settings_dict):
-    settings_file = os.path.join('data', 'settings.txt')  # Путь к файлу настроек
-    with open(settings_file, 'w', encoding='utf-8') as file:  # Открытие файла на запись
-        for key, value in settings_dict.items():  # Проход по элементам словаря
-            file.write(f"{key} - {value}\n")  # Запись строки в файл
-
-
-# Экран статистики
-def stats_screen():
-    stats_image = load_image('stats_background.png')  # Загрузка фона для экрана статистики
-    stats = read_stats()  # Чтение статистики
-
-    font = pygame.font.Font(None, 50)  # Шрифт для текста
-    levels_text = font.render(f"Уровней сыграно: {stats['уровней сыграно']}", True, pygame.Color('white'))  # Текст
-    # статистики
-    time_text = font.render(f"Времени в игре: {round(stats['времени в игре'] / 60, 2)} мин", True,
-                            pygame.Color('white'))  #
-    # Текст времени
-    wins_text = font.render(f"Побед: {stats['кол-во побед']}", True, pygame.Color('white'))  # Текст побед
-    losses_text = font.render(f"Поражений: {stats['кол-во поражений']}", True, pygame.Color('white'))  # Текст поражений
-    back_text = font.render("Назад", True, pygame.Color('white'))  # Текст кнопки "Назад"
-
-    back_rect = back_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 150))  # Позиция кнопки "Назад"
-
-    while True:
-        screen.blit(stats_image, (0, 0))  # Отрисовка фона
-        screen.blit(levels_text, (WIDTH // 2 - levels_text.get_width() // 2, HEIGHT // 2 - 100))  # Отрисовка текста
-        screen.blit(time_text, (WIDTH // 2 - time_text.get_width() // 2, HEIGHT // 2 - 50))  # Отрисовка текста
-        screen.blit(wins_text, (WIDTH // 2 - wins_text.get_width() // 2, HEIGHT // 2))  # Отрисовка текста
-        screen.blit(losses_text, (WIDTH // 2 - losses_text.get_width() // 2, HEIGHT // 2 + 50))  # Отрисовка текста
-        screen.blit(back_text, back_rect)  # Отрисовка кнопки "Назад"
-
-        for event in pygame.event.get():  # Обработка событий
-            if event.type == pygame.QUIT:  # Если событие - закрытие окна
-                terminate()  # Завершение программы
-            elif event.type == pygame.MOUSEBUTTONDOWN:  # Если нажата кнопка мыши
-                if back_rect.collidepoint(event.pos):  # Если нажата кнопка "Назад"
-                    return  # Возврат в главное меню
-
-        pygame.display.flip()  # Обновление экрана
-        clock.tick(FPS)  # Ограничение FPS
-
-
-# Чтение статистики из файла
-def read_stats():
-    stats = {}  # Словарь для статистики
-    stats_file = os.path.join('data', 'stats.txt')  # Путь к файлу статистики
-    try:
-        with open(stats_file, 'r', encoding='utf-8') as file:  # Открытие файла на чтение
-            for line in file:  # Чтение строк
-                key, value = line.strip().split(' - ')  # Разделение строки на ключ и значение
-                stats[key] = int(value)  # Добавление значения в словарь
-    except FileNotFoundError:  # Если файл не найден
-        stats = {  # Создание начальных значений
-            'уровней сыграно': 0,
-            'времени в игре': 0,
-            'кол-во побед': 0,
-            'кол-во поражений': 0,
-        }
-        update_stats(stats)  # Обновление файла статистики
-    return stats  # Возврат статистики
-
-
-# Обновление статистики в файле
-def update_stats(stats):
-    stats_file = os.path.join('data', 'stats.txt')  # Путь к файлу статистики
-    with open(stats_file, 'w', encoding='utf-8') as file:  # Открытие файла на запись
-        for key, value in stats.items():  # Проход по элементам словаря
-            file.write(f"{key} - {value}\n")  # Запись строки в файл
-
-
-def win():
-    stats_r = read_stats()  # Чтение статистики
-    stats_r['кол-во побед'] += 1  # Увеличение количества побед
-    stats_r['уровней сыграно'] += 1
-    update_stats(stats_r)  # Обновление статистики
-
-    gameover_image = load_image('win.png')  # Загрузка изображения победы
-    screen.blit(gameover_image, (0, 0))  # Отображение изображения на экране
-    pygame.display.flip()  # Обновление экрана
-
-    start_time = pygame.time.get_ticks()  # Время начала показа экрана
-    input_locked = True  # Флаг блокировки ввода (первые 3 секунды)
-    total_wait_time = 5000  # Общее время показа (5 секунд)
-
-    while True:
-        current_time = pygame.time.get_ticks()  # Текущее время
-        elapsed = current_time - start_time  # Прошедшее время
-
-        if elapsed >= 3000:  # Если прошло 3 секунды
-            input_locked = False  # Разблокировка ввода
-
-        for event in pygame.event.get():  # Обработка событий
-            if event.type == pygame.QUIT:  # Если событие - закрытие окна
-                terminate()  # Завершение программы
-            elif not input_locked:  # Если ввод разблокирован
-                if event.type in [pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]:  # Если нажата клавиша или кнопка мыши
-                    return  # Возврат в меню
-
-        if elapsed >= total_wait_time:  # Если прошло 5 секунд
-            return  # Автоматический возврат в меню
-
-        clock.tick(FPS)  # Ограничение FPS
-
+# Процедурный лабиринт без заранее созданных тайлов: куски генерируются вокруг игрока
+def streamed_level(difficulty):
+    grid = StreamedMaze(STREAMED_MAZE_SEED, STREAMED_MAZE_EXIT)
+    hazards = HazardField(load_hazards(f'maze {STREAMED_MAZE_SEED}', difficulty), grid)
+    return PreparedLevel(f'maze {STREAMED_MAZE_SEED}', difficulty, grid, hazards, grid.spawn, NO_HASH,
+                         STREAMED_MAZE_SEED, STREAMED_MAZE_EXIT)
 
-def gameover():
-    stats_r = read_stats()  # Чтение статистики
-    stats_r['кол-во поражений'] += 1  # Увеличение количества поражений
-    stats_r['уровней сыграно'] += 1
-    update_stats(stats_r)  # Обновление статистики
 
-    gameover_image = load_image('gameover.png')  # Загрузка изображения поражения
-    screen.blit(gameover_image, (0, 0))  # Отображение изображения на экране
-    pygame.display.flip()  # Обновление экрана
-
-    start_time = pygame.time.get_ticks()  # Время начала показа экрана
-    input_locked = True  # Флаг блокировки ввода (первые 3 секунды)
-    total_wait_time = 5000  # Общее время показа (5 секунд)
-
-    while True:
-        current_time = pygame.time.get_ticks()  # Текущее время
-        elapsed = current_time - start_time  # Прошедшее время
-
-        if elapsed >= 3000:  # Если прошло 3 секунды
-            input_locked = False  # Разблокировка ввода
-
-        for event in pygame.event.get():  # Обработка событий
-            if event.type == pygame.QUIT:  # Если событие - закрытие окна
-                terminate()  # Завершение программы
-            elif not input_locked:  # Если ввод разблокирован
-                if event.type in [pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]:  # Если нажата клавиша или кнопка мыши
-                    return  # Возврат в меню
-
-        if elapsed >= total_wait_time:  # Если прошло 5 секунд
-            return  # Автоматический возврат в меню
-
-        clock.tick(FPS)  # Ограничение FPS
-
-
-class Wave:
-    def __init__(self, level_width, level_height):
-        self.active = False  # Флаг активности волны
-        self.level_width = level_width  # Ширина уровня
-        self.level_height = level_height  # Высота уровня
-        self.y_position = 0  # Текущая позиция волны
-        self.speed = 3  # Скорость движения волны
-        self.height = 30  # Высота волны
-
-    # Активация волны
-    def activate(self):
-        self.active = True  # Установка флага активности
-        self.y_position = 0  # Сброс позиции волны
-
-    # Обновление позиции волны
-    def update(self):
-        if self.active:  # Если волна активна
-            self.y_position += self.speed  # Движение волны вниз
-            if self.y_position >= self.level_height:  # Если волна достигла низа уровня
-                self.active = False  # Деактивация волны
-
-    # Отрисовка волны
-    def draw(self, screen, camera):
-        if self.active:  # Если волна активна
-            wave_rect = pygame.Rect(0, self.y_position, self.level_width, self.height)  # Создание прямоугольника волны
-            adjusted_rect = camera.apply_rect(wave_rect)  # Применение камеры
-            surface = pygame.Surface((wave_rect.width, wave_rect.height), pygame.SRCALPHA)  # Создание поверхности
-            surface.fill((0, 0, 255, 128))  # Заливка поверхности цветом
-            screen.blit(surface, adjusted_rect.topleft)  # Отрисовка поверхности на экране
-
-    # Проверка столкновения волны с игроком
-    def check_collision(self, player_rect):
-        if self.active:  # Если волна активна
-            wave_rect = pygame.Rect(0, self.y_position, self.level_width, self.height)  # Создание прямоугольника волны
-            return player_rect.colliderect(wave_rect)  # Проверка столкновения
-        return False  # Если волна не активна, столкновения нет
-
-
-class Camera:
-    def __init__(self, width, height):
-        self.camera = pygame.Rect(0, 0, width, height)  # Прямоугольник камеры
-        self.width = width  # Ширина камеры
-        self.height = height  # Высота камеры
-
-    # Применение камеры к объекту
-    def apply(self, entity):
-        return entity.rect.move(self.camera.topleft)  # Смещение объекта относительно камеры
-
-    # Обновление позиции камеры
-    def update(self, target):
-        x = -target.rect.x + int(self.width / 2)  # Вычисление смещения по X
-        y = -target.rect.y + int(self.height / 2)  # Вычисление смещения по Y
-        x = min(0, x)  # Ограничение смещения по X
-        y = min(0, y)  # Ограничение смещения по Y
-        x = max(-(level_width - self.width), x)  # Ограничение смещения по X
-        y = max(-(level_height - self.height), y)  # Ограничение смещения по Y
-        self.camera = pygame.Rect(x, y, self.width, self.height)  # Обновление прямоугольника камеры
-
-    # Применение камеры к прямоугольнику
-    def apply_rect(self, rect):
-        return rect.move(self.camera.topleft)  # Смещение прямоугольника относительно камеры
-
-
-# Главное меню
-def main_menu():
-    menu_image = load_image('menu_background.png')  # Загрузка фона меню
-    font = pygame.font.Font(None, 50)  # Шрифт для текста
-    play_text = font.render("Играть", True, pygame.Color('white'))  # Текст кнопки "Играть"
-    stats_text = font.render("Статистика", True, pygame.Color('white'))  # Текст кнопки "Статистика"
-    settings_text = font.render("Настройки", True, pygame.Color('white'))  # Текст кнопки "Настройки"
-    exit_text = font.render("Выход", True, pygame.Color('white'))  # Текст кнопки "Выход"
-
-    play_rect = play_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))  # Позиция кнопки "Играть"
-    stats_rect = stats_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))  # Позиция кнопки "Статистика"
-    settings_rect = settings_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))  # Позиция кнопки "Настройки"
-    exit_rect = exit_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50 * 2))  # Позиция кнопки "Выход"
+# Один забег по подготовленному уровню; возвращает 'win' или 'loss'
+def play_level(game, prepared):
+    screen, profiler, clock = game.screen, game.profiler, game.clock
+    level_name, difficulty = prepared.name, prepared.difficulty
+    grid, hazards = prepared.grid, prepared.hazards  # Построены в фоновом потоке
+    player = Player(*prepared.spawn, game.tile_images['player'])  # Спрайтом становится только игрок
+    if grid.width is not None:
+        level_width = grid.width * TILE_SIZE  # Ширина уровня в пикселях
+        level_height = grid.height * TILE_SIZE  # Высота уровня в пикселях
+    else:
+        level_width = level_height = None  # Размеры процедурного лабиринта не ограничены
+    camera = Camera(WIDTH, HEIGHT, level_width, level_height)  # Создание камеры
+    if CHUNK_RENDER or STREAMED_MAZE:
+        level_renderer = ChunkRenderer(grid, game.tile_images)  # Куски фона собираются по мере появления на экране
+    else:
+        level_renderer = TileRenderer(grid, game.tile_images)  # Видимые клетки рисуются из сетки каждый кадр
+    # Запись ввода для воспроизведения забега
+    replay = Replay(level_name, prepared.source_hash, difficulty, player.rect, prepared.seed, prepared.maze_exit)
+    recorder = Recorder(replay, read_keys)  # Клавиши читаются и записываются раз в такт
+    simulation = Simulation(grid, player.rect, hazards)  # Движение, выход и опасности
+    watcher = LevelWatcher(level_name, grid) if HOT_RELOAD and not STREAMED_MAZE else None
+    if game.settings_store.get('Туман'):  # Видны только клетки в поле зрения игрока
+        visibility, fog = VisibilityCache(grid), FogOverlay(WIDTH, HEIGHT)
+    else:
+        visibility = fog = None
+    visible = None  # Клетки, видимые с клетки игрока
+    game.assets.preload(['win.png', 'gameover.png'])  # Экраны результата загружаются во время уровня
+
+    font = get_font(36)  # Шрифт для текста (можно изменить размер)
+    shown_seconds = timer_text = timer_string = None  # Секунда секундомера, которая сейчас отрисована
+    player_on_screen = player.rect.copy()  # Прямоугольник игрока на экране (один на весь уровень, меняется на месте)
+    dirty_renderer = DirtyRectRenderer(screen)  # Первый кадр уровня всегда рисуется целиком
+    alpha = 0.0  # Доля такта для сглаживания движения
+    player_rect = player.rect  # Положение игрока на экране
+
+    # Отрисовка игровой сцены (при выводе изменившихся областей - внутри текущей области отсечения)
+    def draw_scene():
+        screen.fill((0, 0, 0))  # Очистка экрана
+        level_renderer.draw(screen, camera)  # Отрисовка видимой части уровня
+        hazards.draw(screen, camera, alpha)  # Отрисовка волн и других опасностей
+        screen.blit(player.image, player_on_screen)  # Отрисовка игрока
+        if fog is not None:
+            fog.draw(screen, camera, visible)  # Темнота поверх всего, что не видно игроку
+        screen.blit(timer_text, (10, 10))  # Отрисовка времени (координаты: x=10, y=50)
 
+    clock.tick()  # Время, проведенное в меню, не попадает в первый кадр
     while True:
-        screen.blit(menu_image, (0, 0))  # Отрисовка фона меню
-        screen.blit(play_text, play_rect)  # Отрисовка кнопки "Играть"
-        screen.blit(stats_text, stats_rect)  # Отрисовка кнопки "Статистика"
-        screen.blit(settings_text, settings_rect)  # Отрисовка кнопки "Настройки"
-        screen.blit(exit_text, exit_rect)  # Отрисовка кнопки "Выход"
-
-        for event in pygame.event.get():  # Обработка событий
-            if event.type == pygame.QUIT:  # Если событие - закрытие окна
-                terminate()  # Завершение программы
-            elif event.type == pygame.MOUSEBUTTONDOWN:  # Если нажата кнопка мыши
-                if play_rect.collidepoint(event.pos):  # Если нажата кнопка "Играть"
-                    return  # Возврат из меню
-                elif stats_rect.collidepoint(event.pos):  # Если нажата кнопка "Статистика"
-                    stats_screen()  # Переход на экран статистики
-                elif settings_rect.collidepoint(event.pos):  # Если нажата кнопка "Настройки"
-                    settings()  # Переход на экран настроек
-                elif exit_rect.collidepoint(event.pos):  # Если нажата кнопка "Выход"
-                    terminate()  # Завершение программы
-
-        pygame.display.flip()  # Обновление экрана
-        clock.tick(FPS)  # Ограничение FPS
-
-
-start_screen()  # Отображение стартового экрана
-levels = ['lvl 1.txt', 'lvl 2.txt', 'lvl 3.txt', 'lvl 4.txt', 'lvl 5.txt']
-count_level = 0
-
-# Основной цикл игры
-while True:
-    main_menu()  # Переход в главное меню
-
-    # Инициализация новой игры
-    all_sprites.empty()  # Очистка всех спрайтов
-    tiles_group.empty()  # Очистка тайлов
-    player_group.empty()  # Очистка игрока
-
-    player = generate_level(load_level(levels[count_level]))  # Генерация уровня и создание игрока
-    level = load_level(levels[count_level])  # Загрузка уровня
-    level_width = len(level[0]) * TILE_SIZE  # Ширина уровня в пикселях
-    level_height = len(level) * TILE_SIZE  # Высота уровня в пикселях
-    wave = Wave(level_width, level_height)  # Создание волны
-    level_start_time = pygame.time.get_ticks()  # Время начала уровня
-    camera = Camera(WIDTH, HEIGHT)  # Создание камеры
-
-    running = True  # Флаг работы игрового цикла
-    font = pygame.font.Font(None, 36)  # Шрифт для текста (можно изменить размер)
-
-    temp_time = 0
-
-    while running:
+        profiler.begin_frame()
+        frame_ms = clock.tick(RENDER_FPS)  # Время кадра (с ожиданием, если частота ограничена)
+        profiler.mark('wait')
         for event in pygame.event.get():  # Обработка событий
             if event.type == pygame.QUIT:  # Если событие - закрытие окна
-                terminate()  # Завершение программы
-
-        keys = pygame.key.get_pressed()  # Получение состояния клавиш
-        old_x, old_y = player.rect.x, player.rect.y  # Текущая позиция игрока
-        dx, dy = 0, 0  # Смещение игрока
-
-        dx -= keys[pygame.K_a]  # Движение влево
-        dx += keys[pygame.K_d]  # Движение вправо
-        dy -= keys[pygame.K_w]  # Движение вверх
-        dy += keys[pygame.K_s]  # Движение вниз
-
-        if dx != 0 or dy != 0:  # Если игрок движется
-            length = (dx ** 2 + dy ** 2) ** 0.5  # Длина вектора движения
-            dx = dx / length * STEP  # Нормализация по X
-            dy = dy / length * STEP  # Нормализация по Y
-
-        new_x = old_x + dx  # Новая позиция по X
-        new_y = old_y + dy  # Новая позиция по Y
-
-        # Проверка столкновений
-        temp_rect_x = player.rect.move(dx, 0)  # Временный прямоугольник для проверки по X
-        temp_rect_y = player.rect.move(0, dy)  # Временный прямоугольник для проверки по Y
-
-        collision_x = any(
-            t.image == tile_images['wall'] and temp_rect_x.colliderect(t.rect)
-            for t in tiles_group
-        )
-        collision_y = any(
-            t.image == tile_images['wall'] and temp_rect_y.colliderect(t.rect)
-            for t in tiles_group
-        )
-
-        if not collision_x:  # Если нет столкновения по X, обновляем позицию
-            player.rect.x = new_x
-        if not collision_y:  # Если нет столкновения по Y, обновляем позицию
-            player.rect.y = new_y
-
-        # Проверка выхода
-        for tile in tiles_group:  # Проход по тайлам
-            if isinstance(tile, ExitTile) and player.rect.colliderect(tile.rect):  # Если игрок на выходе
-                win()  # Вызов экрана победы
-                if count_level == 5:
-                    count_level = 0
-                else:
-                    count_level += 1
-                    stats = read_stats()  # Чтение статистики
-                    stats['времени в игре'] += temp_time  # Увеличение
-                    print(temp_time)
-                    update_stats(stats)  # Обновление статистики
-                running = False  # Завершение игрового цикла
-
-        # Обновление волны
-        current_time = pygame.time.get_ticks()  # Текущее время
-        Diff = read_settings()['Сложность']
-        time_for_live = 0
-        if Diff == 1:
-            time_for_live = 16000
-        elif Diff == 2:
-            time_for_live = 12000
-        elif Diff == 3:
-            time_for_live = 8000
-        if not wave.active and (current_time - level_start_time) >= time_for_live:  # Если прошло n секунд
-            wave.activate()  # Активация волны
-
-        if wave.active:  # Если волна активна
-            wave.update()  # Обновление позиции волны
-            if wave.check_collision(player.rect):  # Если волна столкнулась с игроком
-                gameover()  # Вызов экрана поражения
-                count_level = 0
-                stats = read_stats()  # Чтение статистики
-                stats['времени в игре'] += temp_time  # Увеличение
-                print(temp_time)
-                update_stats(stats)  # Обновление статистики
-                running = False  # Завершение игрового цикла
+                game.terminate()  # Завершение программы
+            if event.type == pygame.KEYDOWN and event.key == PROFILE_KEY:
+                profiler.toggle()
+                dirty_renderer = DirtyRectRenderer(screen)  # Панель появляется или исчезает - кадр рисуется целиком
+            elif event.type == pygame.KEYDOWN and event.key == TRACE_KEY:
+                profiler.export_trace(os.path.join('data', time.strftime('profile-%Y%m%d-%H%M%S.json')))
+        patch = watcher.poll() if watcher is not None else None
+        if patch is not None:  # Файл уровня изменился - сетка уже обновлена, меняются зависящие от нее части
+            if patch.resized:
+                camera.level_width, camera.level_height = grid.width * TILE_SIZE, grid.height * TILE_SIZE
+                level_renderer = type(level_renderer)(grid, game.tile_images)  # Фон собирается заново
+                hazards = simulation.hazards = HazardField(load_hazards(level_name, difficulty), grid)
+            else:
+                if isinstance(level_renderer, ChunkRenderer):
+                    level_renderer.patch_cells(patch.cells)  # Только изменившиеся клетки в собранных кусках
+                if patch.walls_changed:
+                    hazards.refresh_floods()
+            if visibility is not None and patch.walls_changed:
+                visibility.clear()  # Стены изменились - видимость считается заново
+            if grid.collides(player.rect) and patch.spawn is not None:  # Игрок замурован - возврат на старт
+                player.rect.topleft = (TILE_SIZE * patch.spawn[0] + 15, TILE_SIZE * patch.spawn[1] + 15)
+                simulation.previous_position = player.rect.topleft
+            dirty_renderer = DirtyRectRenderer(screen)
+        profiler.mark('events')
+
+        # Симуляция идет тактами постоянной длины, сколько бы кадров ни успевала отрисовка
+        alpha = simulation.advance(frame_ms, recorder.read)
+        if STREAMED_MAZE:
+            grid.update(*player.rect.center)  # Подгрузка кусков лабиринта вокруг игрока
+        profiler.mark('simulation')
+
+        if simulation.result is not None:  # Забег окончен - запись сохраняется для воспроизведения
+            replay.finish(simulation.result, simulation.player_rect.topleft)
+            if watcher is None or not watcher.reloads:  # После правки уровня запись не воспроизвести
+                save_run(replay)
+            # Запись забега в фоне
+            game.run_history.record(level_name, difficulty, simulation.result, simulation.elapsed_ms)
+            return simulation.result
 
         # Отрисовка
-        camera.update(player)  # Обновление камеры
-        screen.fill((0, 0, 0))  # Очистка экрана
-        for tile in tiles_group:  # Отрисовка тайлов
-            screen.blit(tile.image, camera.apply(tile))
-        wave.draw(screen, camera)  # Отрисовка волны
-        screen.blit(player.image, camera.apply(player))  # Отрисовка игрока
-
-        # Секундомер
-        elapsed_time = current_time - level_start_time  # Прошедшее время в миллисекундах
-        seconds = elapsed_time // 1000  # Преобразование в секунды
-        minutes = seconds // 60  # Преобразование в минуты
-        seconds %= 60  # Оставшиеся секунды
-        timer_text = font.render(f"Время: {minutes:02}:{seconds:02}", True,
-                                 pygame.Color('white'))  # Форматирование времени
-        screen.blit(timer_text, (10, 10))  # Отрисовка времени (координаты: x=10, y=50)
-
-        temp_time = seconds
-
-        pygame.display.flip()  # Обновление экрана
-        clock.tick(FPS)  # Ограничение FPS
-
-# Завершение программы
-terminate()
+        player_rect = simulation.interpolated_rect(alpha)  # Игрок между прошлым и текущим тактом
+        camera.follow(player_rect)  # Обновление камеры
+        camera.apply_rect_into(player_rect, player_on_screen)
+        if visibility is not None:  # Поле зрения считается заново только на новой клетке
+            visible = visibility.around(player_rect.centerx // TILE_SIZE, player_rect.centery // TILE_SIZE)
+        profiler.mark('camera')
+
+        # Секундомер: строка форматируется и текст перерисовывается только при смене секунды
+        elapsed_seconds = simulation.elapsed_ms // 1000  # Прошедшее время в секундах
+        if elapsed_seconds != shown_seconds:
+            minutes, seconds = divmod(elapsed_seconds, 60)  # Минуты и оставшиеся секунды
+            timer_string = f"Время: {minutes:02}:{seconds:02}"  # Форматирование времени
+            timer_text = font.render(timer_string, True, pygame.Color('white'))
+            shown_seconds = elapsed_seconds
+        profiler.mark('timer')
+
+        if DIRTY_RECT_RENDER and not profiler.enabled:  # Панель профилировщика требует полной перерисовки
+            hazard_rect = hazards.bounds(camera, alpha)  # Опасности на экране
+            dirty_renderer.frame(camera.camera.topleft, {  # Подвижные объекты на экране
+                'player': (player_on_screen, None),
+                'hazards': (hazard_rect, hazards.flood_key),  # Затопление растет и внутри прежних границ
+                'timer': (timer_text.get_rect(topleft=(10, 10)), timer_string),
+                'fog': (screen.get_rect() if fog is not None else None, visible),  # Маска меняется по всему экрану
+            }, draw_scene)
+            profiler.mark('render')
+        else:
+            draw_scene()  # Отрисовка всей сцены
+            profiler.mark('render')
+            profiler.draw(screen)  # Панель профилировщика поверх сцены
+            profiler.mark('overlay')
+            pygame.display.flip()  # Обновление экрана
+            profiler.mark('flip')
+        profiler.end_frame()
+
+
+def main():
+    game = Game()
+    game.level_pack = open_pack()  # Уровни из архива читаются без копирования
+    # Следующий уровень строится в фоне, пока показаны заставка, меню и экраны результата
+    loader = LevelLoader(pack=game.level_pack)
+    count_level = 0
+    if not STREAMED_MAZE:
+        loader.prefetch(LEVELS[count_level], game.settings_store.get('Сложность'))
+    start_screen(game)  # Отображение стартового экрана
+
+    # Основной цикл игры
+    while True:
+        main_menu(game)  # Переход в главное меню
+        difficulty = game.settings_store.get('Сложность')  # Сложность на время уровня
+        if STREAMED_MAZE:
+            prepared = streamed_level(difficulty)
+        else:
+            loader.prefetch(LEVELS[count_level], difficulty)  # Сложность могли сменить в меню
+            if not loader.ready(LEVELS[count_level], difficulty):
+                loading_screen(game, loader)  # Полоса прогресса, пока загрузка не закончится
+            prepared = loader.take(LEVELS[count_level], difficulty)
+
+        result = play_level(game, prepared)
+        if result == 'win':  # Если игрок дошел до выхода
+            count_level = (count_level + 1) % len(LEVELS)  # После последнего уровня - снова первый
+        else:  # Если волна столкнулась с игроком
+            count_level = 0
+        if not STREAMED_MAZE:
+            loader.prefetch(LEVELS[count_level], difficulty)  # Загрузка идет, пока показан экран результата
+        if result == 'win':
+            win(game)  # Вызов экрана победы
+        else:
+            gameover(game)  # Вызов экрана поражения
+
+
+if __name__ == '__main__':
+    main()
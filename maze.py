@@ -0,0 +1,146 @@
+import random
+from collections import OrderedDict
+
+from level import EXIT, FLOOR, TILE_SIZE, WALL
+
+CHUNK_CELLS = 30  # Сторона куска лабиринта в клетках (10 комнат 2x2 со стенами толщиной в клетку)
+ROOM_PERIOD = 3  # Комната 2x2 и стена
+STREAM_RADIUS = 2  # Сколько кусков вокруг игрока держится загруженными
+MAX_CHUNKS = 256  # Сколько кусков хранится в кэше генерации
+
+
+# Зерно генератора для куска или его границы
+def chunk_seed(seed, cx, cy, salt):
+    return (seed * 0x9E3779B1 ^ cx * 0x85EBCA77 ^ cy * 0xC2B2AE3D ^ salt * 0x27D4EB2F) & 0xFFFFFFFFFFFF
+
+
+# Генерация куска: идеальный лабиринт из комнат и проходы в соседние куски
+def generate_chunk(seed, cx, cy, size=CHUNK_CELLS):
+    rooms = size // ROOM_PERIOD  # Комнат по стороне куска
+    cells = bytearray([WALL]) * (size * size)
+
+    def open_cell(x, y):
+        cells[y * size + x] = FLOOR
+
+    def open_room(i, j):  # Комната 2x2 с левым верхним углом в (3i + 1, 3j + 1)
+        for y in (ROOM_PERIOD * j + 1, ROOM_PERIOD * j + 2):
+            for x in (ROOM_PERIOD * i + 1, ROOM_PERIOD * i + 2):
+                open_cell(x, y)
+
+    # Обход в глубину по комнатам с отдельным генератором для куска
+    rng = random.Random(chunk_seed(seed, cx, cy, 0))
+    visited = bytearray(rooms * rooms)
+    stack = [(0, 0)]
+    visited[0] = 1
+    open_room(0, 0)
+    while stack:
+        i, j = stack[-1]
+        neighbours = [(i + di, j + dj) for di, dj in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                      if 0 <= i + di < rooms and 0 <= j + dj < rooms and not visited[(j + dj) * rooms + i + di]]
+        if not neighbours:
+            stack.pop()
+            continue
+        ni, nj = rng.choice(neighbours)
+        visited[nj * rooms + ni] = 1
+        open_room(ni, nj)
+        if ni != i:  # Проход в вертикальной стене между комнатами
+            wall_x = ROOM_PERIOD * max(i, ni)
+            open_cell(wall_x, ROOM_PERIOD * j + 1)
+            open_cell(wall_x, ROOM_PERIOD * j + 2)
+        else:  # Проход в горизонтальной стене между комнатами
+            wall_y = ROOM_PERIOD * max(j, nj)
+            open_cell(ROOM_PERIOD * i + 1, wall_y)
+            open_cell(ROOM_PERIOD * i + 2, wall_y)
+        stack.append((ni, nj))
+
+    # Проходы через левую и верхнюю границы; правая и нижняя принадлежат соседям
+    if cx > 0:
+        row = random.Random(chunk_seed(seed, cx, cy, 1)).randrange(rooms)
+        open_cell(0, ROOM_PERIOD * row + 1)
+        open_cell(0, ROOM_PERIOD * row + 2)
+    if cy > 0:
+        column = random.Random(chunk_seed(seed, cx, cy, 2)).randrange(rooms)
+        open_cell(ROOM_PERIOD * column + 1, 0)
+        open_cell(ROOM_PERIOD * column + 2, 0)
+    return cells
+
+
+# Бесконечный вправо и вниз лабиринт, который генерируется кусками вокруг игрока
+class StreamedMaze:
+    width = None  # Размеры не ограничены
+    height = None
+
+    def __init__(self, seed, exit_cell=None, chunk_cells=CHUNK_CELLS, radius=STREAM_RADIUS,
+                 max_chunks=MAX_CHUNKS, tile_size=TILE_SIZE):
+        self.seed = seed  # Зерно генерации
+        self.chunk_cells = chunk_cells  # Сторона куска в клетках
+        self.radius = radius  # Радиус загрузки в кусках
+        self.max_chunks = max(max_chunks, (2 * radius + 1) ** 2)  # Загруженные куски всегда помещаются в кэш
+        self.tile_size = tile_size  # Размер клетки в пикселях
+        self.spawn = (1, 1)  # Игрок появляется в первой комнате
+        self.exits = [exit_cell] if exit_cell else []  # Без выхода лабиринт бесконечный
+        self.chunks = OrderedDict()  # Сгенерированные куски в порядке использования
+        self.active = set()  # Куски вокруг игрока
+        self.generated = 0  # Сколько раз кусок генерировался
+
+    # Кусок по его координатам (из кэша или сгенерированный заново)
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        cells = self.chunks.get(key)
+        if cells is not None:
+            self.chunks.move_to_end(key)
+            return cells
+        cells = generate_chunk(self.seed, cx, cy, self.chunk_cells)
+        self.generated += 1
+        for x, y in self.exits:  # Выход ставится в кусок, которому принадлежит его клетка
+            if (x // self.chunk_cells, y // self.chunk_cells) == key:
+                cells[(y % self.chunk_cells) * self.chunk_cells + x % self.chunk_cells] = EXIT
+        self.chunks[key] = cells
+        self._evict()
+        return cells
+
+    # Вытеснение давно не использованных кусков, кроме загруженных вокруг игрока
+    def _evict(self):
+        for key in list(self.chunks):
+            if len(self.chunks) <= self.max_chunks:
+                break
+            if key not in self.active:
+                del self.chunks[key]
+
+    # Подгрузка кусков вокруг точки (в пикселях) и выгрузка остальных
+    def update(self, x, y):
+        size = self.chunk_cells * self.tile_size
+        cx, cy = int(x) // size, int(y) // size
+        self.active = {(cx + dx, cy + dy)
+                       for dx in range(-self.radius, self.radius + 1)
+                       for dy in range(-self.radius, self.radius + 1)
+                       if cx + dx >= 0 and cy + dy >= 0}
+        for key in self.active:
+            self.chunk(*key)
+
+    # Код клетки (левее и выше начала лабиринта - стена)
+    def cell(self, x, y):
+        if x < 0 or y < 0:
+            return WALL
+        cx, lx = divmod(x, self.chunk_cells)
+        cy, ly = divmod(y, self.chunk_cells)
+        return self.chunk(cx, cy)[ly * self.chunk_cells + lx]
+
+    # Проверка, есть ли клетка с заданным кодом под прямоугольником
+    def _touches(self, rect, code):
+        if rect.width <= 0 or rect.height <= 0:  # Пустой прямоугольник ни с чем не пересекается
+            return False
+        size = self.tile_size
+        for y in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for x in range(rect.left // size, (rect.right - 1) // size + 1):
+                if self.cell(x, y) == code:
+                    return True
+        return False
+
+    # Столкновение прямоугольника со стенами
+    def collides(self, rect):
+        return self._touches(rect, WALL)
+
+    # Попадание прямоугольника в зону выхода
+    def at_exit(self, rect):
+        return self._touches(rect, EXIT)
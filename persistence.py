@@ -0,0 +1,248 @@
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+
+SETTINGS_CHECK_INTERVAL = 1.0  # Как часто (в секундах) проверять, не изменили ли файл настроек снаружи
+HISTORY_BATCH_SIZE = 64  # Сколько забегов записывается в базу одной транзакцией
+HISTORY_FLUSH_TIMEOUT = 2.0  # Сколько секунд экран статистики ждет записи забегов
+
+log = logging.getLogger(__name__)
+
+
+# Маска прав новых файлов процесса (узнать ее можно только заменив, поэтому она сразу возвращается)
+def current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Схема базы истории забегов
+HISTORY_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    level TEXT NOT NULL,
+    difficulty INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_level_result ON runs (level, result);
+CREATE TABLE IF NOT EXISTS summary (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    levels INTEGER NOT NULL,
+    time_ms INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL
+);
+'''
+
+
+# Атомарная запись файла (текст или байты) через временный файл и переименование
+def write_atomic(path, data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    directory = os.path.dirname(path) or '.'
+    try:
+        mode = os.stat(path).st_mode & 0o7777  # Права заменяемого файла сохраняются
+    except FileNotFoundError:
+        mode = 0o666 & ~current_umask()  # Как у файла, созданного через open
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')  # Временный файл рядом с целевым (права 0600)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            os.chmod(temp_path, mode)
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())  # Данные на диске до переименования
+        os.replace(temp_path, path)  # Переименование атомарно: файл либо старый, либо новый
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+# Настройки в памяти с записью на диск только при изменении
+class SettingsStore:
+    def __init__(self, path, defaults=None, check_interval=SETTINGS_CHECK_INTERVAL):
+        self.path = path  # Путь к файлу настроек
+        self.defaults = dict(defaults or {})  # Значения по умолчанию
+        self.check_interval = check_interval  # Период проверки внешних изменений
+        self.values = {}  # Текущие значения
+        self.mtime = None  # Время изменения прочитанного файла
+        self.last_check = 0.0  # Время последней проверки файла
+        self.load()
+
+    # Чтение файла настроек
+    def load(self):
+        values = dict(self.defaults)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:  # Открытие файла на чтение
+                for line in file:  # Чтение строк
+                    if not line.strip():
+                        continue
+                    key, value = line.strip().split(' - ')  # Разделение строки на ключ и значение
+                    values[key] = int(value)
+        except FileNotFoundError:  # Если файла нет, создаем его со значениями по умолчанию
+            self.values = values
+            self.save()
+            return
+        self.values = values
+        self.mtime = os.stat(self.path).st_mtime_ns
+        self.last_check = time.monotonic()
+
+    # Запись настроек на диск
+    def save(self):
+        write_atomic(self.path, ''.join(f"{key} - {value}\n" for key, value in self.values.items()))
+        self.mtime = os.stat(self.path).st_mtime_ns
+        self.last_check = time.monotonic()
+
+    # Перечитывание файла, если его изменили снаружи (не чаще check_interval, если не force)
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_check < self.check_interval:
+            return
+        self.last_check = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self.mtime:
+            self.load()
+
+    # Получение значения настройки
+    def get(self, key, default=0):
+        self.refresh()
+        return self.values.get(key, default)
+
+    # Изменение значения настройки
+    def set(self, key, value):
+        self.refresh(force=True)  # Правки других ключей, сделанные снаружи, не затираются
+        if self.values.get(key) == value:  # Значение не изменилось - запись не нужна
+            return
+        self.values[key] = int(value)
+        self.save()
+
+
+# Чтение старого файла статистики с четырьмя счетчиками
+def read_legacy_stats(path):
+    stats = {}  # Словарь для статистики
+    try:
+        with open(path, 'r', encoding='utf-8') as file:  # Открытие файла на чтение
+            for line in file:  # Чтение строк
+                if not line.strip():
+                    continue
+                key, value = line.strip().split(' - ')  # Разделение строки на ключ и значение
+                stats[key] = int(value)
+    except FileNotFoundError:  # Старой статистики нет
+        pass
+    return stats
+
+
+# История забегов в SQLite с записью в фоновом потоке
+class RunHistory:
+    def __init__(self, path, legacy_stats_path=None, batch_size=HISTORY_BATCH_SIZE):
+        self.path = path  # Путь к файлу базы
+        self.batch_size = batch_size  # Размер пакета записи
+        self.connection = self._connect()  # Соединение для чтения из основного потока
+        self._create(legacy_stats_path)
+        self.queue = queue.Queue()  # Забеги, ожидающие записи
+        self.failed = 0  # Сколько забегов не удалось записать
+        self.writer = threading.Thread(target=self._write_loop, name='run-history', daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute('PRAGMA journal_mode=WAL')  # Чтение не блокируется записью
+        connection.execute('PRAGMA synchronous=NORMAL')  # В режиме WAL этого достаточно для целостности
+        return connection
+
+    # Создание таблиц и однократный перенос счетчиков из stats.txt
+    def _create(self, legacy_stats_path):
+        with self.connection:
+            self.connection.executescript(HISTORY_SCHEMA)
+            if self.connection.execute('SELECT 1 FROM summary').fetchone() is None:  # База создается впервые
+                legacy = read_legacy_stats(legacy_stats_path) if legacy_stats_path else {}
+                self.connection.execute(
+                    'INSERT INTO summary (id, levels, time_ms, wins, losses) VALUES (1, ?, ?, ?, ?)',
+                    (legacy.get('уровней сыграно', 0), legacy.get('времени в игре', 0) * 1000,
+                     legacy.get('кол-во побед', 0), legacy.get('кол-во поражений', 0)))
+
+    # Запись пакетами в фоновом потоке. Ошибка записи пакета пишется в журнал, и поток продолжает работу:
+    # каждый взятый из очереди забег отмечается выполненным, иначе flush ждал бы вечно
+    def _write_loop(self):
+        connection = None  # У каждого потока свое соединение; открывается при первой записи
+        while True:
+            batch = [self.queue.get()]  # Ожидание первого забега
+            while len(batch) < self.batch_size:  # Добираем все, что уже накопилось
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            runs = [run for run in batch if run is not None]  # None - сигнал остановки
+            try:
+                if runs:
+                    if connection is None:
+                        connection = self._connect()
+                    self._write_batch(connection, runs)
+            except Exception:
+                self.failed += len(runs)
+                log.exception('не удалось записать %d забегов в %s', len(runs), self.path)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if len(runs) != len(batch):
+                if connection is not None:
+                    connection.close()
+                return
+
+    # Один пакет забегов - одна транзакция
+    @staticmethod
+    def _write_batch(connection, runs):
+        wins = sum(run[2] == 'win' for run in runs)
+        with connection:
+            connection.executemany(
+                'INSERT INTO runs (level, difficulty, result, duration_ms, timestamp) VALUES (?, ?, ?, ?, ?)',
+                runs)
+            connection.execute(
+                'UPDATE summary SET levels = levels + ?, time_ms = time_ms + ?, '
+                'wins = wins + ?, losses = losses + ? WHERE id = 1',
+                (len(runs), sum(run[3] for run in runs), wins, len(runs) - wins))
+
+    # Добавление забега в очередь записи (не блокирует кадр)
+    def record(self, level, difficulty, result, duration_ms):
+        self.queue.put((level, difficulty, result, int(duration_ms), time.time()))
+
+    # Ожидание записи всех забегов из очереди не дольше timeout секунд (None - без предела).
+    # Возвращает False, если очередь не опустела за это время
+    def flush(self, timeout=None):
+        if timeout is None:
+            self.queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:  # Условие, о котором сообщает task_done
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    # Счетчики для экрана статистики
+    def totals(self):
+        levels, time_ms, wins, losses = self.connection.execute(
+            'SELECT levels, time_ms, wins, losses FROM summary WHERE id = 1').fetchone()
+        return {
+            'уровней сыграно': levels,
+            'времени в игре': time_ms // 1000,
+            'кол-во побед': wins,
+            'кол-во поражений': losses,
+        }
+
+    # Завершение записи и закрытие базы
+    def close(self):
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        self.connection.close()
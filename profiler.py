@@ -0,0 +1,163 @@
+import json
+import time
+from array import array
+
+import numpy as np
+import pygame
+
+from persistence import write_atomic
+from ui import get_font
+
+PROFILE_FRAMES = 600  # Сколько последних кадров хранит кольцевой буфер
+PHASES = ['wait', 'events', 'simulation', 'camera', 'timer', 'render', 'overlay', 'flip']  # Фазы кадра игры
+OVERLAY_SIZE = (320, 230)  # Размер панели профилировщика
+GRAPH_FRAMES = 300  # Кадров на графике
+GRAPH_HEIGHT = 80  # Высота графика в пикселях
+GRAPH_SCALE_MS = 40  # Время кадра, соответствующее полной высоте графика
+BAR_SCALE_MS = 16.7  # Время фазы, соответствующее полной ширине полосы
+SUMMARY_FRAMES = 120  # По скольким кадрам считается среднее для полос
+TEXT_EVERY = 15  # Как часто (в кадрах) обновляются числа на панели
+PHASE_COLORS = [(120, 120, 120), (200, 200, 80), (80, 200, 120), (80, 160, 220),
+                (220, 140, 60), (200, 80, 200), (150, 150, 220), (220, 80, 80)]
+
+
+# Замер фаз каждого кадра в кольцевой буфер; выключенный профилировщик почти ничего не стоит
+class FrameProfiler:
+    def __init__(self, phases=PHASES, capacity=PROFILE_FRAMES):
+        self.phases = list(phases)  # Имена фаз в порядке отрисовки
+        self.index = {name: i for i, name in enumerate(self.phases)}  # Имя фазы -> столбец буфера
+        self.capacity = capacity  # Размер кольцевого буфера в кадрах
+        # Запись идет в массивы array (быстрее поэлементно), анализ - через представления NumPy поверх них
+        width = len(self.phases)
+        self.phase_buffer = array('q', bytes(8 * capacity * width))  # Длительность фаз в нс, построчно
+        self.offset_buffer = array('q', bytes(8 * capacity * width))  # Начало фазы от начала кадра в нс
+        self.start_buffer = array('q', bytes(8 * capacity))  # Начало кадра в нс
+        self.time_buffer = array('q', bytes(8 * capacity))  # Длительность кадра в нс
+        self.empty_row = array('q', bytes(8 * width))
+        self.durations = np.frombuffer(self.phase_buffer, dtype=np.int64).reshape(capacity, width)
+        self.offsets = np.frombuffer(self.offset_buffer, dtype=np.int64).reshape(capacity, width)
+        self.frame_start = np.frombuffer(self.start_buffer, dtype=np.int64)
+        self.frame_time = np.frombuffer(self.time_buffer, dtype=np.int64)
+        self.frames = 0  # Сколько кадров записано всего
+        self.enabled = False  # Идет ли запись (и показ панели)
+        self.recording = False  # Записывается ли текущий кадр
+        self.row = 0  # Начало строки текущего кадра в буферах фаз
+        self.slot = 0  # Номер строки текущего кадра
+        self.start = self.last = 0  # Начало кадра и конец последней фазы в нс
+        self.font = None  # Шрифт панели (создается при первой отрисовке)
+        self.panel = None  # Фон панели
+        self.labels = []  # Надписи с именами фаз
+        self.numbers = []  # Надписи со временем фаз
+        self.fps_text = None  # Надпись с временем кадра
+
+    # Включение или выключение записи и панели
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.recording = False  # Кадр, начатый до переключения, не записывается
+
+    # Начало кадра
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.recording = True
+        self.slot = self.frames % self.capacity
+        self.row = self.slot * len(self.phases)
+        self.phase_buffer[self.row:self.row + len(self.phases)] = self.empty_row
+        self.start = self.last = time.perf_counter_ns()
+
+    # Конец фазы: время от прошлой отметки относится к фазе name
+    def mark(self, name):
+        if not self.recording:
+            return
+        now = time.perf_counter_ns()
+        cell = self.row + self.index[name]
+        self.phase_buffer[cell] += now - self.last
+        self.offset_buffer[cell] = self.last - self.start
+        self.last = now
+
+    # Конец кадра
+    def end_frame(self):
+        if not self.recording:
+            return
+        self.start_buffer[self.slot] = self.start
+        self.time_buffer[self.slot] = self.last - self.start
+        self.frames += 1
+        self.recording = False
+
+    # Строки буфера последних count кадров в порядке записи
+    def recent(self, count=PROFILE_FRAMES):
+        count = min(count, self.frames, self.capacity - self.recording)  # Строка текущего кадра еще не готова
+        return (self.frames - count + np.arange(count)) % self.capacity
+
+    # Средняя длительность фаз за последние кадры в мс
+    def phase_means(self, count=SUMMARY_FRAMES):
+        rows = self.recent(count)
+        if not len(rows):
+            return np.zeros(len(self.phases))
+        return self.durations[rows].mean(axis=0) / 1e6
+
+    # Отрисовка панели: график времени кадра и полосы средних по фазам
+    def draw(self, screen):
+        if not self.enabled:
+            return
+        if self.font is None:
+            self.font = get_font(18)
+            self.panel = pygame.Surface(OVERLAY_SIZE, pygame.SRCALPHA)
+            self.panel.fill((0, 0, 0, 170))
+            self.labels = [self.font.render(name, True, pygame.Color('white')) for name in self.phases]
+        x0 = screen.get_width() - OVERLAY_SIZE[0] - 10
+        y0 = 10
+        screen.blit(self.panel, (x0, y0))
+
+        # График времени кадра с линиями 60 и 30 кадров в секунду
+        graph_bottom = y0 + 10 + GRAPH_HEIGHT
+        for ms, color in ((1000 / 60, (80, 160, 80)), (1000 / 30, (160, 80, 80))):
+            y = graph_bottom - int(ms / GRAPH_SCALE_MS * GRAPH_HEIGHT)
+            pygame.draw.line(screen, color, (x0 + 10, y), (x0 + OVERLAY_SIZE[0] - 10, y))
+        rows = self.recent(GRAPH_FRAMES)
+        if len(rows) > 1:
+            heights = np.minimum(self.frame_time[rows] / 1e6 / GRAPH_SCALE_MS, 1.0) * GRAPH_HEIGHT
+            step = (OVERLAY_SIZE[0] - 20) / (GRAPH_FRAMES - 1)
+            points = [(x0 + 10 + i * step, graph_bottom - height) for i, height in enumerate(heights.tolist())]
+            pygame.draw.lines(screen, pygame.Color('white'), False, points)
+
+        # Числа перерисовываются раз в несколько кадров, чтобы панель сама не стоила много
+        means = self.phase_means()
+        if self.frames % TEXT_EVERY == 0 or not self.numbers:
+            self.numbers = [self.font.render(f'{ms:.2f} мс', True, pygame.Color('white')) for ms in means]
+            rows = self.recent(SUMMARY_FRAMES)
+            frame_ms = self.frame_time[rows].mean() / 1e6 if len(rows) else 0.0
+            self.fps_text = self.font.render(f'кадр {frame_ms:.2f} мс', True, pygame.Color('white'))
+        screen.blit(self.fps_text, (x0 + 10, graph_bottom + 4))
+
+        y = graph_bottom + 20
+        bar_width = OVERLAY_SIZE[0] - 160
+        for label, number, ms, color in zip(self.labels, self.numbers, means, PHASE_COLORS):
+            screen.blit(label, (x0 + 10, y))
+            width = max(1, int(min(ms / BAR_SCALE_MS, 1.0) * bar_width))
+            pygame.draw.rect(screen, color, (x0 + 85, y + 2, width, 10))
+            screen.blit(number, (x0 + 90 + bar_width, y))
+            y += 15
+
+    # События в формате Chrome trace (chrome://tracing, Perfetto): кадры и фазы с временем в мкс
+    def trace_events(self):
+        rows = self.recent()
+        if not len(rows):
+            return []
+        origin = int(self.frame_start[rows[0]])
+        events = []
+        for row in rows.tolist():
+            start = (int(self.frame_start[row]) - origin) / 1000
+            events.append({'name': 'frame', 'ph': 'X', 'ts': start, 'dur': int(self.frame_time[row]) / 1000,
+                           'pid': 1, 'tid': 1})
+            for column, name in enumerate(self.phases):
+                duration = int(self.durations[row, column])
+                if duration:
+                    events.append({'name': name, 'ph': 'X', 'ts': start + int(self.offsets[row, column]) / 1000,
+                                   'dur': duration / 1000, 'pid': 1, 'tid': 1})
+        return events
+
+    # Сохранение буфера в файл для chrome://tracing
+    def export_trace(self, path):
+        write_atomic(path, json.dumps({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}))
+        return path
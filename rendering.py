@@ -0,0 +1,232 @@
+from collections import OrderedDict
+
+import pygame
+
+from level import TILE_LAYERS, TILE_SIZE
+
+CHUNK_SIZE = 512  # Размер куска фона в пикселях
+CHUNK_MEMORY_LIMIT = 64 * 1024 * 1024  # Предел памяти под куски фона в байтах
+
+
+class Camera:
+    def __init__(self, width, height, level_width, level_height):
+        self.camera = pygame.Rect(0, 0, width, height)  # Прямоугольник камеры
+        self.width = width  # Ширина камеры
+        self.height = height  # Высота камеры
+        self.level_width = level_width  # Ширина уровня
+        self.level_height = level_height  # Высота уровня
+
+    # Применение камеры к объекту
+    def apply(self, entity):
+        return entity.rect.move(self.camera.topleft)  # Смещение объекта относительно камеры
+
+    # Обновление позиции камеры
+    def update(self, target):
+        self.follow(target.rect)
+
+    # Камера по прямоугольнику цели
+    def follow(self, rect):
+        x = -rect.x + int(self.width / 2)  # Вычисление смещения по X
+        y = -rect.y + int(self.height / 2)  # Вычисление смещения по Y
+        x = min(0, x)  # Ограничение смещения по X
+        y = min(0, y)  # Ограничение смещения по Y
+        if self.level_width is not None:  # У бесконечного лабиринта нет правой и нижней границы
+            x = max(-(self.level_width - self.width), x)  # Ограничение смещения по X
+            y = max(-(self.level_height - self.height), y)  # Ограничение смещения по Y
+        self.camera.update(x, y, self.width, self.height)  # Прямоугольник камеры меняется на месте, без нового объекта
+
+    # Применение камеры к прямоугольнику
+    def apply_rect(self, rect):
+        return rect.move(self.camera.topleft)  # Смещение прямоугольника относительно камеры
+
+    # То же без нового объекта: результат записывается в out
+    def apply_rect_into(self, rect, out):
+        out.update(rect.x + self.camera.x, rect.y + self.camera.y, rect.width, rect.height)
+        return out
+
+
+# Изображения клеток по коду из таблицы TILE_LAYERS
+def tile_layers(tile_images):
+    layers = [()] * (max(TILE_LAYERS) + 1)
+    for code, names in TILE_LAYERS.items():
+        layers[code] = tuple(tile_images[name] for name in names)
+    return layers
+
+
+# Отрисовка видимых клеток уровня прямо из сетки, без спрайта на каждую клетку
+class TileRenderer:
+    def __init__(self, grid, tile_images):
+        self.grid = grid  # Сетка клеток уровня
+        self.layers = tile_layers(tile_images)  # Код клетки -> изображения
+        self.blits = 0  # Количество отрисовок за последний кадр
+
+    def draw(self, screen, camera):
+        offset_x, offset_y = camera.camera.topleft  # Смещение камеры
+        x_start, y_start = max(0, -offset_x // TILE_SIZE), max(0, -offset_y // TILE_SIZE)
+        x_end = min(self.grid.width, (screen.get_width() - offset_x - 1) // TILE_SIZE + 1)
+        y_end = min(self.grid.height, (screen.get_height() - offset_y - 1) // TILE_SIZE + 1)
+        blits = []
+        for y in range(y_start, y_end):  # Только клетки на экране
+            row = y * self.grid.width
+            for x in range(x_start, x_end):
+                position = (x * TILE_SIZE + offset_x, y * TILE_SIZE + offset_y)
+                blits.extend((image, position) for image in self.layers[self.grid.cells[row + x]])
+        screen.blits(blits, doreturn=False)
+        self.blits = len(blits)
+
+
+# Отрисовка статичного фона уровня заранее собранными кусками
+class ChunkRenderer:
+    def __init__(self, grid, tile_images, chunk_size=CHUNK_SIZE, memory_limit=CHUNK_MEMORY_LIMIT):
+        self.grid = grid  # Сетка клеток уровня
+        self.tile_images = tile_images  # Изображения тайлов
+        self.chunk_size = chunk_size  # Размер куска в пикселях
+        self.memory_limit = memory_limit  # Предел памяти под куски
+        self.level_width = grid.width * TILE_SIZE if grid.width is not None else None  # Ширина уровня в пикселях
+        self.level_height = grid.height * TILE_SIZE if grid.height is not None else None  # Высота уровня в пикселях
+        self.chunks = OrderedDict()  # Собранные куски в порядке последнего использования
+        self.memory_used = 0  # Занятая кусками память в байтах
+        self.blits = 0  # Количество отрисовок за последний кадр
+        self.visible_range = None  # Диапазон кусков на экране в прошлом кадре
+        self.visible = []  # Куски на экране: [(ключ, позиция в уровне)]
+        self.visible_keys = set()  # Ключи кусков на экране
+
+    # Сборка одного куска фона
+    def _build_chunk(self, cx, cy):
+        size = self.chunk_size
+        left, top = cx * size, cy * size  # Левый верхний угол куска в координатах уровня
+        width = height = size
+        if self.level_width is not None:  # Последние куски обрезаются по краю уровня
+            width = min(size, self.level_width - left)
+            height = min(size, self.level_height - top)
+        surface = pygame.Surface((width, height))  # Фон непрозрачный, альфа-канал не нужен
+        if pygame.display.get_surface() is not None:  # Конвертация под формат экрана, если окно создано
+            surface = surface.convert()
+
+        layers = tile_layers(self.tile_images)
+        blits = []
+        for y in range(top // TILE_SIZE, (top + height - 1) // TILE_SIZE + 1):  # Клетки, попадающие в кусок
+            for x in range(left // TILE_SIZE, (left + width - 1) // TILE_SIZE + 1):
+                position = (x * TILE_SIZE - left, y * TILE_SIZE - top)  # Позиция тайла внутри куска
+                blits.extend((image, position) for image in layers[self.grid.cell(x, y)])
+        surface.blits(blits, doreturn=False)
+        return surface
+
+    # Получение куска из кэша или его сборка
+    def get_chunk(self, cx, cy):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:  # Кусок уже собран
+            self.chunks.move_to_end(key)  # Отмечаем как недавно использованный
+            return chunk
+        chunk = self._build_chunk(cx, cy)
+        self.chunks[key] = chunk
+        self.memory_used += chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+        return chunk
+
+    # Перерисовка изменившихся клеток [(x, y)] в уже собранных кусках; несобранные куски соберутся из сетки
+    def patch_cells(self, cells):
+        size = self.chunk_size
+        layers = tile_layers(self.tile_images)
+        patches = {}  # Ключ куска -> отрисовки в нем
+        for x, y in cells:
+            left, top = x * TILE_SIZE, y * TILE_SIZE
+            images = layers[self.grid.cell(x, y)]
+            for cy in range(top // size, (top + TILE_SIZE - 1) // size + 1):  # Клетка может лежать на стыке кусков
+                for cx in range(left // size, (left + TILE_SIZE - 1) // size + 1):
+                    if (cx, cy) in self.chunks:
+                        position = (left - cx * size, top - cy * size)
+                        patches.setdefault((cx, cy), []).extend((image, position) for image in images)
+        for key, blits in patches.items():
+            chunk = self.chunks[key]
+            bounds = chunk.get_rect()
+            for _, (x, y) in blits:  # Старое изображение стирается, как в новом куске (fill не обрезает слева)
+                chunk.fill((0, 0, 0), bounds.clip((x, y, TILE_SIZE, TILE_SIZE)))
+            chunk.blits(blits, doreturn=False)
+        return len(patches)
+
+    # Вытеснение давно не использованных кусков сверх предела памяти
+    def _evict(self, keep):
+        while self.memory_used > self.memory_limit and len(self.chunks) > len(keep):
+            key, chunk = next(iter(self.chunks.items()))  # Самый давно использованный кусок
+            if key in keep:  # Видимые куски не вытесняются
+                self.chunks.move_to_end(key)
+                continue
+            del self.chunks[key]
+            self.memory_used -= chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+
+    # Отрисовка видимых кусков
+    def draw(self, screen, camera):
+        offset_x, offset_y = camera.camera.x, camera.camera.y  # Смещение камеры
+        view_left, view_top = -offset_x, -offset_y  # Видимая область в координатах уровня
+        view_right = view_left + screen.get_width()
+        view_bottom = view_top + screen.get_height()
+        if self.level_width is not None:
+            view_right = min(self.level_width, view_right)
+            view_bottom = min(self.level_height, view_bottom)
+        size = self.chunk_size
+        cx_start, cx_end = max(0, view_left) // size, (view_right - 1) // size + 1
+        cy_start, cy_end = max(0, view_top) // size, (view_bottom - 1) // size + 1
+
+        if (cx_start, cx_end, cy_start, cy_end) != self.visible_range:  # Набор кусков меняется только на границах
+            self.visible_range = (cx_start, cx_end, cy_start, cy_end)
+            self.visible = [((cx, cy), (cx * size, cy * size))  # Только пересекающие экран
+                            for cy in range(cy_start, cy_end) for cx in range(cx_start, cx_end)]
+            self.visible_keys = {key for key, _ in self.visible}
+
+        for key, (x, y) in self.visible:
+            screen.blit(self.get_chunk(*key), (x + offset_x, y + offset_y))
+        self.blits = len(self.visible)
+        if self.memory_used > self.memory_limit:
+            self._evict(self.visible_keys)
+
+
+# Вывод на экран только изменившихся областей, пока камера стоит на месте
+class DirtyRectRenderer:
+    def __init__(self, screen):
+        self.screen = screen  # Поверхность окна
+        self.offset = None  # Смещение камеры в прошлом кадре
+        self.items = {}  # Имя объекта -> (область на экране, состояние) в прошлом кадре
+        self.pixels = 0  # Сколько пикселей выведено за последний кадр
+        self.full_frames = 0  # Сколько кадров перерисовано целиком
+
+    # Объединение пересекающихся областей, чтобы не рисовать одно место дважды
+    @staticmethod
+    def _merge(rects):
+        merged = []
+        for rect in rects:
+            rect = rect.copy()
+            index = rect.collidelist(merged)
+            while index != -1:  # Поглощаем все пересекающиеся области
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    # Кадр: draw рисует всю сцену, items - подвижные объекты {имя: (область на экране или None, состояние)}
+    def frame(self, offset, items, draw):
+        screen_rect = self.screen.get_rect()
+        if offset != self.offset:  # Камера сдвинулась - перерисовывается весь экран
+            draw()
+            pygame.display.flip()
+            self.pixels = screen_rect.width * screen_rect.height
+            self.full_frames += 1
+        else:
+            dirty = []
+            for name in set(items) | set(self.items):
+                old = self.items.get(name, (None, None))
+                new = items.get(name, (None, None))
+                if old != new:  # Объект сдвинулся или изменился - обновляются старое и новое места
+                    dirty.extend(rect for rect, _ in (old, new) if rect is not None)
+            dirty = [rect.clip(screen_rect) for rect in self._merge(dirty)]
+            dirty = [rect for rect in dirty if rect.width and rect.height]
+            for rect in dirty:
+                self.screen.set_clip(rect)  # Сцена рисуется только внутри изменившейся области
+                draw()
+            self.screen.set_clip(None)
+            if dirty:
+                pygame.display.update(dirty)
+            self.pixels = sum(rect.width * rect.height for rect in dirty)
+        self.offset = offset
+        self.items = {name: (rect.copy() if rect is not None else None, state)
+                      for name, (rect, state) in items.items()}
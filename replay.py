@@ -0,0 +1,147 @@
+import os
+import struct
+import time
+from array import array
+
+import pygame
+
+from hazards import HazardField, load_hazards
+from level_pack import load_compiled_level
+from maze import StreamedMaze
+from persistence import write_atomic
+from simulation import Simulation
+
+REPLAY_MAGIC = b'RPL1'  # Сигнатура файла записи
+# Сигнатура, хэш уровня, сложность, зерно, выход лабиринта X и Y, размер игрока, старт X и Y,
+# число тактов, исход, конечные X и Y, длина имени уровня; за заголовком следуют имя и ввод
+REPLAY_HEADER = struct.Struct('<4s16sBQiiHHiiIBiiH')
+RESULTS = {None: 0, 'win': 1, 'loss': 2}  # Коды исхода в файле
+NO_HASH = bytes(16)  # Хэш уровня, которого нет в файле (процедурный лабиринт)
+REPLAY_DIR = os.path.join('data', 'replays')  # Записи забегов игрока
+REPLAY_KEEP = 50  # Сколько последних записей хранится
+
+
+# Ввод такта в четырех битах: A, D, W, S
+def pack_keys(left, right, up, down):
+    return bool(left) | bool(right) << 1 | bool(up) << 2 | bool(down) << 3
+
+
+def unpack_keys(bits):
+    return bool(bits & 1), bool(bits & 2), bool(bits & 4), bool(bits & 8)
+
+
+# Запись забега: уровень, сложность, начальное и конечное состояние и ввод по тактам (два такта в байте)
+class Replay:
+    def __init__(self, level, level_hash, difficulty, start, seed=0, maze_exit=None):
+        self.level = level  # Имя файла уровня или процедурного лабиринта
+        self.level_hash = level_hash  # Хэш исходника уровня (NO_HASH для лабиринта)
+        self.difficulty = difficulty  # Сложность
+        self.seed = seed  # Зерно генерации лабиринта
+        self.maze_exit = maze_exit  # Клетка выхода процедурного лабиринта
+        self.start = tuple(start)  # Прямоугольник игрока в начале: x, y, ширина, высота
+        self.inputs = array('B')  # Упакованный ввод
+        self.ticks = 0  # Число тактов
+        self.result = None  # Исход забега
+        self.final = None  # Позиция игрока в конце
+
+    # Добавление ввода одного такта
+    def append(self, keys):
+        bits = pack_keys(*keys)
+        if self.ticks % 2 == 0:
+            self.inputs.append(bits)
+        else:
+            self.inputs[-1] |= bits << 4
+        self.ticks += 1
+
+    # Ввод такта по номеру
+    def keys(self, tick):
+        return unpack_keys(self.inputs[tick // 2] >> (tick % 2 * 4))
+
+    # Конец забега: исход и позиция игрока для проверки при воспроизведении
+    def finish(self, result, position):
+        self.result = result
+        self.final = tuple(position)
+
+    def to_bytes(self):
+        name = self.level.encode('utf-8')
+        exit_x, exit_y = self.maze_exit or (-1, -1)
+        final_x, final_y = self.final or self.start[:2]
+        header = REPLAY_HEADER.pack(REPLAY_MAGIC, self.level_hash, self.difficulty, self.seed, exit_x, exit_y,
+                                    self.start[2], self.start[3], self.start[0], self.start[1], self.ticks,
+                                    RESULTS[self.result], final_x, final_y, len(name))
+        return header + name + self.inputs.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        (magic, level_hash, difficulty, seed, exit_x, exit_y, width, height, start_x, start_y, ticks,
+         result, final_x, final_y, name_length) = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError('not a replay file')
+        offset = REPLAY_HEADER.size
+        name = bytes(data[offset:offset + name_length]).decode('utf-8')
+        replay = cls(name, level_hash, difficulty, (start_x, start_y, width, height), seed,
+                     (exit_x, exit_y) if exit_x >= 0 else None)
+        replay.inputs.frombytes(data[offset + name_length:offset + name_length + (ticks + 1) // 2])
+        replay.ticks = ticks
+        replay.finish({code: value for value, code in RESULTS.items()}[result], (final_x, final_y))
+        return replay
+
+    def save(self, path):
+        write_atomic(path, self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+# Обертка над чтением клавиш, которая записывает ввод каждого такта
+class Recorder:
+    def __init__(self, replay, read_input):
+        self.replay = replay  # Запись, в которую добавляется ввод
+        self.read_input = read_input  # Настоящий источник ввода
+
+    def read(self):
+        keys = self.read_input()
+        self.replay.append(keys)
+        return keys
+
+
+# Сохранение записи забега игрока; старые записи сверх REPLAY_KEEP удаляются
+def save_run(replay, directory=REPLAY_DIR, keep=REPLAY_KEEP):
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    name = f'{stamp} {os.path.splitext(replay.level)[0]} {replay.result or "quit"}.rpl'
+    path = os.path.join(directory, name)
+    replay.save(path)
+    runs = sorted(entry for entry in os.listdir(directory) if entry.endswith('.rpl'))
+    for old in runs[:-keep]:
+        os.remove(os.path.join(directory, old))
+    return path
+
+
+# Симуляция для воспроизведения: тот же уровень, сетка и опасности, что и в записанном забеге
+def replay_simulation(replay, levels_dir='levels'):
+    if replay.level_hash == NO_HASH:  # Процедурный лабиринт восстанавливается по зерну
+        grid = StreamedMaze(replay.seed, replay.maze_exit)
+    else:
+        level = load_compiled_level(replay.level, levels_dir)
+        if level.source_hash != replay.level_hash:
+            raise ValueError(f'{replay.level} changed since the replay was recorded')
+        grid = level.grid()
+    hazards = HazardField(load_hazards(replay.level, replay.difficulty, levels_dir), grid)
+    return Simulation(grid, pygame.Rect(replay.start), hazards)
+
+
+# Воспроизведение без экрана быстрее реального времени; возвращает симуляцию в конечном состоянии
+def play(replay, levels_dir='levels'):
+    simulation = replay_simulation(replay, levels_dir)
+    while simulation.result is None and simulation.ticks < replay.ticks:  # Куски лабиринта создаются по запросу
+        simulation.step(replay.keys(simulation.ticks))
+    return simulation
+
+
+# Совпадает ли воспроизведение с записью
+def matches(replay, simulation):
+    return (simulation.result == replay.result and simulation.ticks == replay.ticks
+            and simulation.player_rect.topleft == replay.final)
@@ -0,0 +1,99 @@
+STEP = 6  # Шаг перемещения игрока за такт
+TICK_RATE = 50  # Тактов симуляции в секунду (скорости заданы в пикселях за такт)
+TICK_MS = 1000 / TICK_RATE  # Длительность такта в миллисекундах
+MAX_TICKS_PER_FRAME = 25  # Больше тактов за кадр не считается, чтобы после зависания игра не ушла вперед рывком
+WAVE_DELAYS = {1: 16000, 2: 12000, 3: 8000}  # Задержка запуска волны (мс) для каждой сложности
+
+
+# Смещение игрока по нажатым клавишам (по диагонали с той же скоростью)
+def movement(left, right, up, down):
+    dx = right - left  # Движение по X
+    dy = down - up  # Движение по Y
+    if dx != 0 or dy != 0:  # Если игрок движется
+        length = (dx ** 2 + dy ** 2) ** 0.5  # Длина вектора движения
+        dx = dx / length * STEP  # Нормализация по X
+        dy = dy / length * STEP  # Нормализация по Y
+    return dx, dy
+
+
+# Перемещение игрока с проверкой столкновений со стенами; probe - готовый прямоугольник для проверок
+def move_player(rect, dx, dy, grid, probe=None):
+    new_x = rect.x + dx  # Новая позиция по X
+    new_y = rect.y + dy  # Новая позиция по Y
+
+    # Проверка столкновений (сдвиг, как у Rect.move, без дробной части)
+    if probe is None:
+        probe = rect.copy()
+    probe.update(rect.x + int(dx), rect.y, rect.width, rect.height)
+    collision_x = grid.collides(probe)  # Проверяются только клетки под прямоугольником
+    probe.update(rect.x, rect.y + int(dy), rect.width, rect.height)
+    collision_y = grid.collides(probe)
+
+    if not collision_x:  # Если нет столкновения по X, обновляем позицию
+        rect.x = new_x
+    if not collision_y:  # Если нет столкновения по Y, обновляем позицию
+        rect.y = new_y
+
+
+# Симуляция уровня с постоянным шагом, не зависящим от частоты кадров
+class Simulation:
+    def __init__(self, grid, player_rect, hazards):
+        self.grid = grid  # Сетка клеток уровня
+        self.player_rect = player_rect  # Прямоугольник игрока (изменяется на месте)
+        self.previous_position = player_rect.topleft  # Позиция игрока в прошлом такте
+        self.probe = player_rect.copy()  # Прямоугольник для проверок столкновений
+        self.render_rect = player_rect.copy()  # Прямоугольник для отрисовки между тактами
+        self.hazards = hazards  # Волны и другие опасности уровня (HazardField)
+        self.ticks = 0  # Сколько тактов прошло
+        self.accumulator = 0.0  # Накопленное, но еще не просчитанное время в мс
+        self.result = None  # 'win' или 'loss' после окончания уровня
+
+    # Время уровня в миллисекундах
+    @property
+    def elapsed_ms(self):
+        return int(self.ticks * TICK_MS)
+
+    # Один такт: движение, выход, опасности
+    def step(self, keys):
+        if self.result is not None:
+            return
+        self.previous_position = self.player_rect.topleft
+        dx, dy = movement(*keys)  # Смещение игрока по нажатым A, D, W, S
+        move_player(self.player_rect, dx, dy, self.grid, self.probe)  # Перемещение с проверкой столкновений
+        self.ticks += 1
+
+        if self.grid.at_exit(self.player_rect):  # Если игрок на выходе
+            self.result = 'win'
+            return
+
+        self.hazards.update(self.elapsed_ms)  # Запуск и движение всех опасностей разом
+        if self.hazards.collides(self.player_rect):  # Если опасность настигла игрока
+            self.result = 'loss'
+
+    # Продвижение на dt_ms реального времени; read_input() возвращает нажатые A, D, W, S на такт.
+    # Возвращает долю такта, на которую отрисовка должна сместиться от прошлого такта к текущему
+    def advance(self, dt_ms, read_input):
+        self.accumulator += dt_ms
+        ticks = 0
+        while self.accumulator >= TICK_MS and self.result is None:
+            if ticks == MAX_TICKS_PER_FRAME:  # Отставание слишком велико - лишнее время отбрасывается
+                self.accumulator = 0.0
+                break
+            self.step(read_input())
+            self.accumulator -= TICK_MS
+            ticks += 1
+        return min(1.0, self.accumulator / TICK_MS)
+
+    # Прогон без отрисовки быстрее реального времени до конца уровня или ввода
+    def run(self, read_input, max_ticks):
+        while self.result is None and self.ticks < max_ticks:
+            self.step(read_input())
+        return self.result
+
+    # Прямоугольник игрока между прошлым и текущим тактом (один и тот же объект, меняется на месте)
+    def interpolated_rect(self, alpha):
+        x0, y0 = self.previous_position
+        x1, y1 = self.player_rect.x, self.player_rect.y
+        self.render_rect.update(round(x0 + (x1 - x0) * alpha), round(y0 + (y1 - y0) * alpha),
+                                self.player_rect.width, self.player_rect.height)
+        return self.render_rect
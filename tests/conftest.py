@@ -0,0 +1,15 @@
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Окно не нужно
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Корень проекта: модули игры и data/
+sys.path.insert(0, ROOT)
+
+
+# Игра читает data/ и levels/ по относительным путям
+@pytest.fixture(autouse=True)
+def project_dir(monkeypatch):
+    monkeypatch.chdir(ROOT)
@@ -0,0 +1,10 @@
+from benchmarks.allocations import GROWTH_LIMIT, MEDIAN_LIMIT, PEAK_LIMIT, WARMUP_FRAMES, measure_run
+
+
+# Кадр забега после прогрева почти не занимает новой памяти, и память не растет от кадра к кадру
+def test_steady_state_frames_do_not_allocate():
+    frames, result, median, _, peak, growth = measure_run()
+    assert frames > WARMUP_FRAMES, result
+    assert median <= MEDIAN_LIMIT
+    assert peak <= PEAK_LIMIT
+    assert growth <= GROWTH_LIMIT
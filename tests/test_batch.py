@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from batch import MazeBatch, ParallelMazeBatch
+from benchmarks.batch import new_simulation
+from level_pack import load_compiled_level
+from replay import RESULTS
+
+LEVEL, DIFFICULTY = 'lvl 1.txt', 3  # Волна выходит через 8 с и доходит до стоящего игрока
+RESTART = 100  # Такт, на котором часть забегов начинается заново
+
+
+# Такт, на котором волна догоняет стоящего на месте игрока в одиночной симуляции
+def idle_loss_tick():
+    simulation = new_simulation(load_compiled_level(LEVEL), LEVEL, DIFFICULTY)
+    simulation.run(lambda: (False, False, False, False), 10000)
+    assert simulation.result == 'loss'
+    return simulation.ticks
+
+
+# Стоящие забеги, из которых нечетные начинаются заново на такте RESTART: такт конца каждого забега
+def finish_ticks(batch, count):
+    finished = np.zeros(count, int)
+    tick = 0
+    while not batch.done.all():
+        if tick == RESTART:
+            batch.reset(np.arange(1, count, 2))
+        tick += 1
+        _, done, results = batch.step(np.zeros(count, np.uint8))
+        assert (results[done] == RESULTS['loss']).all()
+        finished[(finished == 0) & done] = tick
+    return finished
+
+
+# У перезапущенного забега свое время уровня: волна догоняет его на RESTART тактов позже остальных
+def test_reset_restarts_only_selected_runs():
+    loss = idle_loss_tick()
+    batch = MazeBatch.from_level(LEVEL, DIFFICULTY, 4)
+    assert finish_ticks(batch, 4).tolist() == [loss, loss + RESTART] * 2
+    assert batch.elapsed.tolist() == [loss] * 4
+
+
+# То же в исполнителях: выбранные забеги передаются через общую память
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parallel_reset_restarts_only_selected_runs(workers):
+    loss = idle_loss_tick()
+    with ParallelMazeBatch(LEVEL, DIFFICULTY, 4, workers) as batch:
+        assert finish_ticks(batch, 4).tolist() == [loss, loss + RESTART] * 2
@@ -0,0 +1,25 @@
+import pygame
+import pytest
+
+from benchmarks.idle_cpu import SCREENS, IdleGame, idle_problems, idle_screen
+
+IDLE_SECONDS = 1.5  # Сколько секунд каждый экран стоит без ввода (экран результата закрывается сам через 5 с)
+
+
+# Окно и игра-заглушка на все экраны модуля
+@pytest.fixture(scope='module')
+def game(tmp_path_factory):
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((800, 600))
+    game = IdleGame(str(tmp_path_factory.mktemp('idle')))
+    yield game
+    game.close()
+    pygame.display.quit()
+
+
+# Настоящие экраны игры без ввода ждут событий: один кадр, редкие пробуждения и почти без нагрузки на ядро
+@pytest.mark.parametrize('name', list(SCREENS))
+def test_idle_screen_does_not_busy_wait(game, name):
+    share, redraws, wakeups, seconds = idle_screen(game, name, IDLE_SECONDS)
+    assert not idle_problems(share, redraws, wakeups, seconds)
@@ -0,0 +1,49 @@
+import gc
+import mmap
+import os
+import shutil
+
+from level_pack import LevelPack, compile_level, load_compiled_level, write_pack
+from loader import prepare_level
+
+LEVELS = ['lvl 1.txt', 'lvl 2.txt']
+
+
+def build_pack(directory):
+    entries = []
+    for name in LEVELS:
+        with open(os.path.join('levels', name), 'rb') as file:
+            entries.append((name, compile_level(file.read())))
+    path = os.path.join(directory, 'levels.pack')
+    write_pack(path, entries)
+    return path
+
+
+# Клетки уровня из архива - срез отображения файла, а не копия; сетка работает и после close()
+def test_pack_levels_are_zero_copy(tmp_path):
+    pack = LevelPack(build_pack(str(tmp_path)))
+    level = pack.level('lvl 1.txt')
+    assert isinstance(level.cells, memoryview) and isinstance(level.cells.obj, mmap.mmap)
+    grid = level.grid()
+    expected = load_compiled_level('lvl 1.txt', 'levels', str(tmp_path / 'cache'))
+    pack.close()  # Уровень еще жив - отображение остается за ним
+    assert bytes(grid.cells) == bytes(expected.cells)
+    assert grid.exits == expected.exits
+    del level, grid
+    gc.collect()
+
+
+# Загрузчик берет уровень из архива, а правленый исходник - в обход устаревшего архива
+def test_prepare_level_uses_pack(tmp_path):
+    levels_dir = tmp_path / 'levels'
+    shutil.copytree('levels', levels_dir, ignore=shutil.ignore_patterns('.compiled'))
+    with LevelPack(build_pack(str(tmp_path))) as pack:
+        prepared = prepare_level('lvl 1.txt', 1, str(levels_dir), pack=pack)
+        assert isinstance(prepared.grid.cells, memoryview) and isinstance(prepared.grid.cells.obj, mmap.mmap)
+
+        with open(levels_dir / 'lvl 2.txt', 'ab') as file:
+            file.write(b'\n#')
+        prepared = prepare_level('lvl 2.txt', 1, str(levels_dir), pack=pack)
+        assert not isinstance(getattr(prepared.grid.cells, 'obj', None), mmap.mmap)
+        edited = load_compiled_level('lvl 2.txt', str(levels_dir), str(tmp_path / 'cache'))
+        assert bytes(prepared.grid.cells) == bytes(edited.cells)
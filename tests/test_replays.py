@@ -0,0 +1,18 @@
+import glob
+import os
+
+import pytest
+
+from benchmarks.replays import FIXTURES
+from replay import Replay, matches, play
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Сбор тестов идет до смены каталога
+RECORDINGS = sorted(glob.glob(os.path.join(ROOT, FIXTURES, '*.rpl')))
+
+
+# Эталонная запись воспроизводится без окна в то же конечное состояние: исход, такт и позиция игрока
+@pytest.mark.parametrize('path', RECORDINGS, ids=lambda path: os.path.basename(path)[:-4])
+def test_replay_matches_recording(path):
+    replay = Replay.load(path)
+    simulation = play(replay)
+    assert matches(replay, simulation), (simulation.result, simulation.ticks, simulation.player_rect.topleft)
@@ -0,0 +1,30 @@
+import os
+import tempfile
+
+from persistence import RunHistory
+
+
+# Забеги записываются пакетами и попадают в итоговые счетчики
+def test_runs_are_counted():
+    with tempfile.TemporaryDirectory() as directory:
+        history = RunHistory(os.path.join(directory, 'stats.db'))
+        history.record('lvl 1.txt', 1, 'win', 12000)
+        history.record('lvl 1.txt', 1, 'loss', 3000)
+        assert history.flush(timeout=5)
+        assert history.totals() == {'уровней сыграно': 2, 'времени в игре': 15, 'кол-во побед': 1,
+                                    'кол-во поражений': 1}
+        history.close()
+
+
+# Ошибка записи пакета не останавливает поток: flush не зависает, следующие забеги записываются
+def test_failed_batch_does_not_block_flush():
+    with tempfile.TemporaryDirectory() as directory:
+        history = RunHistory(os.path.join(directory, 'stats.db'))
+        history.record(None, 1, 'win', 1000)  # Уровень не может быть NULL - пакет не запишется
+        assert history.flush(timeout=5)
+        assert history.failed == 1
+        history.record('lvl 1.txt', 1, 'win', 1000)
+        assert history.flush(timeout=5)
+        assert history.totals()['кол-во побед'] == 1
+        assert history.writer.is_alive()
+        history.close()
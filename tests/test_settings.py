@@ -0,0 +1,26 @@
+import os
+import stat
+
+from persistence import SettingsStore, current_umask, write_atomic
+
+
+# Новый файл получает права по маске процесса, замененный - сохраняет свои
+def test_write_atomic_keeps_permissions(tmp_path):
+    path = tmp_path / 'settings.txt'
+    write_atomic(str(path), 'a - 1\n')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~current_umask()
+    os.chmod(path, 0o640)
+    write_atomic(str(path), 'a - 2\n')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert path.read_text(encoding='utf-8') == 'a - 2\n'
+    assert os.listdir(tmp_path) == ['settings.txt']  # Временных файлов не осталось
+
+
+# Запись одного ключа не затирает другой ключ, измененный другим процессом
+def test_set_keeps_external_changes(tmp_path):
+    path = str(tmp_path / 'settings.txt')
+    first = SettingsStore(path, {'Сложность': 0, 'Туман': 0})
+    second = SettingsStore(path, {'Сложность': 0, 'Туман': 0})
+    second.set('Туман', 1)
+    first.set('Сложность', 2)
+    assert SettingsStore(path).values == {'Сложность': 2, 'Туман': 1}
@@ -0,0 +1,17 @@
+import pytest
+
+from benchmarks.timestep import LEVELS, RENDER_RATES, headless, play
+from level_pack import load_compiled_level
+from simulation import WAVE_DELAYS
+
+
+# Исход забега (результат, такты, позиция игрока) не зависит от частоты отрисовки
+@pytest.mark.parametrize('difficulty', [0] + sorted(WAVE_DELAYS))  # 0 - сложность не выбрана, волна идет сразу
+@pytest.mark.parametrize('name', LEVELS)
+def test_outcome_does_not_depend_on_fps(name, difficulty):
+    level = load_compiled_level(name)
+    expected, _ = headless(level, difficulty)
+    assert expected[0] is not None  # Забег закончился победой или поражением
+    for fps in RENDER_RATES:
+        outcome, _ = play(level, difficulty, fps)
+        assert outcome == expected, f'{fps} FPS'
@@ -0,0 +1,281 @@
+import pygame
+
+from persistence import HISTORY_FLUSH_TIMEOUT
+
+WIDTH, HEIGHT = 800, 600  # Размеры окна игры
+UNLOCK_EVENT = pygame.USEREVENT + 1  # Конец блокировки ввода на экране результата
+CLOSE_EVENT = pygame.USEREVENT + 2  # Автоматическое закрытие экрана
+LOADING_POLL_MS = 50  # Как часто экран загрузки проверяет готовность уровня
+PROGRESS_SIZE = (300, 16)  # Размер полосы прогресса загрузки
+
+fonts = {}  # Размер -> шрифт по умолчанию
+
+
+# Экран, который хранит свои элементы и перерисовывается только после изменений
+class RetainedScreen:
+    def __init__(self, screen, background):
+        self.screen = screen  # Поверхность окна
+        self.background = background  # Фоновое изображение
+        self.items = []  # Элементы экрана: [поверхность, позиция]
+        self.dirty = True  # Нужна ли перерисовка
+        self.redraws = 0  # Сколько раз экран перерисовывался
+
+    # Добавление элемента; возвращает его номер для последующих изменений
+    def add(self, surface, position):
+        self.items.append([surface, position])
+        self.dirty = True
+        return len(self.items) - 1
+
+    # Замена поверхности или позиции элемента
+    def set(self, index, surface, position):
+        self.items[index] = [surface, position]
+        self.dirty = True
+
+    # Пометка экрана для перерисовки (например, после возврата с другого экрана)
+    def invalidate(self):
+        self.dirty = True
+
+    # Перерисовка, если что-то изменилось
+    def draw(self):
+        if not self.dirty:
+            return
+        self.screen.blit(self.background, (0, 0))  # Отрисовка фона
+        for surface, position in self.items:  # Отрисовка элементов
+            self.screen.blit(surface, position)
+        pygame.display.flip()  # Обновление экрана
+        self.dirty = False
+        self.redraws += 1
+
+    # Ожидание следующего события без холостых кадров (timeout в мс, 0 - ждать без ограничения)
+    def wait(self, timeout=0):
+        self.draw()
+        if timeout:
+            return pygame.event.wait(timeout)  # По истечении времени вернется NOEVENT
+        return pygame.event.wait()
+
+
+# Запуск однократного таймера, который пришлет событие через delay мс
+def schedule(event_type, delay):
+    pygame.time.set_timer(event_type, delay, 1)
+
+
+# Отмена таймера
+def cancel(event_type):
+    pygame.time.set_timer(event_type, 0)
+
+
+# Шрифт по умолчанию; модуль шрифтов инициализируется при первом запросе
+def get_font(size):
+    font = fonts.get(size)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+# Заставка
+def start_screen(game):
+    background_image = game.assets.image('background.png')  # Загрузка изображения для заставки
+    game.assets.preload(['menu_background.png'])  # Фон меню загружается, пока показана заставка
+    view = RetainedScreen(game.screen, background_image)  # Изображение на весь экран
+
+    while True:
+        event = view.wait()  # Ожидание события без холостых кадров
+        if event.type == pygame.QUIT:  # Если событие - закрытие окна
+            game.terminate()  # Завершение программы
+        elif event.type in [pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]:  # Если нажата клавиша или кнопка мыши
+            return  # Завершение ожидания
+
+
+def settings(game):
+    settings_image = game.assets.image('settings_background.png')  # Загрузка фона для экрана настроек
+
+    font = get_font(50)  # Шрифт для текста
+    easy_text = font.render("Простая", True, pygame.Color('white'))  # Текст кнопки
+    middle_text = font.render("Средняя", True, pygame.Color('white'))  # Текст кнопки
+    hard_text = font.render("Сложная", True, pygame.Color('white'))  # Текст кнопки
+    back_text = font.render("Назад", True, pygame.Color('white'))  # Текст кнопки "Назад"
+
+    easy_rect = easy_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))  # Позиция кнопки
+    middle_rect = middle_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))  # Позиция кнопки
+    hard_rect = hard_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))  # Позиция кнопки
+    back_rect = back_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 200))  # Позиция кнопки "Назад"
+
+    # Кнопка режима тумана с текущим значением
+    def fog_label(value):
+        fog_text = font.render(f"Туман: {'вкл' if value else 'выкл'}", True, pygame.Color('white'))
+        return fog_text, fog_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 120))
+
+    difficulty_names = {1: 'Простая', 2: 'Средняя', 3: 'Сложная'}  # Названия уровней сложности
+
+    # Текст текущей сложности и его позиция
+    def difficulty_label(value):
+        now_text = font.render(f"Текущая сложность: {difficulty_names.get(value, '')}", True, pygame.Color('white'))
+        return now_text, now_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 125))
+
+    shown_diff = game.settings_store.get('Сложность')  # Сложность, для которой отрисован текст
+    view = RetainedScreen(game.screen, settings_image)  # Экран перерисовывается только после изменений
+    now_item = view.add(*difficulty_label(shown_diff))  # Текст текущей сложности
+    view.add(easy_text, easy_rect)  # Кнопка "Простая"
+    view.add(middle_text, middle_rect)  # Кнопка "Средняя"
+    view.add(hard_text, hard_rect)  # Кнопка "Сложная"
+    view.add(back_text, back_rect)  # Кнопка "Назад"
+    shown_fog = game.settings_store.get('Туман')  # Режим тумана, для которого отрисована кнопка
+    fog_text, fog_rect = fog_label(shown_fog)
+    fog_item = view.add(fog_text, fog_rect)  # Кнопка "Туман"
+
+    while True:
+        settings_func = game.settings_store.get('Сложность')  # Текущая сложность из памяти
+        if settings_func != shown_diff:  # Текст перерисовывается только при смене сложности
+            shown_diff = settings_func
+            view.set(now_item, *difficulty_label(settings_func))  # Обновление текста
+        fog_value = game.settings_store.get('Туман')  # Текущий режим тумана
+        if fog_value != shown_fog:  # Кнопка перерисовывается только при смене режима
+            shown_fog = fog_value
+            fog_text, fog_rect = fog_label(fog_value)
+            view.set(fog_item, fog_text, fog_rect)
+
+        # Ожидание события; раз в SETTINGS_CHECK_INTERVAL проверяем, не изменили ли файл настроек снаружи
+        event = view.wait(int(game.settings_store.check_interval * 1000))
+        if event.type == pygame.QUIT:  # Если событие - закрытие окна
+            game.terminate()  # Завершение программы
+        elif event.type == pygame.MOUSEBUTTONDOWN:  # Если нажата кнопка мыши
+            if easy_rect.collidepoint(event.pos):  # Если нажата кнопка "Простая"
+                game.settings_store.set('Сложность', 1)  # Изменение сложности
+            elif middle_rect.collidepoint(event.pos):  # Если нажата кнопка "Средняя"
+                game.settings_store.set('Сложность', 2)  # Изменение сложности
+            elif hard_rect.collidepoint(event.pos):  # Если нажата кнопка "Сложная"
+                game.settings_store.set('Сложность', 3)  # Изменение сложности
+            elif fog_rect.collidepoint(event.pos):  # Если нажата кнопка "Туман" - режим переключается
+                game.settings_store.set('Туман', 0 if fog_value else 1)
+            elif back_rect.collidepoint(event.pos):  # Если нажата кнопка "Назад"
+                return  # Возврат в предыдущее меню
+
+
+# Экран статистики
+def stats_screen(game):
+    stats_image = game.assets.image('stats_background.png')  # Загрузка фона для экрана статистики
+    game.run_history.flush(HISTORY_FLUSH_TIMEOUT)  # Дожидаемся записи последних забегов, но не вечно
+    stats = game.run_history.totals()  # Чтение статистики
+
+    font = get_font(50)  # Шрифт для текста
+    levels_text = font.render(f"Уровней сыграно: {stats['уровней сыграно']}", True, pygame.Color('white'))  # Текст
+    # статистики
+    time_text = font.render(f"Времени в игре: {round(stats['времени в игре'] / 60, 2)} мин", True,
+                            pygame.Color('white'))  #
+    # Текст времени
+    wins_text = font.render(f"Побед: {stats['кол-во побед']}", True, pygame.Color('white'))  # Текст побед
+    losses_text = font.render(f"Поражений: {stats['кол-во поражений']}", True, pygame.Color('white'))  # Текст поражений
+    back_text = font.render("Назад", True, pygame.Color('white'))  # Текст кнопки "Назад"
+
+    back_rect = back_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 150))  # Позиция кнопки "Назад"
+
+    view = RetainedScreen(game.screen, stats_image)  # Экран рисуется один раз и дальше только ждет событий
+    view.add(levels_text, (WIDTH // 2 - levels_text.get_width() // 2, HEIGHT // 2 - 100))  # Текст уровней
+    view.add(time_text, (WIDTH // 2 - time_text.get_width() // 2, HEIGHT // 2 - 50))  # Текст времени
+    view.add(wins_text, (WIDTH // 2 - wins_text.get_width() // 2, HEIGHT // 2))  # Текст побед
+    view.add(losses_text, (WIDTH // 2 - losses_text.get_width() // 2, HEIGHT // 2 + 50))  # Текст поражений
+    view.add(back_text, back_rect)  # Кнопка "Назад"
+
+    while True:
+        event = view.wait()  # Ожидание события без холостых кадров
+        if event.type == pygame.QUIT:  # Если событие - закрытие окна
+            game.terminate()  # Завершение программы
+        elif event.type == pygame.MOUSEBUTTONDOWN:  # Если нажата кнопка мыши
+            if back_rect.collidepoint(event.pos):  # Если нажата кнопка "Назад"
+                return  # Возврат в главное меню
+
+
+# Экран результата: ввод заблокирован первые 3 секунды, через 5 секунд экран закрывается сам
+def result_screen(game, image_name):
+    view = RetainedScreen(game.screen, game.assets.image(image_name))  # Изображение результата на весь экран
+    schedule(UNLOCK_EVENT, 3000)  # Разблокировка ввода
+    schedule(CLOSE_EVENT, 5000)  # Автоматический возврат в меню
+    input_locked = True  # Флаг блокировки ввода (первые 3 секунды)
+
+    while True:
+        event = view.wait()  # Ожидание события или таймера
+        if event.type == pygame.QUIT:  # Если событие - закрытие окна
+            game.terminate()  # Завершение программы
+        elif event.type == UNLOCK_EVENT:  # Прошло 3 секунды
+            input_locked = False  # Разблокировка ввода
+        elif event.type == CLOSE_EVENT:  # Прошло 5 секунд
+            break  # Автоматический возврат в меню
+        elif not input_locked and event.type in [pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN]:  # Нажата клавиша или мышь
+            break  # Возврат в меню
+
+    cancel(UNLOCK_EVENT)  # Таймеры не должны сработать на следующем экране
+    cancel(CLOSE_EVENT)
+
+
+def win(game):
+    result_screen(game, 'win.png')  # Экран победы
+
+
+def gameover(game):
+    result_screen(game, 'gameover.png')  # Экран поражения
+
+
+# Главное меню
+def main_menu(game):
+    menu_image = game.assets.image('menu_background.png')  # Загрузка фона меню
+    game.assets.preload(['stats_background.png', 'settings_background.png'])  # Фоны экранов, доступных из меню
+    font = get_font(50)  # Шрифт для текста
+    play_text = font.render("Играть", True, pygame.Color('white'))  # Текст кнопки "Играть"
+    stats_text = font.render("Статистика", True, pygame.Color('white'))  # Текст кнопки "Статистика"
+    settings_text = font.render("Настройки", True, pygame.Color('white'))  # Текст кнопки "Настройки"
+    exit_text = font.render("Выход", True, pygame.Color('white'))  # Текст кнопки "Выход"
+
+    play_rect = play_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50))  # Позиция кнопки "Играть"
+    stats_rect = stats_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))  # Позиция кнопки "Статистика"
+    settings_rect = settings_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))  # Позиция кнопки "Настройки"
+    exit_rect = exit_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50 * 2))  # Позиция кнопки "Выход"
+
+    view = RetainedScreen(game.screen, menu_image)  # Меню перерисовывается только после изменений
+    view.add(play_text, play_rect)  # Кнопка "Играть"
+    view.add(stats_text, stats_rect)  # Кнопка "Статистика"
+    view.add(settings_text, settings_rect)  # Кнопка "Настройки"
+    view.add(exit_text, exit_rect)  # Кнопка "Выход"
+
+    while True:
+        event = view.wait()  # Ожидание события без холостых кадров
+        if event.type == pygame.QUIT:  # Если событие - закрытие окна
+            game.terminate()  # Завершение программы
+        elif event.type == pygame.MOUSEBUTTONDOWN:  # Если нажата кнопка мыши
+            if play_rect.collidepoint(event.pos):  # Если нажата кнопка "Играть"
+                return  # Возврат из меню
+            elif stats_rect.collidepoint(event.pos):  # Если нажата кнопка "Статистика"
+                stats_screen(game)  # Переход на экран статистики
+                view.invalidate()  # После возврата меню рисуется заново
+            elif settings_rect.collidepoint(event.pos):  # Если нажата кнопка "Настройки"
+                settings(game)  # Переход на экран настроек
+                view.invalidate()  # После возврата меню рисуется заново
+            elif exit_rect.collidepoint(event.pos):  # Если нажата кнопка "Выход"
+                game.terminate()  # Завершение программы
+
+
+# Полоса прогресса загрузки
+def progress_bar(fraction, size=PROGRESS_SIZE):
+    bar = pygame.Surface(size)
+    bar.fill((60, 60, 60))  # Фон полосы
+    bar.fill(pygame.Color('white'), (0, 0, int(size[0] * fraction), size[1]))  # Выполненная часть
+    return bar
+
+
+# Экран загрузки поверх последнего кадра; показывается, только если уровень не успел загрузиться в фоне
+def loading_screen(game, loader):
+    view = RetainedScreen(game.screen, game.screen.copy())  # Фоном остается экран результата или меню
+    loading_text = get_font(50).render("Загрузка...", True, pygame.Color('white'))  # Текст загрузки
+    view.add(loading_text, loading_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 180)))
+    bar_position = ((WIDTH - PROGRESS_SIZE[0]) // 2, HEIGHT // 2 + 220)  # Позиция полосы прогресса
+    shown_progress = loader.progress  # Доля, для которой нарисована полоса
+    bar_item = view.add(progress_bar(shown_progress), bar_position)
+
+    while not loader.wait(0):
+        if loader.progress != shown_progress:  # Полоса перерисовывается только при изменении
+            shown_progress = loader.progress
+            view.set(bar_item, progress_bar(shown_progress), bar_position)
+        event = view.wait(LOADING_POLL_MS)  # Ожидание события или следующей проверки загрузки
+        if event.type == pygame.QUIT:  # Если событие - закрытие окна
+            game.terminate()  # Завершение программы
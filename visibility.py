@@ -0,0 +1,162 @@
+import math
+from collections import OrderedDict
+
+import pygame
+
+from level import TILE_SIZE, WALL
+
+VIEW_RADIUS = 8  # Дальность видимости в клетках
+VISIBILITY_CACHE_SIZE = 4096  # Сколько клеток с посчитанной видимостью хранится
+FOG_COLOR = (0, 0, 0)  # Цвет невидимых клеток
+CLEAR_COLOR = (255, 0, 255)  # Прозрачный цвет маски (цветовой ключ)
+# Множители перевода координат октанта в координаты уровня: xx, xy, yx, yy для каждого из 8 октантов
+OCTANTS = [(1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+           (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1)]
+
+
+# Клетки, видимые из клетки (x, y) не дальше radius: рекурсивное отбрасывание теней по 8 октантам.
+# Стены видны, но закрывают то, что за ними; за краем уровня ничего не видно
+def field_of_view(grid, x, y, radius=VIEW_RADIUS):
+    bounded = grid.width is not None
+    visible = {(x, y)}
+
+    # Строки октанта с row по radius в секторе наклонов от start до end (1.0 - край, 0.0 - ось октанта)
+    def cast(row, start, end, xx, xy, yx, yy):
+        if start < end:
+            return
+        new_start = start
+        for distance in range(row, radius + 1):
+            dy = -distance
+            blocked = False
+            first = max(-distance, math.ceil(start * (dy - 0.5) - 0.5) - 1)  # Клетки левее сектора пропускаются
+            for dx in range(first, 1):
+                left_slope = (dx - 0.5) / (dy + 0.5)  # Наклоны краев клетки
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                cx, cy = x + dx * xx + dy * xy, y + dx * yx + dy * yy
+                if bounded and not (0 <= cx < grid.width and 0 <= cy < grid.height):
+                    wall = True  # За краем уровня - как за стеной
+                else:
+                    wall = grid.cell(cx, cy) == WALL
+                    if dx * dx + dy * dy <= radius * radius:
+                        visible.add((cx, cy))
+                if blocked:
+                    if wall:  # Тень продолжается
+                        new_start = right_slope
+                    else:  # Тень кончилась - сектор сужается
+                        blocked = False
+                        start = new_start
+                elif wall and distance < radius:  # Начало тени: видимая часть сектора до нее - рекурсивно
+                    blocked = True
+                    cast(distance + 1, start, left_slope, xx, xy, yx, yy)
+                    new_start = right_slope
+            if blocked:
+                break
+
+    for octant in OCTANTS:
+        cast(1, 1.0, 0.0, *octant)
+    return frozenset(visible)
+
+
+# Видимость по клеткам игрока: считается при первом заходе на клетку, давно не нужные клетки вытесняются
+class VisibilityCache:
+    def __init__(self, grid, radius=VIEW_RADIUS, capacity=VISIBILITY_CACHE_SIZE):
+        self.grid = grid  # Сетка клеток уровня
+        self.radius = radius  # Дальность видимости в клетках
+        self.capacity = capacity  # Предел количества клеток в кэше
+        self.cells = OrderedDict()  # Клетка -> видимые из нее клетки, в порядке последнего использования
+        self.computed = 0  # Сколько раз видимость считалась заново
+
+    # Видимые из клетки (x, y) клетки; для той же клетки возвращается тот же объект
+    def around(self, x, y):
+        key = (x, y)
+        visible = self.cells.get(key)
+        if visible is not None:
+            self.cells.move_to_end(key)
+            return visible
+        visible = self.cells[key] = field_of_view(self.grid, x, y, self.radius)
+        self.computed += 1
+        if len(self.cells) > self.capacity:
+            self.cells.popitem(last=False)  # Самая давно использованная клетка
+        return visible
+
+    # Сброс после изменения стен (горячая перезагрузка уровня)
+    def clear(self):
+        self.cells.clear()
+
+
+# Маска темноты поверх экрана: клетки, которые не видны, закрашены. Маска хранится между кадрами
+# и покрывает экран с запасом в клетку; при смене видимых клеток или сдвиге камеры на клетку
+# перекрашиваются только изменившиеся клетки
+class FogOverlay:
+    def __init__(self, width, height, tile_size=TILE_SIZE):
+        self.tile_size = tile_size  # Размер клетки в пикселях
+        self.columns = width // tile_size + 2  # Клеток в маске по X
+        self.rows = height // tile_size + 2  # и по Y
+        self.surface = pygame.Surface((self.columns * tile_size, self.rows * tile_size))
+        if pygame.display.get_surface() is not None:  # Конвертация под формат экрана, если окно создано
+            self.surface = self.surface.convert()
+        self.surface.set_colorkey(CLEAR_COLOR)
+        self.origin = None  # Клетка уровня в левом верхнем углу маски
+        self.lit = frozenset()  # Клетки, открытые на маске
+        self.fills = 0  # Сколько клеток перекрашено за последний кадр
+
+    # Прямоугольник клетки уровня (x, y) на маске или None, если клетка вне маски
+    def _cell_rect(self, x, y):
+        column, row = x - self.origin[0], y - self.origin[1]
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return column * self.tile_size, row * self.tile_size, self.tile_size, self.tile_size
+        return None
+
+    # Открытие видимых клеток, попавших в область маски area (в клетках маски)
+    def _reveal(self, cells, area):
+        for x, y in cells:
+            if area.collidepoint(x - self.origin[0], y - self.origin[1]):
+                self.surface.fill(CLEAR_COLOR, self._cell_rect(x, y))
+                self.fills += 1
+
+    # Перенос маски к новой клетке в левом верхнем углу: сдвиг содержимого и закраска открывшихся полос
+    def _move(self, origin):
+        shift_x, shift_y = origin[0] - self.origin[0], origin[1] - self.origin[1]
+        self.origin = origin
+        size = self.tile_size
+        if abs(shift_x) >= self.columns or abs(shift_y) >= self.rows:  # Старая маска не пересекается с новой
+            self.surface.fill(FOG_COLOR)
+            self.fills += self.columns * self.rows
+            self._reveal(self.lit, pygame.Rect(0, 0, self.columns, self.rows))
+            return
+        self.surface.scroll(-shift_x * size, -shift_y * size)
+        strips = []  # Открывшиеся полосы в клетках маски
+        if shift_x:
+            strips.append(pygame.Rect(self.columns - shift_x if shift_x > 0 else 0, 0, abs(shift_x), self.rows))
+        if shift_y:
+            strips.append(pygame.Rect(0, self.rows - shift_y if shift_y > 0 else 0, self.columns, abs(shift_y)))
+        for strip in strips:
+            self.surface.fill(FOG_COLOR, (strip.x * size, strip.y * size, strip.width * size, strip.height * size))
+            self.fills += strip.width * strip.height
+            self._reveal(self.lit, strip)
+
+    # Отрисовка маски; visible - видимые клетки (из VisibilityCache)
+    def draw(self, screen, camera, visible):
+        self.fills = 0
+        size = self.tile_size
+        origin = (-camera.camera.x // size, -camera.camera.y // size)
+        if self.origin is None:  # Первый кадр: маска закрашивается целиком, видимые клетки открываются ниже
+            self.origin = origin
+            self.surface.fill(FOG_COLOR)
+            self.fills += self.columns * self.rows
+            self.lit = frozenset()
+        elif origin != self.origin:
+            self._move(origin)
+        if visible is not self.lit:  # Клетки, которые скрылись, закрашиваются, новые видимые - открываются
+            for x, y in self.lit - visible:
+                rect = self._cell_rect(x, y)
+                if rect is not None:
+                    self.surface.fill(FOG_COLOR, rect)
+                    self.fills += 1
+            self._reveal(visible - self.lit, pygame.Rect(0, 0, self.columns, self.rows))
+            self.lit = visible
+        screen.blit(self.surface, (origin[0] * size + camera.camera.x, origin[1] * size + camera.camera.y))